@@ -1,12 +1,23 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 import os
 import tempfile
+import contextlib
 from werkzeug.utils import secure_filename
+import time
 import pandas as pd
-from resume_parser import extract_text_from_resume
-from nlp_processor import preprocess_text, extract_features
-from job_matcher import match_resume_with_job, suggest_jobs
+import metrics
+from resume_parser import extract_text_from_resume, read_upload, save_upload, UploadTooLargeError, get_skill_matcher
+import model_registry
+from nlp_processor import preprocess_text, extract_features, get_preprocessor
+from keyword_extractor import get_keyword_extractor
+from job_matcher import match_resume_with_job, match_resume_with_jobs, parse_job_descriptions, suggest_jobs
+from job_catalog import get_job_catalog
+from resume_index import get_resume_index
+from job_ranking import parse_suggestion_params
+from result_cache import get_result_cache
+from batch_scorer import (open_resume_source, score_resumes, get_worker_pool, rank_results, iter_formatted,
+                          MAX_ARCHIVE_BYTES)
 from dotenv import load_dotenv
 import logging
 
@@ -20,20 +31,66 @@ load_dotenv()
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": os.getenv("FRONTEND_URL", "http://localhost:3000")}}, 
-     supports_credentials=True, allow_headers="*", methods=["GET", "POST", "OPTIONS"])
+     supports_credentials=True, allow_headers="*", methods=["GET", "POST", "DELETE", "OPTIONS"])
 
 # Check for OpenAI API key
 if not os.getenv("OPENAI_API_KEY"):
     logger.warning("OPENAI_API_KEY is not set. Resume matching will use fallback method.")
 
-# Load job dataset once
-try:
-    jobs_df = pd.read_csv(os.getenv("JOB_DATASET_PATH", './data/job.csv'))
-    logger.info(f"Successfully loaded job dataset with {len(jobs_df)} entries")
-except Exception as e:
-    logger.error(f"Error loading job dataset: {e}")
-    # Create an empty DataFrame with expected columns
-    jobs_df = pd.DataFrame(columns=['Job_Title', 'Company_Name', 'Location', 'Experience', 'CTC', 'Posted'])
+JOB_DATASET_PATH = os.getenv("JOB_DATASET_PATH", './data/job.csv')
+
+# Scoring processes in the pool shared by this Flask worker's batch requests
+BATCH_MATCH_WORKERS = int(os.getenv("BATCH_MATCH_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Empty catalog used when the job dataset can't be loaded
+jobs_df = pd.DataFrame(columns=['Job_Title', 'Company_Name', 'Location', 'Experience', 'CTC', 'Posted'])
+
+def warm_up_worker():
+    """
+    Load models, the skill matcher and the job index before the first request
+    
+    Call once per worker at boot (e.g. from a Gunicorn post_fork hook), or set
+    WARM_UP_MODELS=1 to run it on import. Without it everything loads lazily.
+    """
+    def load_job_index():
+        try:
+            job_index = get_job_catalog(JOB_DATASET_PATH).snapshot()
+            logger.info(f"Successfully loaded job dataset with {job_index.live_count} entries")
+        except Exception as e:
+            logger.error(f"Error loading job dataset: {e}")
+    
+    report = model_registry.warm_up(extra=[get_skill_matcher, get_preprocessor, load_job_index,
+                                               get_keyword_extractor])
+    logger.info(f"Warm-up finished: {report}")
+    return report
+
+if os.getenv("WARM_UP_MODELS", "").lower() in ("1", "true", "yes"):
+    warm_up_worker()
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_trace = metrics.start_trace()
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    metrics.IN_FLIGHT.labels(g.metrics_endpoint).inc()
+
+@app.after_request
+def add_server_timing(response):
+    # Streamed responses are still running here; their stages are not reported
+    if metrics.SERVER_TIMING and 'metrics_trace' in g:
+        timings = metrics.end_trace(g.pop('metrics_trace'))
+        elapsed = time.perf_counter() - g.metrics_start
+        response.headers['Server-Timing'] = metrics.server_timing_header(timings + [('total', elapsed)])
+    metrics.REQUEST_SECONDS.labels(g.get('metrics_endpoint', 'unknown'), response.status_code).observe(
+        time.perf_counter() - g.get('metrics_start', time.perf_counter()))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if 'metrics_endpoint' in g:
+        metrics.IN_FLIGHT.labels(g.pop('metrics_endpoint')).dec()
+    if 'metrics_trace' in g:
+        metrics.end_trace(g.pop('metrics_trace'))
 
 @app.route('/')
 def index():
@@ -43,6 +100,18 @@ def index():
 def health_check():
     return jsonify({"status": "ok", "message": "Service is running"}), 200
 
+@app.route('/api/startup-report', methods=['GET'])
+def startup_report():
+    return jsonify(model_registry.startup_report()), 200
+
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify(get_result_cache().stats()), 200
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render_metrics(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
 @app.route('/api/resume-match', methods=['POST'])
 def resume_match():
     logger.info("Request received at /api/resume-match")
@@ -58,16 +127,13 @@ def resume_match():
         logger.warning("No resume file selected")
         return jsonify({"error": "No resume file selected"}), 400
     
-    # Save the uploaded file temporarily
-    temp_dir = tempfile.gettempdir()
     filename = secure_filename(resume_file.filename)
-    file_path = os.path.join(temp_dir, filename)
-    resume_file.save(file_path)
     
     try:
-        # Process the resume
+        # Parse the upload from memory; only very large files spill to a temp file
         logger.info(f"Extracting text from resume: {filename}")
-        resume_text = extract_text_from_resume(file_path)
+        with read_upload(resume_file.stream) as resume_buffer:
+            resume_text = extract_text_from_resume(resume_buffer, filename=filename)
         
         if not resume_text or len(resume_text.strip()) < 10:
             logger.warning(f"Failed to extract meaningful text from resume: {filename}")
@@ -76,18 +142,52 @@ def resume_match():
         # Match resume with job description
         logger.info("Matching resume with job description")
         match_results = match_resume_with_job(resume_text, job_description)
-        
-        # Clean up the temporary file
-        os.remove(file_path)
         logger.info("Resume analysis completed successfully")
         
         return jsonify(match_results), 200
     
+    except UploadTooLargeError as e:
+        logger.warning(f"Rejected resume upload: {e}")
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/multi-job-match', methods=['POST'])
+def multi_job_match():
+    logger.info("Request received at /api/multi-job-match")
+    
+    if 'resume' not in request.files:
+        return jsonify({"error": "Missing resume file"}), 400
+    try:
+        job_descriptions = parse_job_descriptions(request.form)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid job descriptions: {e}"}), 400
+    
+    resume_file = request.files['resume']
+    if resume_file.filename == '':
+        return jsonify({"error": "No resume file selected"}), 400
+    
+    filename = secure_filename(resume_file.filename)
+    
+    try:
+        with read_upload(resume_file.stream) as resume_buffer:
+            resume_text = extract_text_from_resume(resume_buffer, filename=filename)
+        
+        if not resume_text or len(resume_text.strip()) < 10:
+            logger.warning(f"Failed to extract meaningful text from resume: {filename}")
+            return jsonify({"error": "Could not extract text from the resume. Please check the file format."}), 400
+        
+        # The resume is parsed and analyzed once for every job description
+        logger.info(f"Matching resume with {len(job_descriptions)} job descriptions")
+        matches = match_resume_with_jobs(resume_text, job_descriptions)
+        return jsonify({"matches": matches}), 200
+    
+    except UploadTooLargeError as e:
+        logger.warning(f"Rejected resume upload: {e}")
+        return jsonify({"error": str(e)}), 413
     except Exception as e:
         logger.error(f"Error processing resume: {e}")
-        # Clean up in case of error
-        if os.path.exists(file_path):
-            os.remove(file_path)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/job-suggestion', methods=['POST','OPTIONS'])
@@ -102,42 +202,218 @@ def job_suggestion():
     if resume_file.filename == '':
         return jsonify({"error": "No resume file selected"}), 400
     
-    # Save the uploaded file temporarily
-    temp_dir = tempfile.gettempdir()
+    # Optional ranking, pagination and filter parameters
+    try:
+        top_k, min_score, page, filters = parse_suggestion_params(request.form)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid suggestion parameters: {e}"}), 400
+    
     filename = secure_filename(resume_file.filename)
-    file_path = os.path.join(temp_dir, filename)
-    resume_file.save(file_path)
     
     try:
-        # Process the resume
-        resume_text = extract_text_from_resume(file_path)
-        
-        # Get job suggestions
-        # Update column names to match your CSV file
-        jobs_df.columns = jobs_df.columns.str.strip()  # Strip any extra whitespace
-        jobs_df.rename(columns={
-            'job_title': 'Job_Title',
-            'company_name': 'Company_Name',
-            'location': 'Location',
-            'start_date': 'Start_Date',
-            'ctc': 'CTC',
-            'experience': 'Experience',
-            'posted': 'Posted'
-        }, inplace=True)
+        # Process the resume straight from the request stream
+        with read_upload(resume_file.stream) as resume_buffer:
+            resume_text = extract_text_from_resume(resume_buffer, filename=filename)
         
-        suggestions = suggest_jobs(resume_text, jobs_df)
+        # Get job suggestions from a consistent catalog snapshot, picking up appended CSV rows
+        try:
+            job_index = get_job_catalog(JOB_DATASET_PATH).refresh()
+        except Exception as e:
+            logger.error(f"Error loading job index: {e}")
+            job_index = None
         
-        # Clean up the temporary file
-        os.remove(file_path)
+        suggestions = suggest_jobs(resume_text, jobs_df if job_index is None else job_index.jobs,
+                                   job_index=job_index, top_k=top_k, min_score=min_score,
+                                   offset=(page - 1) * top_k, filters=filters)
         
         return jsonify({"suggestions": suggestions}), 200
     
+    except UploadTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/batch-resume-match', methods=['POST'])
+def batch_resume_match():
+    logger.info("Request received at /api/batch-resume-match")
+    
+    if 'archive' not in request.files or 'jobDescription' not in request.form:
+        return jsonify({"error": "Missing resume archive or job description"}), 400
+    
+    archive_file = request.files['archive']
+    job_description = request.form['jobDescription']
+    output_format = request.form.get('format', 'ndjson')
+    # 'score' ranks the results, which holds back all output until the last
+    # resume is scored; 'unsorted' streams each result as it is scored
+    order = request.form.get('order', 'score')
+    
+    if archive_file.filename == '':
+        return jsonify({"error": "No archive file selected"}), 400
+    if output_format not in ('ndjson', 'csv'):
+        return jsonify({"error": f"Unsupported output format: {output_format}"}), 400
+    if order not in ('score', 'unsorted'):
+        return jsonify({"error": f"Unsupported order: {order}"}), 400
+    
+    # Archives need a seekable file, so this upload is written to disk
+    archive = tempfile.NamedTemporaryFile(suffix=os.path.splitext(secure_filename(archive_file.filename))[1],
+                                          delete=False)
+    
+    def remove_archive():
+        if os.path.exists(archive.name):
+            os.remove(archive.name)
+    
+    try:
+        with archive:
+            save_upload(archive_file.stream, archive, max_bytes=MAX_ARCHIVE_BYTES)
+    except UploadTooLargeError as e:
+        remove_archive()
+        logger.warning(f"Rejected resume archive: {e}")
+        return jsonify({"error": str(e)}), 413
+    except BaseException:
+        remove_archive()
+        raise
+    
+    # Unpack before responding, so an archive over the expansion limits still gets a 413
+    cleanup = contextlib.ExitStack()
+    cleanup.callback(remove_archive)
+    try:
+        files = cleanup.enter_context(open_resume_source(archive.name))
+    except UploadTooLargeError as e:
+        cleanup.close()
+        logger.warning(f"Rejected resume archive: {e}")
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        cleanup.close()
+        return jsonify({"error": str(e)}), 400
+    except BaseException:
+        cleanup.close()
+        raise
+    
+    def log_progress(done, total, elapsed):
+        logger.info(f"Batch scoring: {done}/{total} resumes in {elapsed:.1f}s")
+    
+    def generate():
+        try:
+            logger.info(f"Batch scoring {len(files)} resumes")
+            results = score_resumes(files, job_description, workers=BATCH_MATCH_WORKERS, progress=log_progress,
+                                    pool=get_worker_pool(BATCH_MATCH_WORKERS))
+            if order == 'score':
+                results = rank_results(results)
+            yield from iter_formatted(results, output_format)
+        finally:
+            cleanup.close()
+    
+    mimetype = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    # Also covers responses that are closed without ever being iterated
+    response.call_on_close(cleanup.close)
+    return response
+
+@app.route('/api/resumes', methods=['POST'])
+def add_resume():
+    if 'resume' not in request.files or request.files['resume'].filename == '':
+        return jsonify({"error": "Missing resume file"}), 400
+    
+    resume_file = request.files['resume']
+    filename = secure_filename(resume_file.filename)
+    
+    try:
+        with read_upload(resume_file.stream) as resume_buffer:
+            resume_text = extract_text_from_resume(resume_buffer, filename=filename)
+        
+        if not resume_text or len(resume_text.strip()) < 10:
+            return jsonify({"error": "Could not extract text from the resume. Please check the file format."}), 400
+        
+        # Analyzed and vectorized once here; rankings never re-parse the file
+        vectorizer = get_job_catalog(JOB_DATASET_PATH).snapshot().vectorizer
+        entry = get_resume_index().add(resume_text, vectorizer, filename=filename)
+        logger.info(f"Indexed resume {entry['id']} ({filename})")
+        return jsonify(entry), 201 if entry["new"] else 200
+    
+    except UploadTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
     except Exception as e:
-        # Clean up in case of error
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        logger.error(f"Error indexing resume: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/resumes/<resume_id>', methods=['GET', 'DELETE'])
+def resume_entry(resume_id):
+    resume_index = get_resume_index()
+    if request.method == 'DELETE':
+        if not resume_index.remove([resume_id]):
+            return jsonify({"error": "Resume not found"}), 404
+        return jsonify({"removed": resume_id}), 200
+    
+    entry = resume_index.get(resume_id)
+    if entry is None:
+        return jsonify({"error": "Resume not found"}), 404
+    return jsonify(entry), 200
+
+@app.route('/api/candidate-ranking', methods=['POST'])
+def candidate_ranking():
+    payload = request.get_json(silent=True) or request.form
+    job_description = payload.get('jobDescription')
+    if not job_description:
+        return jsonify({"error": "Missing job description"}), 400
+    
+    try:
+        top_k = int(payload.get('topK', 10))
+        min_score = float(payload.get('minScore', 0.0))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid ranking parameters: {e}"}), 400
+    
+    try:
+        vectorizer = get_job_catalog(JOB_DATASET_PATH).snapshot().vectorizer
+        candidates = get_resume_index().rank(job_description, vectorizer, top_k=top_k, min_score=min_score)
+        return jsonify({"candidates": candidates}), 200
+    except Exception as e:
+        logger.error(f"Error ranking candidates: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def admin_authorized():
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, and require it in X-Admin-Token"""
+    token = os.getenv("ADMIN_TOKEN")
+    return bool(token) and request.headers.get('X-Admin-Token') == token
+
+@app.route('/api/admin/jobs', methods=['POST', 'DELETE'])
+def admin_jobs():
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    
+    payload = request.get_json(silent=True) or {}
+    catalog = get_job_catalog(JOB_DATASET_PATH)
+    
+    try:
+        if request.method == 'POST':
+            jobs = payload.get('jobs')
+            if not isinstance(jobs, list) or not all(isinstance(job, dict) for job in jobs):
+                return jsonify({"error": "Expected a 'jobs' list of job objects"}), 400
+            job_ids = catalog.upsert(jobs)
+            logger.info(f"Upserted {len(job_ids)} jobs")
+            return jsonify({"ids": job_ids, **catalog.stats()}), 200
+        
+        job_ids = payload.get('ids')
+        if not isinstance(job_ids, list):
+            return jsonify({"error": "Expected an 'ids' list"}), 400
+        removed = catalog.remove([str(job_id) for job_id in job_ids])
+        logger.info(f"Removed {removed} jobs")
+        return jsonify({"removed": removed, **catalog.stats()}), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error updating job catalog: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/admin/jobs/compact', methods=['POST'])
+def admin_compact_jobs():
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    
+    catalog = get_job_catalog(JOB_DATASET_PATH)
+    catalog.compact()
+    return jsonify(catalog.stats()), 200
+
 if __name__ == '__main__':
     # Create data directory if it doesn't exist
     os.makedirs(os.getenv("DATA_DIR", 'data'), exist_ok=True)
@@ -156,4 +432,5 @@ if __name__ == '__main__':
         pd.DataFrame(sample_data).to_csv(os.path.join(os.getenv("DATA_DIR", 'data'), 'jobs.csv'), index=False)
         print("Created sample jobs.csv")
     
+    warm_up_worker()
     app.run(debug=True, port=5000)
\ No newline at end of file
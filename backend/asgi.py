@@ -0,0 +1,358 @@
+"""
+Async (ASGI) serving mode for the matching endpoints
+
+Serves /api/resume-match, /api/multi-job-match and /api/job-suggestion with
+the same form fields and responses as the Flask app, plus /api/health and
+/api/metrics:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Parsing and NLP run in a bounded process pool, so the event loop only waits
+on them. Ranking against the job catalog runs in a thread of this process,
+where the catalog and its admin updates live. The OpenAI request is awaited
+natively. At most ASGI_MAX_ACTIVE requests are processed at once and
+ASGI_MAX_QUEUED wait for a slot; anything beyond that, or waiting longer than
+ASGI_QUEUE_TIMEOUT seconds, gets 503 with Retry-After.
+"""
+import os
+import time
+import asyncio
+import logging
+import functools
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from werkzeug.utils import secure_filename
+import metrics
+import model_registry
+import pdf_extractor
+from resume_parser import extract_text_from_resume, get_skill_matcher, MAX_UPLOAD_BYTES, UploadTooLargeError
+from nlp_processor import get_preprocessor
+from keyword_extractor import get_keyword_extractor, get_keyword_idf_source
+from resume_analysis import ResumeAnalysis
+from job_matcher import amatch_resume_with_job, amatch_resume_with_jobs, parse_job_descriptions, suggest_jobs
+from job_catalog import get_job_catalog
+from job_ranking import parse_suggestion_params
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+JOB_DATASET_PATH = os.getenv("JOB_DATASET_PATH", './data/job.csv')
+
+ASGI_CPU_WORKERS = int(os.getenv("ASGI_CPU_WORKERS", os.cpu_count() or 1))
+# Requests spend most of their time waiting on OpenAI, so more can be active than there are CPU workers
+ASGI_MAX_ACTIVE = int(os.getenv("ASGI_MAX_ACTIVE", ASGI_CPU_WORKERS * 4))
+ASGI_MAX_QUEUED = int(os.getenv("ASGI_MAX_QUEUED", ASGI_MAX_ACTIVE * 2))
+ASGI_QUEUE_TIMEOUT = float(os.getenv("ASGI_QUEUE_TIMEOUT", 5))
+ASGI_RETRY_AFTER = int(os.getenv("ASGI_RETRY_AFTER", 2))
+
+# Empty catalog used when the job dataset can't be loaded
+EMPTY_JOBS = pd.DataFrame(columns=['Job_Title', 'Company_Name', 'Location', 'Experience', 'CTC', 'Posted'])
+
+class ServerBusyError(Exception):
+    """Raised when a request is not admitted; answered with 503 and Retry-After"""
+
+class AdmissionGate:
+    """
+    Bounded admission for the expensive endpoints
+
+    At most `max_active` requests are processed at once and at most
+    `max_queued` wait for a slot. A request arriving while the queue is full,
+    or waiting longer than `queue_timeout` seconds, is rejected immediately
+    rather than adding to everyone's latency.
+    """
+
+    def __init__(self, max_active, max_queued, queue_timeout):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.queued = 0
+        self._slots = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self._slots is None:
+            # Created on first use so it belongs to the serving event loop
+            self._slots = asyncio.Semaphore(self.max_active)
+        if self._slots.locked() and self.queued >= self.max_queued:
+            metrics.SHED.labels('queue_full').inc()
+            raise ServerBusyError("Too many requests are waiting")
+
+        self.queued += 1
+        metrics.QUEUED.inc()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.SHED.labels('queue_timeout').inc()
+            raise ServerBusyError("Timed out waiting for a processing slot") from None
+        finally:
+            self.queued -= 1
+            metrics.QUEUED.dec()
+
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+admission = AdmissionGate(ASGI_MAX_ACTIVE, ASGI_MAX_QUEUED, ASGI_QUEUE_TIMEOUT)
+
+def _init_cpu_worker(keyword_idf):
+    """Load the models once per worker process"""
+    # The pool already parallelizes across requests; don't fan out again per PDF
+    pdf_extractor.PDF_WORKERS = 1
+    # The IDF table arrives loaded; workers only reload it when the file changes
+    model_registry.get_resource('keyword_idf', lambda: keyword_idf)
+    model_registry.warm_up(extra=[get_skill_matcher, get_preprocessor])
+
+def extract_upload(data, filename):
+    """Text of an uploaded resume, or None if nothing meaningful could be extracted"""
+    resume_text = extract_text_from_resume(data, filename=filename)
+    if not resume_text or len(resume_text.strip()) < 10:
+        return None
+    return resume_text
+
+def analyze_upload(data, filename):
+    """Extract an uploaded resume and compute the text it is matched to jobs with"""
+    resume = ResumeAnalysis(extract_text_from_resume(data, filename=filename))
+    resume.matching_text
+    return resume
+
+_cpu_pool = None
+
+def _start_cpu_pool():
+    global _cpu_pool
+    # Spawned rather than forked: the serving process has threads and an event loop running
+    _cpu_pool = ProcessPoolExecutor(max_workers=ASGI_CPU_WORKERS, initializer=_init_cpu_worker,
+                                    initargs=(get_keyword_idf_source(),),
+                                    mp_context=multiprocessing.get_context('spawn'))
+    return _cpu_pool
+
+async def run_cpu(function, *args):
+    """Run function(*args) on the process pool, recording the stages it timed"""
+    pool = _cpu_pool or _start_cpu_pool()
+    try:
+        result, timings = await asyncio.get_running_loop().run_in_executor(
+            pool, metrics.call_traced, function, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed on a pathological file); later requests get a fresh pool
+        if _cpu_pool is pool:
+            logger.error("CPU worker pool broke; restarting it")
+            pool.shutdown(wait=False)
+            _start_cpu_pool()
+        raise
+    for name, seconds in timings:
+        metrics.record_stage(name, seconds)
+    return result
+
+async def read_resume_upload(upload):
+    """The uploaded file's bytes, enforcing the same size cap as read_upload"""
+    data = await upload.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise UploadTooLargeError(f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+    return data
+
+def refresh_job_index():
+    """A consistent catalog snapshot, picking up appended CSV rows; None if it can't be loaded"""
+    try:
+        return get_job_catalog(JOB_DATASET_PATH).refresh()
+    except Exception as e:
+        logger.error(f"Error loading job index: {e}")
+        return None
+
+def busy_response(error):
+    return JSONResponse({"error": f"Server is busy: {error}"}, status_code=503,
+                        headers={"Retry-After": str(ASGI_RETRY_AFTER)})
+
+def instrumented(endpoint):
+    """Request metrics and the Server-Timing header, as the Flask app's request hooks record them"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            start = time.perf_counter()
+            token = metrics.start_trace()
+            status = 500
+            try:
+                with metrics.IN_FLIGHT.labels(endpoint).track_in_progress():
+                    response = await handler(request)
+                    status = response.status_code
+            finally:
+                timings = metrics.end_trace(token)
+                elapsed = time.perf_counter() - start
+                metrics.REQUEST_SECONDS.labels(endpoint, status).observe(elapsed)
+            if metrics.SERVER_TIMING:
+                response.headers['Server-Timing'] = metrics.server_timing_header(timings + [('total', elapsed)])
+            return response
+        return wrapper
+    return decorator
+
+async def health_check(request):
+    return JSONResponse({"status": "ok", "message": "Service is running"})
+
+async def metrics_endpoint(request):
+    return Response(metrics.render_metrics(), headers={"Content-Type": metrics.PROMETHEUS_CONTENT_TYPE})
+
+@instrumented('resume_match')
+async def resume_match(request):
+    logger.info("Request received at /api/resume-match")
+    form = await request.form()
+    resume_file = form.get('resume')
+    job_description = form.get('jobDescription')
+
+    if not isinstance(resume_file, UploadFile) or job_description is None:
+        logger.warning("Missing resume or job description in request")
+        return JSONResponse({"error": "Missing resume file or job description"}, status_code=400)
+    if not resume_file.filename:
+        logger.warning("No resume file selected")
+        return JSONResponse({"error": "No resume file selected"}, status_code=400)
+
+    filename = secure_filename(resume_file.filename)
+
+    try:
+        data = await read_resume_upload(resume_file)
+        async with admission.slot():
+            logger.info(f"Extracting text from resume: {filename}")
+            resume_text = await run_cpu(extract_upload, data, filename)
+            if resume_text is None:
+                logger.warning(f"Failed to extract meaningful text from resume: {filename}")
+                return JSONResponse({"error": "Could not extract text from the resume. Please check the file format."},
+                                    status_code=400)
+
+            logger.info("Matching resume with job description")
+            match_results = await amatch_resume_with_job(resume_text, job_description, run_cpu=run_cpu)
+        logger.info("Resume analysis completed successfully")
+        return JSONResponse(match_results)
+
+    except ServerBusyError as e:
+        logger.warning(f"Shedding /api/resume-match request: {e}")
+        return busy_response(e)
+    except UploadTooLargeError as e:
+        logger.warning(f"Rejected resume upload: {e}")
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@instrumented('multi_job_match')
+async def multi_job_match(request):
+    logger.info("Request received at /api/multi-job-match")
+    form = await request.form()
+    resume_file = form.get('resume')
+
+    if not isinstance(resume_file, UploadFile):
+        return JSONResponse({"error": "Missing resume file"}, status_code=400)
+    try:
+        job_descriptions = parse_job_descriptions(form)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid job descriptions: {e}"}, status_code=400)
+    if not resume_file.filename:
+        return JSONResponse({"error": "No resume file selected"}, status_code=400)
+
+    filename = secure_filename(resume_file.filename)
+
+    try:
+        data = await read_resume_upload(resume_file)
+        async with admission.slot():
+            resume_text = await run_cpu(extract_upload, data, filename)
+            if resume_text is None:
+                logger.warning(f"Failed to extract meaningful text from resume: {filename}")
+                return JSONResponse({"error": "Could not extract text from the resume. Please check the file format."},
+                                    status_code=400)
+
+            logger.info(f"Matching resume with {len(job_descriptions)} job descriptions")
+            matches = await amatch_resume_with_jobs(resume_text, job_descriptions, run_cpu=run_cpu)
+        return JSONResponse({"matches": matches})
+
+    except ServerBusyError as e:
+        logger.warning(f"Shedding /api/multi-job-match request: {e}")
+        return busy_response(e)
+    except UploadTooLargeError as e:
+        logger.warning(f"Rejected resume upload: {e}")
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@instrumented('job_suggestion')
+async def job_suggestion(request):
+    if request.method == 'OPTIONS':
+        return JSONResponse({'message': 'CORS preflight passed'})
+    form = await request.form()
+    resume_file = form.get('resume')
+
+    if not isinstance(resume_file, UploadFile):
+        return JSONResponse({"error": "Missing resume file"}, status_code=400)
+    if not resume_file.filename:
+        return JSONResponse({"error": "No resume file selected"}, status_code=400)
+
+    try:
+        top_k, min_score, page, filters = parse_suggestion_params(form)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid suggestion parameters: {e}"}, status_code=400)
+
+    filename = secure_filename(resume_file.filename)
+
+    try:
+        data = await read_resume_upload(resume_file)
+        async with admission.slot():
+            resume = await run_cpu(analyze_upload, data, filename)
+            job_index = await asyncio.to_thread(refresh_job_index)
+            suggestions = await asyncio.to_thread(
+                suggest_jobs, resume, EMPTY_JOBS if job_index is None else job_index.jobs,
+                job_index=job_index, top_k=top_k, min_score=min_score, offset=(page - 1) * top_k, filters=filters)
+        return JSONResponse({"suggestions": suggestions})
+
+    except ServerBusyError as e:
+        logger.warning(f"Shedding /api/job-suggestion request: {e}")
+        return busy_response(e)
+    except UploadTooLargeError as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # This process only ranks against the catalog; the models are loaded by the workers
+    job_index = await asyncio.to_thread(refresh_job_index)
+    if job_index is not None:
+        logger.info(f"Successfully loaded job dataset with {job_index.live_count} entries")
+    await asyncio.to_thread(get_keyword_extractor)
+    pool = _start_cpu_pool()
+    # Start the workers (and their model loading) before the first request
+    await asyncio.get_running_loop().run_in_executor(pool, int)
+    logger.info(f"Started {ASGI_CPU_WORKERS} CPU workers")
+    try:
+        yield
+    finally:
+        _cpu_pool.shutdown(cancel_futures=True)
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/metrics', metrics_endpoint, methods=['GET']),
+        Route('/api/resume-match', resume_match, methods=['POST']),
+        Route('/api/multi-job-match', multi_job_match, methods=['POST']),
+        Route('/api/job-suggestion', job_suggestion, methods=['POST', 'OPTIONS']),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=[os.getenv("FRONTEND_URL", "http://localhost:3000")],
+                   allow_credentials=True, allow_headers=["*"], allow_methods=["GET", "POST", "OPTIONS"])
+    ],
+    lifespan=lifespan
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", 5000)))
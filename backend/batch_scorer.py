@@ -0,0 +1,305 @@
+import os
+import io
+import sys
+import csv
+import json
+import time
+import tarfile
+import zipfile
+import argparse
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pdf_extractor
+import model_registry
+from resume_parser import extract_text_from_resume, save_upload, UploadTooLargeError, MAX_UPLOAD_BYTES
+from job_matcher import fallback_match_resume_with_job
+from resume_analysis import ResumeAnalysis
+from keyword_extractor import get_keyword_extractor, get_keyword_idf_source
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Archives hold many resumes, so they get a larger cap than single uploads
+MAX_ARCHIVE_BYTES = int(os.getenv("MAX_ARCHIVE_BYTES", 100 * 1024 * 1024))
+# Limits on what an archive may expand to, so a small archive can't fill memory or disk
+MAX_ARCHIVE_MEMBERS = int(os.getenv("MAX_ARCHIVE_MEMBERS", 10000))
+MAX_EXTRACTED_BYTES = int(os.getenv("MAX_EXTRACTED_BYTES", 1024 * 1024 * 1024))
+
+# Job description analyses each worker keeps, for concurrent batches against different jobs
+JOB_ANALYSIS_CACHE_SIZE = 8
+
+CSV_FIELDS = ['file', 'score', 'strengths', 'weaknesses', 'suggestions', 'error']
+
+def _is_supported(name):
+    return os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS and not os.path.basename(name).startswith('.')
+
+def _extract_archive(archive_path, target_dir):
+    """
+    Write the supported resume files of a zip or tar archive into target_dir
+
+    Member names are never used as paths, so archives cannot write outside target_dir.
+    Members are streamed to disk; each is held to MAX_UPLOAD_BYTES, as a single
+    upload is, and the archive to MAX_ARCHIVE_MEMBERS resumes and
+    MAX_EXTRACTED_BYTES in total, whatever sizes its headers declare.
+
+    Returns:
+        list: (member name, extracted file path) tuples
+
+    Raises:
+        UploadTooLargeError: If the archive exceeds one of the limits
+    """
+    files = []
+    extracted = 0
+
+    def write_member(name, declared_size, open_member):
+        nonlocal extracted
+        if len(files) >= MAX_ARCHIVE_MEMBERS:
+            raise UploadTooLargeError(f"Archive holds more than {MAX_ARCHIVE_MEMBERS} resumes")
+        remaining = MAX_EXTRACTED_BYTES - extracted
+        limit = min(MAX_UPLOAD_BYTES, remaining)
+        if declared_size <= limit:
+            path = os.path.join(target_dir, f"{len(files):06d}_{os.path.basename(name)}")
+            try:
+                with open_member() as source, open(path, 'wb') as file:
+                    save_upload(source, file, max_bytes=limit)
+                    extracted += file.tell()
+                files.append((name, path))
+                return
+            except UploadTooLargeError:
+                pass
+        if limit == remaining:
+            raise UploadTooLargeError(f"Archive expands beyond the {MAX_EXTRACTED_BYTES // (1024 * 1024)} MB limit")
+        raise UploadTooLargeError(f"{name} exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_supported(info.filename):
+                    write_member(info.filename, info.file_size, lambda: archive.open(info))
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                if member.isfile() and _is_supported(member.name):
+                    write_member(member.name, member.size, lambda: archive.extractfile(member))
+    else:
+        raise ValueError(f"Unsupported archive format: {archive_path}")
+
+    return files
+
+@contextlib.contextmanager
+def open_resume_source(source):
+    """
+    List the resume files in a directory or archive
+
+    Archives are unpacked into a temporary directory that is removed on exit.
+
+    Args:
+        source (str): Path to a directory, .zip or .tar(.gz) archive
+
+    Yields:
+        list: (display name, file path) tuples, sorted by name
+    """
+    if os.path.isdir(source):
+        files = []
+        for root, _, names in os.walk(source):
+            for name in names:
+                if _is_supported(name):
+                    path = os.path.join(root, name)
+                    files.append((os.path.relpath(path, source), path))
+        yield sorted(files)
+    else:
+        with tempfile.TemporaryDirectory(prefix='resume-batch-') as temp_dir:
+            yield sorted(_extract_archive(source, temp_dir))
+
+_job_analyses = {}
+
+def _init_worker(keyword_idf):
+    """Runs once per worker process"""
+    # The pool already parallelizes across resumes; don't fan out again per PDF
+    pdf_extractor.PDF_WORKERS = 1
+    # The IDF table arrives loaded; workers only reload it when the file changes
+    model_registry.get_resource('keyword_idf', lambda: keyword_idf)
+
+def _job_analysis(job_description):
+    """The worker's analysis of a job description, shared by every resume scored against it"""
+    analysis = _job_analyses.pop(job_description, None) or ResumeAnalysis(job_description)
+    # Most recently used last; the oldest is dropped first
+    _job_analyses[job_description] = analysis
+    while len(_job_analyses) > JOB_ANALYSIS_CACHE_SIZE:
+        del _job_analyses[next(iter(_job_analyses))]
+    return analysis
+
+def _score_resume(item):
+    """Score one resume file against a job description"""
+    name, path, job_description = item
+    start = time.perf_counter()
+    try:
+        resume_text = extract_text_from_resume(path)
+        if not resume_text or len(resume_text.strip()) < 10:
+            return {"file": name, "score": None, "error": "Could not extract text from the resume"}
+
+        result = fallback_match_resume_with_job(resume_text, _job_analysis(job_description))
+        result["file"] = name
+    except Exception as e:
+        result = {"file": name, "score": None, "error": str(e)}
+
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+def start_worker_pool(workers=None):
+    """
+    Start a pool of scoring processes
+
+    Workers are spawned rather than forked: the calling process may be a
+    threaded server, and a child forked while another thread holds a lock
+    can deadlock on it.
+
+    Args:
+        workers (int): Number of worker processes (defaults to the CPU count)
+
+    Returns:
+        ProcessPoolExecutor: The pool
+    """
+    # Load the IDF table here so it is sent to the workers already loaded
+    get_keyword_extractor()
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                               initargs=(get_keyword_idf_source(),),
+                               mp_context=multiprocessing.get_context('spawn'))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool(workers=None):
+    """The long-lived scoring pool shared by every batch in this process, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = start_worker_pool(workers)
+        return _pool
+
+def _discard_worker_pool(pool):
+    """Forget a broken shared pool so the next batch starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+def score_resumes(files, job_description, workers=None, progress=None, progress_every=100, pool=None):
+    """
+    Score resume files against one job description across a process pool
+
+    Args:
+        files (list): (display name, file path) tuples
+        job_description (str): Job description text
+        workers (int): Number of worker processes (defaults to the CPU count)
+        progress (callable): Called as progress(done, total, elapsed_seconds)
+        progress_every (int): How many resumes between progress calls
+        pool (ProcessPoolExecutor): A running pool of `workers` processes
+            from start_worker_pool or get_worker_pool; without one a pool is
+            started for this call and shut down after it
+
+    Yields:
+        dict: One result per resume, in input order
+    """
+    total = len(files)
+    if total == 0:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if pool is None:
+        with start_worker_pool(workers) as pool:
+            yield from score_resumes(files, job_description, workers, progress, progress_every, pool)
+        return
+
+    # Large chunks amortize IPC; keep several chunks per worker to balance uneven files
+    chunksize = max(1, min(64, total // (workers * 4)))
+    items = [(name, path, job_description) for name, path in files]
+
+    start = time.perf_counter()
+    try:
+        for done, result in enumerate(pool.map(_score_resume, items, chunksize=chunksize), 1):
+            if progress and (done % progress_every == 0 or done == total):
+                progress(done, total, time.perf_counter() - start)
+            yield result
+    except BrokenProcessPool:
+        _discard_worker_pool(pool)
+        raise
+
+def rank_results(results):
+    """
+    Sort results by score, best first, with failed resumes last
+    
+    Every result is collected before the first is returned, so output
+    ranked this way only starts once the whole batch is scored.
+    """
+    return sorted(results, key=lambda result: (result.get("score") is None, -(result.get("score") or 0)))
+
+def iter_ndjson(results):
+    """Yield each result as one JSON line"""
+    for result in results:
+        yield json.dumps(result) + '\n'
+
+def iter_csv(results):
+    """Yield the results as CSV text, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for result in results:
+        row = {key: '; '.join(value) if isinstance(value, list) else value for key, value in result.items()}
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_formatted(results, output_format):
+    """Serialize results as 'ndjson' or 'csv'"""
+    if output_format == 'csv':
+        return iter_csv(results)
+    if output_format == 'ndjson':
+        return iter_ndjson(results)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
+def _print_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Scored {done}/{total} resumes ({rate:.1f}/s)", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory or archive of resumes against one job description")
+    parser.add_argument('source', help="Directory, .zip or .tar(.gz) archive of PDF/DOCX/TXT resumes")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--job-description', help="Job description text")
+    group.add_argument('--job-description-file', help="File containing the job description")
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--output', default='-', help="Output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--unsorted', action='store_true',
+                        help="Write results as they are scored instead of in score order")
+    args = parser.parse_args()
+
+    job_description = args.job_description
+    if args.job_description_file:
+        with open(args.job_description_file, encoding='utf-8') as file:
+            job_description = file.read()
+
+    with open_resume_source(args.source) as files:
+        results = score_resumes(files, job_description, workers=args.workers, progress=_print_progress)
+        if not args.unsorted:
+            results = rank_results(results)
+
+        with contextlib.ExitStack() as stack:
+            if args.output == '-':
+                out = sys.stdout
+            else:
+                out = stack.enter_context(open(args.output, 'w', newline='', encoding='utf-8'))
+            for chunk in iter_formatted(results, args.format):
+                out.write(chunk)
+
+if __name__ == '__main__':
+    main()
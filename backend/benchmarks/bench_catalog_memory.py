@@ -0,0 +1,121 @@
+"""
+Compare per-worker memory of the object-dtype and compact job catalogs
+
+The job CSV is replicated to --rows rows. For each representation the
+catalog is loaded once in a parent process, then forked workers scan the
+catalog and build response dicts like suggest_jobs does. Memory that a
+worker does not share with the parent (Private_Clean + Private_Dirty from
+/proc/self/smaps_rollup) is what each extra worker costs. Linux only.
+
+Usage:
+    python benchmarks/bench_catalog_memory.py [--rows 1000000] [--workers 4]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_index import normalize_job_columns, assign_job_ids
+from compact_catalog import compact_jobs_frame, save_compact_catalog, load_compact_catalog
+from synthetic import replicate_csv
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'job.csv')
+
+def _smaps_kb(field_names):
+    totals = dict.fromkeys(field_names, 0)
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            name, _, value = line.partition(':')
+            if name in totals:
+                totals[name] = int(value.split()[0])
+    return totals
+
+def _worker_touch(jobs_df, rng):
+    """What a worker does with the catalog per request: scan filter columns and build rows"""
+    for column in ('Location', 'Experience', 'CTC'):
+        if column in jobs_df:
+            jobs_df[column].value_counts()
+    rows = rng.integers(0, len(jobs_df), size=1000)
+    jobs_df.iloc[rows].to_dict('records')
+    # Reading every string once is what touches refcounts on object columns
+    for value in jobs_df['Company_Name']:
+        pass
+
+def measure(mode, csv_path, index_dir, workers):
+    """Runs in a fresh interpreter so each mode starts from the same baseline"""
+    baseline = _smaps_kb(['Rss'])['Rss']
+    start = time.perf_counter()
+    if mode == 'object':
+        jobs_df = normalize_job_columns(pd.read_csv(csv_path))
+    else:
+        jobs_df = load_compact_catalog(index_dir)
+    load_seconds = time.perf_counter() - start
+
+    parent_rss = _smaps_kb(['Rss'])['Rss'] - baseline
+    frame_bytes = int(jobs_df.memory_usage(deep=True).sum())
+
+    private = []
+    for worker in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _worker_touch(jobs_df, np.random.default_rng(worker))
+            fields = _smaps_kb(['Private_Clean', 'Private_Dirty'])
+            os.write(write_fd, str(fields['Private_Clean'] + fields['Private_Dirty']).encode())
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            private.append(int(pipe.read()))
+        os.waitpid(pid, 0)
+
+    return {
+        "mode": mode,
+        "rows": len(jobs_df),
+        "load_seconds": round(load_seconds, 3),
+        "frame_mb": round(frame_bytes / 2 ** 20, 1),
+        "parent_rss_mb": round(parent_rss / 1024, 1),
+        "worker_private_mb": round(sum(private) / len(private) / 1024, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--measure', choices=['object', 'compact'], help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        result = measure(args.measure, os.path.join(args.work_dir, 'jobs.csv'), args.work_dir, args.workers)
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='catalog-bench-') as work_dir:
+        csv_path = os.path.join(work_dir, 'jobs.csv')
+        replicate_csv(args.csv, args.rows, csv_path)
+        jobs_df = compact_jobs_frame(assign_job_ids(normalize_job_columns(pd.read_csv(csv_path))))
+        save_compact_catalog(jobs_df, work_dir)
+        del jobs_df
+
+        results = []
+        for mode in ('object', 'compact'):
+            output = subprocess.check_output([sys.executable, __file__, '--measure', mode,
+                                              '--work-dir', work_dir, '--workers', str(args.workers)])
+            results.append(json.loads(output))
+
+    print(f"{'mode':<8} {'rows':>9} {'load s':>7} {'frame MB':>9} {'parent RSS MB':>14} {'private MB/worker':>18}")
+    for result in results:
+        print(f"{result['mode']:<8} {result['rows']:>9} {result['load_seconds']:>7} {result['frame_mb']:>9} "
+              f"{result['parent_rss_mb']:>14} {result['worker_private_mb']:>18}")
+
+if __name__ == '__main__':
+    main()
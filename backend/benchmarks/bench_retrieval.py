@@ -0,0 +1,125 @@
+"""
+Recall and latency of the job retrieval backends against exact search
+
+Synthetic catalogs are drawn from a Zipf-distributed vocabulary with
+topic clusters, so that postings (and queries built like resumes, as a mix
+of one topic's terms plus noise) have realistic near neighbours. Each
+backend is built over the same TF-IDF matrix; recall@k is the fraction of
+the exact top k it returns, latency is per query, and memory is what the
+backend holds beyond the shared job matrix (projections, codes, embeddings,
+partitions).
+
+Usage:
+    python benchmarks/bench_retrieval.py [--rows 10000 100000 1000000] [--queries 200]
+        [--backends lsh ivf] [--params '{"ivf": {"n_probe": 16}}'] [--vocabulary 2000000]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retrieval import build_retriever
+
+VOCABULARY_SIZE = 50000
+TOPICS = 500
+TERMS_PER_TOPIC = 40
+
+def synthetic_documents(count, rng, topic_terms, doc_terms=30, topic_share=0.6, vocabulary=VOCABULARY_SIZE):
+    """Documents mixing one topic's terms with Zipf-distributed background terms"""
+    topics = rng.integers(0, len(topic_terms), size=count)
+    n_topic = int(doc_terms * topic_share)
+    background = rng.zipf(1.3, size=(count, doc_terms - n_topic)) % vocabulary
+    documents = []
+    for topic, noise in zip(topics, background):
+        terms = rng.choice(topic_terms[topic], size=n_topic)
+        documents.append(' '.join(f"t{term}" for term in np.concatenate([terms, noise])))
+    return documents
+
+def index_bytes(value, skip=('matrix',)):
+    """Bytes of the arrays a retriever holds, excluding the shared job matrix"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if sp.issparse(value):
+        return sum(index_bytes(getattr(value, name)) for name in ('data', 'indices', 'indptr'))
+    if isinstance(value, (list, tuple)):
+        return sum(index_bytes(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return sum(index_bytes(item) for name, item in vars(value).items() if name not in skip)
+    return 0
+
+def run(rows, n_queries, backends, params, k, vocabulary=VOCABULARY_SIZE, seed=0):
+    rng = np.random.default_rng(seed)
+    topic_terms = rng.integers(0, vocabulary, size=(TOPICS, TERMS_PER_TOPIC))
+
+    start = time.perf_counter()
+    vectorizer = TfidfVectorizer(token_pattern=r'\S+')
+    matrix = vectorizer.fit_transform(synthetic_documents(rows, rng, topic_terms, vocabulary=vocabulary))
+    queries = vectorizer.transform(synthetic_documents(n_queries, rng, topic_terms, doc_terms=60,
+                                                       vocabulary=vocabulary))
+    print(f"\n{rows} rows, {matrix.shape[1]} terms, {matrix.nnz} non-zeros "
+          f"(generated in {time.perf_counter() - start:.1f}s)")
+
+    exact = build_retriever(matrix, 'exact')
+    truth = []
+    results = []
+    for backend in ['exact', *backends]:
+        start = time.perf_counter()
+        retriever = exact if backend == 'exact' else build_retriever(matrix, backend, **params.get(backend, {}))
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        recalls = []
+        for query_row in range(n_queries):
+            query = queries[query_row]
+            start = time.perf_counter()
+            found, _ = retriever.search(query, k)
+            latencies.append(time.perf_counter() - start)
+            if backend == 'exact':
+                truth.append(set(found.tolist()))
+            elif truth[query_row]:
+                recalls.append(len(truth[query_row] & set(found.tolist())) / len(truth[query_row]))
+
+        latencies = np.array(latencies) * 1000
+        result = {
+            "rows": rows,
+            "backend": backend,
+            "build_seconds": round(build_seconds, 2),
+            "index_mb": round(index_bytes(retriever) / 2 ** 20, 1),
+            f"recall@{k}": round(float(np.mean(recalls)), 4) if recalls else 1.0,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        }
+        results.append(result)
+        print(f"  {backend:<6} build {result['build_seconds']:>8}s  memory {result['index_mb']:>8}MB  recall@{k} {result[f'recall@{k}']:>6}  "
+              f"p50 {result['p50_ms']:>8}ms  p99 {result['p99_ms']:>8}ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--backends', nargs='+', default=['lsh', 'ivf'])
+    parser.add_argument('--params', type=json.loads, default={},
+                        help="Per-backend tuning parameters as JSON")
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--vocabulary', type=int, default=VOCABULARY_SIZE,
+                        help="Distinct background terms, e.g. millions to mimic a fitted bigram vocabulary")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        results.extend(run(rows, args.queries, args.backends, args.params, args.k, args.vocabulary))
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == '__main__':
+    main()
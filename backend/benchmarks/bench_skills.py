@@ -0,0 +1,108 @@
+"""
+Benchmark extract_skills against the original per-call Matcher implementation,
+and extract_skills_many (batched nlp.pipe) against calling extract_skills per resume
+
+Usage:
+    python benchmarks/bench_skills.py [--resumes 50] [--repeat 3] [--batch-size 64] [--n-process 1]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import spacy
+from spacy.matcher import Matcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_registry import SPACY_MODEL
+from resume_parser import extract_skills, extract_skills_many, SKILLS_DB
+
+FILLER = (
+    "Responsible for delivering features across the stack and mentoring junior engineers. "
+    "Worked closely with product and design to ship customer facing improvements. "
+    "Led migration of legacy services and improved reliability of the platform. "
+)
+
+_full_nlp = None
+
+def full_pipeline():
+    """The model with no components disabled, loaded once as the original module did"""
+    global _full_nlp
+    if _full_nlp is None:
+        _full_nlp = spacy.load(SPACY_MODEL)
+    return _full_nlp
+
+def legacy_extract_skills(text):
+    """The original implementation: full pipeline, fresh Matcher and one regex per skill"""
+    nlp = full_pipeline()
+    matcher = Matcher(nlp.vocab)
+    for skill in SKILLS_DB:
+        matcher.add(skill, [[{"LOWER": token} for token in skill.split()]])
+
+    doc = nlp(text.lower())
+    skills_found = set()
+    for match_id, start, end in matcher(doc):
+        skill = doc[start:end].text.lower()
+        if len(skill) > 2 and skill not in ['the', 'and', 'for', 'with']:
+            skills_found.add(skill)
+
+    for skill in SKILLS_DB:
+        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
+            skills_found.add(skill)
+
+    return sorted(list(skills_found))
+
+def synthetic_resume(rng, paragraphs=12):
+    """Build a resume-like text with a random sprinkling of known skills"""
+    lines = ["John Doe", "SUMMARY", FILLER, "EXPERIENCE"]
+    for _ in range(paragraphs):
+        skills = rng.sample(SKILLS_DB, 6)
+        lines.append(f"Built systems with {', '.join(skills[:3])} and {skills[3]}. {FILLER}")
+        lines.append(f"Tools: {skills[4].upper()}, {skills[5].title()}")
+    lines += ["SKILLS", ', '.join(rng.sample(SKILLS_DB, 25))]
+    return '\n'.join(lines)
+
+def time_per_resume(func, resumes, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in resumes:
+            func(text)
+        best = min(best, (time.perf_counter() - start) / len(resumes))
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--n-process', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng) for _ in range(args.resumes)]
+
+    mismatches = sum(legacy_extract_skills(text) != extract_skills(text) for text in resumes)
+
+    before = time_per_resume(legacy_extract_skills, resumes, args.repeat)
+    after = time_per_resume(extract_skills, resumes, args.repeat)
+
+    batch = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        batched = list(extract_skills_many(resumes, batch_size=args.batch_size, n_process=args.n_process))
+        batch = min(batch, (time.perf_counter() - start) / len(resumes))
+    mismatches += sum(skills != extract_skills(text) for skills, text in zip(batched, resumes))
+
+    print(f"resumes:   {len(resumes)} (avg {sum(map(len, resumes)) // len(resumes)} chars)")
+    print(f"before:    {before * 1000:.2f} ms/resume")
+    print(f"after:     {after * 1000:.2f} ms/resume")
+    print(f"speedup:   {before / after:.1f}x")
+    print(f"batched:   {batch * 1000:.2f} ms/resume (batch_size={args.batch_size}, n_process={args.n_process})")
+    print(f"mismatches: {mismatches}")
+
+if __name__ == '__main__':
+    main()
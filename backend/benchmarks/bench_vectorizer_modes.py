@@ -0,0 +1,122 @@
+"""
+Compare the fitted and hashed job vectorizer modes
+
+The job CSV is preprocessed once and its texts repeated to --rows rows.
+For each mode the benchmark reports the time to vectorize the catalog,
+the per-query latency of transforming a synthetic resume and ranking the
+catalog, and the matrix size. The hashed mode is also built with its
+counting spread over --workers processes, which the fitted mode cannot do
+since every worker would need the final vocabulary.
+
+Accuracy is measured on the unrepeated catalog: the overlap of each
+query's hashed top k with its fitted top k, and the mean absolute
+difference of their scores over the fitted top k.
+
+Usage:
+    python benchmarks/bench_vectorizer_modes.py [--rows 60000] [--queries 50] [--k 20]
+        [--workers 4] [--bits 16 18 20]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import SIZES, resume_text
+from nlp_processor import preprocess_text
+from hashed_vectorizer import HashedTfidfVectorizer
+from job_index import load_jobs, build_job_texts, make_vectorizer
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'job.csv')
+
+def _count_chunk(args):
+    n_features, texts = args
+    return HashedTfidfVectorizer(n_features=n_features).count(texts)
+
+def build_parallel(texts, n_features, workers):
+    """Hashed counts computed in worker processes, then one IDF pass in the parent"""
+    import scipy.sparse as sp
+
+    vectorizer = HashedTfidfVectorizer(n_features=n_features)
+    size = -(-len(texts) // workers)
+    chunks = [(n_features, texts[start:start + size]) for start in range(0, len(texts), size)]
+    with ProcessPoolExecutor(workers) as pool:
+        counts = sp.vstack(list(pool.map(_count_chunk, chunks))).tocsr()
+    vectorizer.partial_fit(counts=counts)
+    return vectorizer, vectorizer.weight(counts)
+
+def build_serial(vectorizer, texts):
+    return vectorizer, vectorizer.fit_transform(texts)
+
+def top_k(matrix, query, k):
+    scores = (matrix @ query.T).toarray().ravel()
+    rows = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+    return rows[np.argsort(-scores[rows])], scores
+
+def queries(count):
+    sizes = list(SIZES)
+    return [preprocess_text(resume_text(sizes[seed % len(sizes)], seed)) for seed in range(count)]
+
+def timed_build(build):
+    start = time.perf_counter()
+    result = build()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--rows', type=int, default=60000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--bits', type=int, nargs='+', default=[16, 18, 20])
+    args = parser.parse_args()
+
+    job_texts = build_job_texts(load_jobs(args.csv))
+    repeats = -(-args.rows // len(job_texts))
+    catalog = (job_texts * repeats)[:args.rows]
+    query_texts = queries(args.queries)
+    print(f"{len(job_texts)} unique jobs repeated to {len(catalog)} rows, {len(query_texts)} queries")
+
+    modes = {'fitted': lambda: make_vectorizer('fitted')}
+    for bits in args.bits:
+        modes[f'hashed:{bits}'] = lambda bits=bits: HashedTfidfVectorizer(n_features=2 ** bits)
+
+    print(f"\n{'mode':<12} {'build':>9} {'parallel':>9} {'query':>9} {'columns':>9} {'matrix':>9}")
+    for name, make in modes.items():
+        (vectorizer, matrix), build_seconds = timed_build(lambda: build_serial(make(), catalog))
+        parallel = ''
+        if name != 'fitted':
+            _, parallel_seconds = timed_build(lambda: build_parallel(catalog, vectorizer.n_features, args.workers))
+            parallel = f"{parallel_seconds:.1f}s"
+
+        latencies = []
+        for text in query_texts:
+            start = time.perf_counter()
+            top_k(matrix, vectorizer.transform([text]), args.k)
+            latencies.append(time.perf_counter() - start)
+        matrix_mb = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024 / 1024
+        print(f"{name:<12} {build_seconds:>8.1f}s {parallel:>9} {statistics.median(latencies) * 1000:>7.1f}ms "
+              f"{matrix.shape[1]:>9} {matrix_mb:>7.0f}MB")
+
+    print(f"\nAccuracy against fitted on the {len(job_texts)} unique jobs (top {args.k})")
+    fitted = make_vectorizer('fitted')
+    fitted_matrix = fitted.fit_transform(job_texts)
+    truth = [top_k(fitted_matrix, fitted.transform([text]), args.k) for text in query_texts]
+    print(f"{'mode':<12} {'overlap':>9} {'score err':>10}")
+    for bits in args.bits:
+        hashed = HashedTfidfVectorizer(n_features=2 ** bits)
+        hashed_matrix = hashed.fit_transform(job_texts)
+        overlaps, errors = [], []
+        for text, (rows, scores) in zip(query_texts, truth):
+            hashed_rows, hashed_scores = top_k(hashed_matrix, hashed.transform([text]), args.k)
+            overlaps.append(len(set(rows) & set(hashed_rows)) / len(rows))
+            errors.append(np.abs(hashed_scores[rows] - scores[rows]).mean())
+        print(f"{f'hashed:{bits}':<12} {statistics.mean(overlaps):>8.1%} {statistics.mean(errors):>10.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Per-stage benchmarks of the parsing and matching hot paths
+
+Stages, each timed on synthetic resumes of several sizes:
+    extract     text extraction from TXT, DOCX and PDF files
+    preprocess  preprocess_text
+    skills      extract_skills
+    sections    extract_resume_sections
+    vectorize   transforming the resume's matching text with the job vocabulary
+    rank        JobIndex.search over a scaled copy of data/job.csv
+
+Results are written as JSON. With --baseline the medians are compared to a
+stored run and the exit status is 1 if any stage is slower than the
+tolerance allows, so CI can gate on it. --profile runs one stage under
+cProfile (a .prof file for snakeviz/flameprof) or pyinstrument (an HTML
+flame graph) instead of timing everything.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--output results.json] [--baseline baseline.json]
+        [--tolerance 0.25] [--sizes small medium large] [--job-rows 6000 60000]
+        [--profile rank:medium] [--profiler cprofile|pyinstrument]
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import SIZES, resume_file, replicate_csv
+from resume_parser import extract_text_from_resume, extract_skills
+from nlp_processor import preprocess_text, extract_resume_sections
+from resume_analysis import ResumeAnalysis
+from job_index import JobIndex, load_jobs
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'job.csv')
+FORMATS = ['txt', 'docx', 'pdf']
+
+def build_stages(sizes, job_rows, csv_path):
+    """
+    Map of stage name -> zero-argument callable doing one unit of work
+
+    Inputs (files, job indexes) are prepared here so only the stage itself is timed.
+    """
+    stages = {}
+    for size in sizes:
+        for file_format in FORMATS:
+            name, data, _ = resume_file(file_format, size)
+            stages[f"extract:{file_format}:{size}"] = (
+                lambda name=name, data=data: extract_text_from_resume(data, filename=name))
+
+        text = resume_file('txt', size)[2]
+        stages[f"preprocess:{size}"] = lambda text=text: preprocess_text(text)
+        stages[f"skills:{size}"] = lambda text=text: extract_skills(text)
+        stages[f"sections:{size}"] = lambda text=text: extract_resume_sections(text)
+
+    with tempfile.TemporaryDirectory(prefix='bench-jobs-') as work_dir:
+        for rows in job_rows:
+            csv = os.path.join(work_dir, f"jobs-{rows}.csv")
+            replicate_csv(csv_path, rows, csv)
+            job_index = JobIndex.build(load_jobs(csv))
+            for size in sizes:
+                matching_text = ResumeAnalysis(resume_file('txt', size)[2]).matching_text
+                stages[f"vectorize:{size}:{rows}"] = (
+                    lambda index=job_index, text=matching_text: index.transform(text))
+                stages[f"rank:{size}:{rows}"] = (
+                    lambda index=job_index, text=matching_text: index.search(text, 5, 0.1))
+    return stages
+
+def time_stage(function, repeat, min_seconds=0.2):
+    """Run the stage until `repeat` samples and `min_seconds` have elapsed; returns timings in ms"""
+    function()  # warm caches and lazy model loads
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - started < min_seconds:
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+        if len(samples) >= 10 * repeat:
+            break
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+
+def environment():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                         stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "commit": commit, "time": time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(results, baseline, tolerance):
+    """Stages whose median is more than `tolerance` slower than the baseline"""
+    regressions = []
+    for stage, result in results.items():
+        previous = baseline.get(stage)
+        if previous and result["median_ms"] > previous["median_ms"] * (1 + tolerance):
+            regressions.append((stage, previous["median_ms"], result["median_ms"]))
+    return regressions
+
+def profile(function, profiler, output):
+    """Run one stage repeatedly under a profiler and write its report"""
+    function()
+    if profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+
+        session = Profiler()
+        session.start()
+        for _ in range(20):
+            function()
+        session.stop()
+        with open(output, 'w') as file:
+            file.write(session.output_html())
+    else:
+        import cProfile
+
+        session = cProfile.Profile()
+        session.enable()
+        for _ in range(20):
+            function()
+        session.disable()
+        session.dump_stats(output)
+    print(f"Wrote {profiler} profile to {output}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--job-rows', type=int, nargs='+', default=[6_000, 60_000])
+    parser.add_argument('--stages', nargs='+', help="Only run stages whose name starts with one of these")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help="Earlier results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown of a stage median before it counts as a regression")
+    parser.add_argument('--profile', metavar='STAGE', help="Profile this stage instead of timing all of them")
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile')
+    parser.add_argument('--profile-output', help="Defaults to <stage>.prof or <stage>.html")
+    args = parser.parse_args()
+
+    stages = build_stages(args.sizes, args.job_rows, args.csv)
+
+    if args.profile:
+        if args.profile not in stages:
+            parser.error(f"Unknown stage {args.profile}; choose from: {', '.join(stages)}")
+        extension = 'html' if args.profiler == 'pyinstrument' else 'prof'
+        output = args.profile_output or f"{args.profile.replace(':', '-')}.{extension}"
+        profile(stages[args.profile], args.profiler, output)
+        return
+
+    results = {}
+    for stage, function in stages.items():
+        if args.stages and not stage.startswith(tuple(args.stages)):
+            continue
+        results[stage] = time_stage(function, args.repeat)
+        print(f"{stage:<28} median {results[stage]['median_ms']:>10.3f} ms  "
+              f"p95 {results[stage]['p95_ms']:>10.3f} ms")
+
+    with open(args.output, 'w') as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for stage, before, after in regressions:
+            print(f"REGRESSION {stage}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Synthetic inputs for the benchmarks: resumes as TXT, DOCX and PDF, and
+scaled copies of the job CSV
+
+Everything is deterministic for a given seed and written with the standard
+library only, so generated files do not depend on the parsers under test.
+"""
+import io
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+# Approximate size of the generated resume text
+SIZES = {
+    'small': 2_000,
+    'medium': 10_000,
+    'large': 60_000,
+}
+
+SKILLS = [
+    'Python', 'Java', 'JavaScript', 'React', 'Node.js', 'SQL', 'PostgreSQL', 'Docker', 'Kubernetes',
+    'AWS', 'Machine Learning', 'TensorFlow', 'Pandas', 'Git', 'REST API', 'Agile', 'Scrum', 'Linux',
+    'Data Analysis', 'Excel', 'Tableau', 'C++', 'Go', 'Redis', 'Kafka', 'Spark', 'Communication',
+]
+
+SENTENCES = [
+    "Designed and shipped {skill} services used by thousands of customers every day.",
+    "Led a team of engineers migrating legacy systems to {skill} with zero downtime.",
+    "Improved reliability of the platform by introducing {skill} based monitoring.",
+    "Worked closely with product and design to deliver features built on {skill}.",
+    "Reduced infrastructure cost by thirty percent after rewriting batch jobs in {skill}.",
+    "Mentored junior developers and ran internal workshops on {skill}.",
+]
+
+def resume_text(size='medium', seed=0):
+    """
+    A plausible resume of roughly SIZES[size] characters
+
+    Args:
+        size (str): 'small', 'medium' or 'large'
+        seed (int): Random seed
+
+    Returns:
+        str: Resume text with the usual section headings
+    """
+    rng = random.Random(seed)
+    target = SIZES[size]
+    skills = rng.sample(SKILLS, 12)
+
+    lines = [
+        "Jordan Example",
+        "jordan@example.com | +1 555 0100 | Bengaluru",
+        "",
+        "Summary",
+        "Software engineer with experience building data intensive web applications.",
+        "",
+        "Skills",
+        ", ".join(skills),
+        "",
+        "Experience",
+    ]
+    job = 0
+    while sum(len(line) + 1 for line in lines) < target - 400:
+        job += 1
+        lines.append(f"Senior Engineer, Company {job} ({2024 - job} - {2025 - job})")
+        for _ in range(rng.randint(3, 6)):
+            lines.append("- " + rng.choice(SENTENCES).format(skill=rng.choice(skills)))
+        lines.append("")
+
+    lines += [
+        "Education",
+        "Bachelor of Technology in Computer Science, Example University",
+        "",
+        "Certifications",
+        "AWS Certified Developer",
+    ]
+    return '\n'.join(lines)
+
+def _docx_paragraph(line):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+
+def to_docx(text, table_columns=0, header_lines=0):
+    """
+    A minimal WordprocessingML package with one paragraph per line
+
+    With table_columns, the lines go into table cells, that many per row,
+    the way many resume templates lay out skills and experience. The first
+    header_lines lines go into the page header instead of the body.
+    """
+    lines = text.split('\n')
+    header, lines = lines[:header_lines], lines[header_lines:]
+    if table_columns:
+        rows = [lines[start:start + table_columns] for start in range(0, len(lines), table_columns)]
+        body = '<w:tbl>' + ''.join(
+            '<w:tr>' + ''.join(f'<w:tc>{_docx_paragraph(line)}</w:tc>' for line in row) + '</w:tr>'
+            for row in rows) + '</w:tbl>'
+    else:
+        body = ''.join(_docx_paragraph(line) for line in lines)
+    if header:
+        body += ('<w:sectPr><w:headerReference w:type="default" r:id="rId1"/></w:sectPr>')
+
+    namespaces = ('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+                  'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"')
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<w:document {namespaces}><w:body>{body}</w:body></w:document>')
+    header_part = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   f'<w:hdr {namespaces}>{"".join(_docx_paragraph(line) for line in header)}</w:hdr>')
+    content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     '<Override PartName="/word/document.xml" ContentType="application/'
+                     'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                     '<Override PartName="/word/header1.xml" ContentType="application/'
+                     'vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>'
+                     '</Types>')
+    relationships = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                     '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                     'relationships/officeDocument" Target="word/document.xml"/>'
+                     '</Relationships>')
+    header_relationship = ('<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                           'relationships/header" Target="header1.xml"/>' if header else '')
+    document_relationships = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                              '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                              f'{header_relationship}</Relationships>')
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', content_types)
+        package.writestr('_rels/.rels', relationships)
+        package.writestr('word/document.xml', document)
+        if header:
+            package.writestr('word/header1.xml', header_part)
+        package.writestr('word/_rels/document.xml.rels', document_relationships)
+    return buffer.getvalue()
+
+def _pdf_string(line):
+    """Escape a line for a PDF literal string, dropping characters outside Latin-1"""
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def to_pdf(text, lines_per_page=60):
+    """
+    A minimal PDF with the text set in Helvetica, lines_per_page lines per page
+
+    Content streams are left uncompressed; the cross-reference table is
+    computed from the actual object offsets.
+    """
+    lines = text.split('\n')
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a page and a content stream per page
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for number, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * number, 5 + 2 * number
+        kids.append(f"{page_id} 0 R")
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td\n" + ''.join(
+            f"({_pdf_string(line)}) '\n" for line in page_lines) + "ET"
+        stream = stream.encode('latin-1')
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = output.tell()
+        output.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for object_id in sorted(objects):
+        output.write(b"%010d 00000 n \n" % offsets[object_id])
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+WRITERS = {
+    'txt': lambda text: text.encode('utf-8'),
+    'docx': to_docx,
+    'pdf': to_pdf,
+}
+
+def resume_file(file_format, size='medium', seed=0):
+    """
+    A synthetic resume file
+
+    Returns:
+        tuple: (file name, file bytes, source text)
+    """
+    text = resume_text(size, seed)
+    return f"resume-{size}-{seed}.{file_format}", WRITERS[file_format](text), text
+
+def replicate_csv(csv_path, rows, target):
+    """Write the job CSV repeated until it has `rows` rows"""
+    import pandas as pd
+
+    jobs_df = pd.read_csv(csv_path)
+    repeats = -(-rows // len(jobs_df))
+    pd.concat([jobs_df] * repeats, ignore_index=True).iloc[:rows].to_csv(target, index=False)
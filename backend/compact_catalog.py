@@ -0,0 +1,143 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from job_ranking import parse_range
+
+# Low-cardinality text columns stored dictionary-encoded
+CATEGORICAL_COLUMNS = ['Company_Name', 'Location', 'Start_Date', 'CTC', 'Experience', 'Posted']
+
+# Range columns parsed once into numeric min/max columns
+RANGE_COLUMNS = {
+    'CTC': ('CTC_Min', 'CTC_Max'),
+    'Experience': ('Experience_Min', 'Experience_Max'),
+}
+
+# Derived columns that are not part of API responses
+PARSED_COLUMNS = [column for pair in RANGE_COLUMNS.values() for column in pair]
+
+CATALOG_DIR = 'catalog'
+PARQUET_FILE = 'catalog.parquet'
+
+def compact_jobs_frame(jobs_df):
+    """
+    Convert a normalized job DataFrame to its compact in-memory form
+
+    Repeated strings become categoricals (one copy of each distinct value plus
+    integer codes), and CTC/experience ranges are parsed once into float32
+    min/max columns used by the filter index.
+
+    Args:
+        jobs_df (DataFrame): Job listings with normalized column names
+
+    Returns:
+        DataFrame: Compact copy of the listings
+    """
+    jobs_df = jobs_df.copy()
+
+    for column, (min_column, max_column) in RANGE_COLUMNS.items():
+        if column in jobs_df and min_column not in jobs_df:
+            ranges = np.array([parse_range(value) for value in jobs_df[column]], dtype=np.float32).reshape(-1, 2)
+            jobs_df[min_column] = ranges[:, 0]
+            jobs_df[max_column] = ranges[:, 1]
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in jobs_df and not isinstance(jobs_df[column].dtype, pd.CategoricalDtype):
+            jobs_df[column] = jobs_df[column].astype('category')
+
+    return jobs_df
+
+def concat_jobs(jobs_df, new_jobs_df):
+    """Append rows while keeping categorical columns categorical"""
+    new_jobs_df = compact_jobs_frame(new_jobs_df)
+    jobs_df = jobs_df.copy(deep=False)
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in jobs_df and column in new_jobs_df:
+            categories = jobs_df[column].cat.categories.union(new_jobs_df[column].cat.categories)
+            jobs_df[column] = jobs_df[column].cat.set_categories(categories)
+            new_jobs_df[column] = new_jobs_df[column].cat.set_categories(categories)
+
+    return pd.concat([jobs_df, new_jobs_df], ignore_index=True)
+
+def response_record(job):
+    """Drop derived columns from a job row dict before it is returned to clients"""
+    for column in PARSED_COLUMNS:
+        job.pop(column, None)
+    return job
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def save_compact_catalog(jobs_df, index_dir):
+    """
+    Write the compact catalog in a columnar format
+
+    Parquet is used when pyarrow is installed. Otherwise every column is
+    written as a .npy file (categoricals as integer codes plus a JSON list
+    of categories) so it can be memory-mapped.
+    """
+    jobs_df = compact_jobs_frame(jobs_df)
+
+    if _has_pyarrow():
+        os.makedirs(index_dir, exist_ok=True)
+        jobs_df.to_parquet(os.path.join(index_dir, PARQUET_FILE), index=False)
+        return
+
+    catalog_dir = os.path.join(index_dir, CATALOG_DIR)
+    os.makedirs(catalog_dir, exist_ok=True)
+    schema = []
+    for position, column in enumerate(jobs_df.columns):
+        values = jobs_df[column]
+        file_name = f"{position:03d}.npy"
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(catalog_dir, file_name), values.cat.codes.to_numpy())
+            schema.append({"name": column, "file": file_name, "categories": values.cat.categories.tolist()})
+        elif values.dtype.kind in 'biuf':
+            np.save(os.path.join(catalog_dir, file_name), values.to_numpy())
+            schema.append({"name": column, "file": file_name})
+        else:
+            # Free text such as job titles: stored as a category list too, one entry per value
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            np.save(os.path.join(catalog_dir, file_name), codes.astype(np.int32))
+            schema.append({"name": column, "file": file_name, "categories": uniques.tolist(), "plain": True})
+
+    with open(os.path.join(catalog_dir, 'schema.json'), 'w') as file:
+        json.dump({"rows": len(jobs_df), "columns": schema}, file)
+
+def load_compact_catalog(index_dir, mmap=True):
+    """
+    Load a catalog written by save_compact_catalog
+
+    With the NumPy layout, numeric columns and category codes are
+    memory-mapped, so forked workers share the same physical pages.
+
+    Returns:
+        DataFrame: The compact catalog
+
+    Raises:
+        FileNotFoundError: If no compact catalog has been saved
+    """
+    parquet_path = os.path.join(index_dir, PARQUET_FILE)
+    if os.path.exists(parquet_path) and _has_pyarrow():
+        return pd.read_parquet(parquet_path)
+
+    catalog_dir = os.path.join(index_dir, CATALOG_DIR)
+    with open(os.path.join(catalog_dir, 'schema.json')) as file:
+        schema = json.load(file)
+
+    columns = {}
+    for column in schema["columns"]:
+        values = np.load(os.path.join(catalog_dir, column["file"]), mmap_mode='r' if mmap else None)
+        if "categories" not in column:
+            columns[column["name"]] = values
+            continue
+
+        categorical = pd.Categorical.from_codes(values, categories=column["categories"])
+        columns[column["name"]] = categorical.astype(object) if column.get("plain") else categorical
+
+    return pd.DataFrame(columns)
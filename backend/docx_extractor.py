@@ -0,0 +1,144 @@
+import io
+import os
+import re
+import zipfile
+from xml.parsers import expat
+
+# Element names as expat reports them with namespace processing: '<namespace URI> <local name>'
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main '
+MC = 'http://schemas.openxmlformats.org/markup-compatibility/2006 '
+
+_PARAGRAPH = W + 'p'
+_RUN = W + 'r'
+_TEXT = W + 't'
+_FALLBACK = MC + 'Fallback'
+# Run content -> text, as python-docx renders it
+_RUN_TEXT = {W + 'tab': '\t', W + 'ptab': '\t', W + 'br': '\n', W + 'cr': '\n', W + 'noBreakHyphen': '-'}
+
+_HEADER_RE = re.compile(r'word/header\d*\.xml')
+_FOOTER_RE = re.compile(r'word/footer\d*\.xml')
+
+def _open_package(source):
+    """A ZipFile over a path, bytes buffer or seekable binary stream"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif not isinstance(source, (str, os.PathLike)):
+        source.seek(0)
+    return zipfile.ZipFile(source)
+
+class _PartReader:
+    """expat handlers collecting paragraph text; no element tree is built"""
+
+    def __init__(self):
+        self.open = []  # text of the open paragraphs; text boxes nest inside runs
+        self.done = []
+        self.runs = 0
+        self.fallbacks = 0
+        self.in_text = False
+
+    def start(self, name, attributes):
+        if name == _FALLBACK:
+            self.fallbacks += 1
+        elif self.fallbacks:
+            return
+        elif name == _PARAGRAPH:
+            self.open.append([])
+        elif name == _RUN:
+            self.runs += 1
+        elif self.runs and self.open:
+            # Tab stops in paragraph properties are also w:tab; only run content counts
+            if name == _TEXT:
+                self.in_text = True
+            elif name in _RUN_TEXT:
+                self.open[-1].append(_RUN_TEXT[name])
+
+    def end(self, name):
+        if name == _FALLBACK:
+            self.fallbacks -= 1
+        elif self.fallbacks:
+            return
+        elif name == _TEXT:
+            self.in_text = False
+        elif name == _RUN:
+            self.runs -= 1
+        elif name == _PARAGRAPH:
+            self.done.append(''.join(self.open.pop()))
+
+    def text(self, data):
+        if self.in_text and not self.fallbacks:
+            self.open[-1].append(data)
+
+def iter_part_paragraphs(stream, chunk_size=64 * 1024):
+    """
+    Yield the text of each paragraph of one WordprocessingML part, in document order
+
+    The part is fed to expat in chunks and nothing but the text of open
+    paragraphs is kept, so memory stays flat however long the document is.
+    Table cell and text box paragraphs are yielded like any other. A text
+    box paragraph comes before the paragraph that anchors it. mc:Fallback
+    content repeats its mc:Choice sibling for older readers and is skipped.
+
+    Args:
+        stream: Binary stream of the part's XML
+        chunk_size (int): Bytes parsed at a time
+
+    Yields:
+        str: Paragraph text
+    """
+    reader = _PartReader()
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.buffer_text = True
+    parser.StartElementHandler = reader.start
+    parser.EndElementHandler = reader.end
+    parser.CharacterDataHandler = reader.text
+
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        parser.Parse(chunk, False)
+        yield from reader.done
+        reader.done.clear()
+    parser.Parse(b'', True)
+    yield from reader.done
+
+def iter_docx_paragraphs(source):
+    """
+    Yield the paragraphs of a DOCX: headers, then the body, then footers
+
+    Header and footer parts with the same text (e.g. first-page and default
+    headers) are yielded once.
+
+    Args:
+        source: DOCX path, bytes or seekable binary stream
+
+    Yields:
+        str: Paragraph text
+    """
+    with _open_package(source) as package:
+        names = package.namelist()
+        if 'word/document.xml' not in names:
+            raise ValueError("Not a Word document: word/document.xml is missing")
+
+        def read_parts(pattern):
+            seen = set()
+            for name in sorted(name for name in names if pattern.fullmatch(name)):
+                with package.open(name) as part:
+                    paragraphs = tuple(paragraph for paragraph in iter_part_paragraphs(part) if paragraph)
+                if paragraphs and paragraphs not in seen:
+                    seen.add(paragraphs)
+                    yield from paragraphs
+
+        yield from read_parts(_HEADER_RE)
+        with package.open('word/document.xml') as part:
+            yield from iter_part_paragraphs(part)
+        yield from read_parts(_FOOTER_RE)
+
+def extract_docx(source):
+    """
+    Extract the text of a DOCX, one line per paragraph
+
+    Args:
+        source: DOCX path, bytes or seekable binary stream
+
+    Returns:
+        str: Extracted text
+    """
+    return '\n'.join(iter_docx_paragraphs(source))
@@ -0,0 +1,107 @@
+import os
+import numpy as np
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# 2**18 columns keeps hash collisions rare for a job catalog's unigrams and
+# bigrams while the per-column IDF table stays small
+HASH_BITS = int(os.getenv("VECTORIZER_HASH_BITS", 18))
+
+class HashedTfidfVectorizer:
+    """
+    TF-IDF over hashed n-grams: a fixed dimension and no vocabulary to fit
+
+    Term counts come from a stateless HashingVectorizer, so any process can
+    count any chunk of documents on its own. The IDF table is a separate
+    per-column document frequency count. It grows with partial_fit, and
+    tables counted in different workers are combined with merge. Weighting
+    matches TfidfVectorizer's defaults: smoothed IDF, raw term frequency,
+    L2-normalized rows.
+
+    A catalog too large for memory is vectorized in two passes over its
+    chunks: partial_fit each chunk, then transform each chunk.
+    """
+
+    def __init__(self, n_features=2 ** HASH_BITS, ngram_range=(1, 2)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.document_counts = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+        self._idf = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_idf'] = None
+        return state
+
+    @property
+    def hasher(self):
+        return HashingVectorizer(n_features=self.n_features, ngram_range=self.ngram_range,
+                                 alternate_sign=False, norm=None, dtype=np.float64)
+
+    def count(self, texts):
+        """Hashed term counts of preprocessed texts; needs no fitted state"""
+        return self.hasher.transform(texts)
+
+    def partial_fit(self, texts=None, counts=None):
+        """
+        Add documents to the IDF table
+
+        Args:
+            texts (iterable): Preprocessed texts
+            counts (sparse matrix): Their count() output, if already computed
+
+        Returns:
+            HashedTfidfVectorizer: self
+        """
+        counts = self.count(texts) if counts is None else counts.tocsr()
+        self.document_counts += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        self._idf = None
+        return self
+
+    def merge(self, other):
+        """Add the IDF table of a vectorizer fitted on other documents"""
+        if (other.n_features, tuple(other.ngram_range)) != (self.n_features, tuple(self.ngram_range)):
+            raise ValueError("Can only merge vectorizers with the same n_features and ngram_range")
+        self.document_counts += other.document_counts
+        self.n_documents += other.n_documents
+        self._idf = None
+        return self
+
+    @property
+    def idf_(self):
+        if self._idf is None:
+            idf = np.log((1 + self.n_documents) / (1 + self.document_counts)) + 1
+            if self.n_documents:
+                # Like terms outside a fitted vocabulary, columns no document
+                # has are dropped, so they don't dilute the query's norm
+                idf[self.document_counts == 0] = 0
+            self._idf = idf
+        return self._idf
+
+    def weight(self, counts):
+        """TF-IDF vectors from count() output"""
+        weighted = counts.tocsr(copy=True)
+        weighted.data *= self.idf_[weighted.indices]
+        weighted.eliminate_zeros()
+        return normalize(weighted, norm='l2', copy=False)
+
+    def transform(self, texts):
+        """TF-IDF vectors of preprocessed texts with the current IDF table"""
+        return self.weight(self.count(texts))
+
+    def fit_transform(self, texts):
+        counts = self.count(texts)
+        self.partial_fit(counts=counts)
+        return self.weight(counts)
+
+    def idf_for(self, terms):
+        """IDF of each term (an n-gram string), looked up through its hash column"""
+        terms = list(terms)
+        if not terms:
+            return np.zeros(0)
+        hasher = FeatureHasher(n_features=self.n_features, input_type='string', alternate_sign=False)
+        columns = hasher.transform([[term] for term in terms]).tocsr().indices
+        return self.idf_[columns]
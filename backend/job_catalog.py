@@ -0,0 +1,489 @@
+import io
+import os
+import json
+import uuid
+import hashlib
+import threading
+import contextlib
+import pandas as pd
+from job_index import (DEFAULT_INDEX_DIR, JOB_COLUMN_MAP, VECTORIZER_MODE, JobIndex, load_or_build_job_index,
+                       normalize_job_columns, assign_job_ids, chain_lineage, vectorizer_mode)
+from compact_catalog import load_compact_catalog
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: the catalog files can then only be used by one process
+    fcntl = None
+
+JOURNAL_FILE = 'catalog_journal.jsonl'
+CHECKPOINT_DIR = 'catalog_checkpoint'
+CHECKPOINT_FILE = 'checkpoint.json'
+LOCK_FILE = 'catalog.lock'
+
+# Columns every admin-upserted job must carry (raw CSV header names are accepted too)
+REQUIRED_JOB_COLUMNS = ('Job_Title', 'Company_Name')
+
+def _prefix_sha1(file_path, length):
+    sha1 = hashlib.sha1()
+    with open(file_path, 'rb') as file:
+        remaining = length
+        while remaining > 0:
+            chunk = file.read(min(1 << 20, remaining))
+            if not chunk:
+                break
+            sha1.update(chunk)
+            remaining -= len(chunk)
+    return sha1.hexdigest()
+
+def validate_jobs(jobs):
+    """
+    Check admin job payloads before they are applied or journaled
+
+    Raises:
+        ValueError: If a job is not an object, lacks a required column or
+            has a non-scalar value
+    """
+    for position, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job {position} is not an object")
+        columns = {JOB_COLUMN_MAP.get(str(key).strip(), str(key).strip()): value for key, value in job.items()}
+        missing = [column for column in REQUIRED_JOB_COLUMNS
+                   if not isinstance(columns.get(column), str) or not columns[column].strip()]
+        if missing:
+            raise ValueError(f"Job {position} is missing {', '.join(missing)}")
+        nested = [str(key) for key, value in job.items()
+                  if value is not None and not isinstance(value, (str, int, float, bool))]
+        if nested:
+            raise ValueError(f"Job {position} has non-scalar values for {', '.join(nested)}")
+
+class JobCatalog:
+    """
+    Job catalog store with incremental updates
+
+    The catalog is normalized once at load. Rows appended to the CSV and
+    upserts/removals from the admin API are applied incrementally: new rows
+    are vectorized with the existing vocabulary and appended, removed rows
+    are masked out. Admin changes are journaled so they survive restarts.
+    When masked and appended rows exceed `compact_ratio` of the catalog, the
+    index is rebuilt (refitting the vocabulary) from the live rows, saved as
+    a checkpoint, and the journal is rewritten to the net admin changes, so
+    a restart loads the checkpoint and replays only what came after it.
+    Compaction runs on a background thread; readers keep the old index
+    until it is done.
+
+    Several processes (e.g. Gunicorn workers) can share the catalog files.
+    Journal writes and checkpoints hold an exclusive file lock, each write
+    first replays what other processes journaled, and `refresh()` picks up
+    their admin changes too.
+
+    Every update publishes a new immutable JobIndex; readers take one with
+    `snapshot()` and use it for the whole request.
+    """
+
+    def __init__(self, csv_path, index_dir=DEFAULT_INDEX_DIR, compact_ratio=0.2):
+        self.csv_path = csv_path
+        self.index_dir = index_dir
+        self.compact_ratio = compact_ratio
+        self.journal_path = os.path.join(index_dir, JOURNAL_FILE)
+        self.checkpoint_dir = os.path.join(index_dir, CHECKPOINT_DIR)
+        self.lock_path = os.path.join(index_dir, LOCK_FILE)
+        self._write_lock = threading.Lock()
+        self._index = None
+        self._rows = {}
+        self._csv_offset = 0
+        self._csv_rows = 0
+        self._csv_state = None
+        self._prefix_hash = None
+        self._since_compaction = 0
+        self._admin = {}
+        self._journal_offset = 0
+        self._journal_seen = None
+        self._compaction = None
+
+    def snapshot(self):
+        """The current catalog index; loads the catalog on first use"""
+        index = self._index
+        if index is None:
+            with self._locked():
+                if self._index is None:
+                    self._load()
+                index = self._index
+        return index
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """This catalog's write lock plus the lock other processes take on the same files"""
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.index_dir, exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _publish(self, index):
+        self._rows = {job_id: row for row, job_id in enumerate(index.jobs['Job_Id'])
+                      if index.live is None or index.live[row]}
+        self._index = index
+
+    def _remember_csv(self):
+        stat = os.stat(self.csv_path)
+        self._csv_offset = stat.st_size
+        self._csv_state = (stat.st_mtime, stat.st_size)
+        self._prefix_hash = _prefix_sha1(self.csv_path, self._csv_offset)
+
+    def _load(self):
+        """Full load: the checkpoint (or the persisted CSV index) plus the replayed admin journal"""
+        lines = self._read_journal()
+        self._admin = {}
+        self._since_compaction = 0
+
+        checkpointed = self._load_checkpoint(lines)
+        if checkpointed is None:
+            index = load_or_build_job_index(self.csv_path, self.index_dir)
+            self._csv_rows = len(index)
+            self._remember_csv()
+            self._publish(index)
+            checkpointed = 0
+
+        for position, line in enumerate(lines):
+            entry = json.loads(line)
+            if position >= checkpointed:
+                self._replay(entry)
+            self._remember_admin(entry)
+        self._maybe_compact()
+
+    def _load_checkpoint(self, lines):
+        """
+        Publish the compaction checkpoint if it still matches the CSV and journal
+
+        Returns:
+            int: Number of journal lines the checkpoint already includes, or
+                None if there is no usable checkpoint
+        """
+        try:
+            with open(os.path.join(self.checkpoint_dir, CHECKPOINT_FILE)) as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        checkpointed = checkpoint["journal_lines"]
+        journal_sha1 = hashlib.sha1(''.join(lines[:checkpointed]).encode()).hexdigest()
+        if len(lines) < checkpointed or journal_sha1 != checkpoint["journal_sha1"]:
+            return None
+
+        # The CSV may have grown since, but its checkpointed prefix must be unchanged
+        self._csv_offset = checkpoint["csv_offset"]
+        self._prefix_hash = checkpoint["prefix_sha1"]
+        size = os.stat(self.csv_path).st_size
+        appended = size != self._csv_offset or _prefix_sha1(self.csv_path, size) != self._prefix_hash
+        if appended and not self._is_append(size):
+            return None
+
+        try:
+            index = JobIndex.load(load_compact_catalog(self.checkpoint_dir), self.checkpoint_dir)
+        except (OSError, ValueError) as e:
+            print(f"Job catalog checkpoint at {self.checkpoint_dir} is unusable, rebuilding: {e}")
+            return None
+        if vectorizer_mode(index.vectorizer) != VECTORIZER_MODE:
+            return None
+
+        self._csv_rows = checkpoint["csv_rows"]
+        self._publish(index)
+        if appended:
+            self._ingest_appended_rows()
+        else:
+            stat = os.stat(self.csv_path)
+            self._csv_state = (stat.st_mtime, stat.st_size)
+        return checkpointed
+
+    def _replay(self, entry):
+        if entry["op"] == "upsert":
+            self._apply_upsert(entry["jobs"])
+        elif entry["op"] == "remove":
+            self._apply_remove(entry["ids"])
+
+    def _remember_admin(self, entry):
+        """Track the net effect of admin changes: the latest job per upserted id, None per removed id"""
+        if entry["op"] == "upsert":
+            self._admin.update((job['Job_Id'], job) for job in entry["jobs"])
+        elif entry["op"] == "remove":
+            self._admin.update((job_id, None) for job_id in entry["ids"])
+
+    def _journal_state(self):
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_dev, stat.st_ino, stat.st_size)
+
+    def _read_journal(self, offset=0):
+        """Complete journal lines from byte `offset` on; remembers how far the journal has been read"""
+        try:
+            file = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            self._journal_offset, self._journal_seen = 0, None
+            return []
+
+        with file:
+            stat = os.fstat(file.fileno())
+            file.seek(offset)
+            data = file.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        self._journal_offset = offset + len(complete)
+        self._journal_seen = (stat.st_dev, stat.st_ino, self._journal_offset)
+        return [line for line in complete.decode('utf-8').splitlines(keepends=True) if line.strip()]
+
+    def _sync_journal(self):
+        """Apply the admin changes other processes journaled since this one last read the journal"""
+        state = self._journal_state()
+        seen = self._journal_seen
+        if state == seen:
+            return
+        if state is None or (seen is not None and (state[:2] != seen[:2] or state[2] < self._journal_offset)):
+            # Another process compacted and rewrote it: start over from its checkpoint
+            self._load()
+            return
+
+        for line in self._read_journal(self._journal_offset):
+            entry = json.loads(line)
+            self._replay(entry)
+            self._remember_admin(entry)
+
+    def _journal(self, entry):
+        os.makedirs(self.index_dir, exist_ok=True)
+        data = (json.dumps(entry) + '\n').encode('utf-8')
+        with open(self.journal_path, 'ab') as file:
+            file.write(data)
+            stat = os.fstat(file.fileno())
+        self._journal_offset += len(data)
+        self._journal_seen = (stat.st_dev, stat.st_ino, self._journal_offset)
+        self._remember_admin(entry)
+
+    def refresh(self):
+        """
+        Pick up changes to the CSV and admin changes made by other processes
+
+        Appended rows are ingested incrementally; any other change reloads the
+        catalog. Cheap when nothing changed (two stat calls).
+
+        Returns:
+            JobIndex: The current snapshot
+        """
+        index = self.snapshot()
+        stat = os.stat(self.csv_path)
+        if (stat.st_mtime, stat.st_size) == self._csv_state and self._journal_state() == self._journal_seen:
+            return index
+
+        with self._locked():
+            self._sync_journal()
+            stat = os.stat(self.csv_path)
+            if (stat.st_mtime, stat.st_size) != self._csv_state:
+                if self._is_append(stat.st_size):
+                    self._ingest_appended_rows()
+                else:
+                    self._load()
+            self._maybe_compact()
+            return self._index
+
+    def _is_append(self, size):
+        if size <= self._csv_offset or self._csv_offset == 0:
+            return False
+        with open(self.csv_path, 'rb') as file:
+            file.seek(self._csv_offset - 1)
+            # Only whole lines after a trailing newline count as appended rows
+            if file.read(1) != b'\n':
+                return False
+        return _prefix_sha1(self.csv_path, self._csv_offset) == self._prefix_hash
+
+    def _ingest_appended_rows(self):
+        with open(self.csv_path, 'rb') as file:
+            header = file.readline()
+            file.seek(self._csv_offset)
+            data = file.read()
+
+        # Leave a partially written last line for the next refresh
+        complete = data[:data.rfind(b'\n') + 1]
+        if complete:
+            new_jobs = normalize_job_columns(pd.read_csv(io.BytesIO(header + complete)))
+            new_jobs = assign_job_ids(new_jobs, start=self._csv_rows)
+            self._csv_rows += len(new_jobs)
+            self._append(new_jobs)
+
+        self._csv_offset += len(complete)
+        self._prefix_hash = _prefix_sha1(self.csv_path, self._csv_offset)
+        stat = os.stat(self.csv_path)
+        self._csv_state = (stat.st_mtime, stat.st_size) if not data[len(complete):] else None
+
+    def _append(self, jobs_df):
+        index = self._index
+        stale = [self._rows[job_id] for job_id in jobs_df['Job_Id'] if job_id in self._rows]
+        if stale:
+            index = index.remove(stale)
+        self._since_compaction += len(jobs_df) + len(stale)
+        self._publish(index.append(jobs_df.reset_index(drop=True)))
+
+    def _apply_upsert(self, jobs):
+        jobs_df = normalize_job_columns(pd.DataFrame(jobs))
+        self._append(jobs_df)
+
+    def _apply_remove(self, job_ids):
+        rows = [self._rows[job_id] for job_id in job_ids if job_id in self._rows]
+        if rows:
+            self._since_compaction += len(rows)
+            self._publish(self._index.remove(rows))
+        return len(rows)
+
+    def upsert(self, jobs):
+        """
+        Insert or replace job postings
+
+        Args:
+            jobs (list): Job dicts; those with an existing Job_Id replace it,
+                those without one get a new id
+
+        Returns:
+            list: The Job_Id of every posting, in input order
+
+        Raises:
+            ValueError: If a job fails validation; nothing is applied then
+        """
+        validate_jobs(jobs)
+        jobs = [dict(job, Job_Id=str(job.get('Job_Id') or f"job-{uuid.uuid4().hex}")) for job in jobs]
+        if not jobs:
+            return []
+
+        self.snapshot()
+        with self._locked():
+            self._sync_journal()
+            self._apply_upsert(jobs)
+            self._journal({"op": "upsert", "jobs": jobs})
+            self._maybe_compact()
+        return [job['Job_Id'] for job in jobs]
+
+    def remove(self, job_ids):
+        """
+        Remove job postings by Job_Id
+
+        Returns:
+            int: Number of postings removed
+        """
+        self.snapshot()
+        with self._locked():
+            self._sync_journal()
+            removed = self._apply_remove(job_ids)
+            self._journal({"op": "remove", "ids": list(job_ids)})
+            self._maybe_compact()
+        return removed
+
+    def _maybe_compact(self):
+        """Start a background compaction once enough updates have accumulated"""
+        if self._since_compaction <= self.compact_ratio * max(self._index.live_count, 1):
+            return
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._compaction = threading.Thread(target=self._compact_in_background, args=(self._index,),
+                                            name="job-catalog-compaction", daemon=True)
+        self._compaction.start()
+
+    def _compact_in_background(self, index):
+        try:
+            # The refit runs without any lock held; readers and writers carry on meanwhile
+            compacted = self._rebuild(index)
+            with self._locked():
+                self._sync_journal()
+                # Updates since `index` aren't in the rebuild; they trigger another compaction
+                if self._index is index:
+                    self._install(compacted)
+        except Exception as e:
+            print(f"Error compacting job catalog: {e}")
+
+    def compact(self):
+        """Rebuild the index from the live rows, refitting the vocabulary"""
+        self.snapshot()
+        with self._locked():
+            self._sync_journal()
+            self._install(self._rebuild(self._index))
+        return self._index
+
+    def _rebuild(self, index):
+        jobs = index.jobs if index.live is None else index.jobs[index.live]
+        compacted = JobIndex.build(jobs.reset_index(drop=True), index.fingerprint)
+        compacted.generation = index.generation + 1
+        compacted.lineage = chain_lineage(index.lineage, 'compact')
+        return compacted
+
+    def _install(self, compacted):
+        self._since_compaction = 0
+        self._publish(compacted)
+        self._checkpoint()
+
+    def _checkpoint(self):
+        """
+        Persist the compacted index and rewrite the journal to the net admin changes
+
+        The checkpoint file is removed first and written last, so a crash in
+        between leaves either no checkpoint (the next load rebuilds from the
+        CSV and replays the journal, old or rewritten) or a complete one.
+        """
+        entries = []
+        removed = [job_id for job_id, job in self._admin.items() if job is None]
+        upserted = [job for job in self._admin.values() if job is not None]
+        if removed:
+            entries.append({"op": "remove", "ids": removed})
+        if upserted:
+            entries.append({"op": "upsert", "jobs": upserted})
+        journal = ''.join(json.dumps(entry) + '\n' for entry in entries)
+
+        checkpoint_path = os.path.join(self.checkpoint_dir, CHECKPOINT_FILE)
+        try:
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            self._index.save(self.checkpoint_dir)
+
+            with open(self.journal_path + '.tmp', 'w', encoding='utf-8') as file:
+                file.write(journal)
+            os.replace(self.journal_path + '.tmp', self.journal_path)
+            state = self._journal_state()
+            self._journal_offset = len(journal.encode('utf-8'))
+            self._journal_seen = (state[0], state[1], self._journal_offset)
+
+            checkpoint = {
+                "csv_offset": self._csv_offset,
+                "csv_rows": self._csv_rows,
+                "prefix_sha1": self._prefix_hash,
+                "journal_lines": len(entries),
+                "journal_sha1": hashlib.sha1(journal.encode()).hexdigest()
+            }
+            with open(checkpoint_path + '.tmp', 'w') as file:
+                json.dump(checkpoint, file)
+            os.replace(checkpoint_path + '.tmp', checkpoint_path)
+        except OSError as e:
+            print(f"Error checkpointing job catalog: {e}")
+
+    def stats(self):
+        index = self.snapshot()
+        return {
+            "jobs": index.live_count,
+            "removed_pending_compaction": index.dead_count,
+            "version": index.version,
+            "updates_since_compaction": self._since_compaction,
+            "compacting": self._compaction is not None and self._compaction.is_alive()
+        }
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_job_catalog(csv_path, index_dir=DEFAULT_INDEX_DIR):
+    """Return the shared JobCatalog for a job CSV"""
+    key = os.path.abspath(csv_path)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = JobCatalog(csv_path, index_dir,
+                                        compact_ratio=float(os.getenv("JOB_CATALOG_COMPACT_RATIO", 0.2)))
+        return _catalogs[key]
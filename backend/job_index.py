@@ -0,0 +1,454 @@
+import os
+import json
+import hashlib
+import argparse
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from hashed_vectorizer import HashedTfidfVectorizer
+from nlp_processor import preprocess_many
+from job_ranking import JobFilterIndex, rank_top_k
+from retrieval import build_retriever
+from metrics import stage, timed
+from compact_catalog import compact_jobs_frame, concat_jobs, save_compact_catalog, load_compact_catalog
+
+# Mapping from the raw CSV headers to the column names used by the API
+JOB_COLUMN_MAP = {
+    'job_title': 'Job_Title',
+    'company_name': 'Company_Name',
+    'location': 'Location',
+    'start_date': 'Start_Date',
+    'ctc': 'CTC',
+    'experience': 'Experience',
+    'posted': 'Posted'
+}
+
+DEFAULT_INDEX_DIR = os.getenv("JOB_INDEX_DIR", './data/index')
+
+# 'fitted': a TF-IDF vocabulary fitted on the catalog. 'hashed': feature
+# hashing with a separately maintained IDF table, see HashedTfidfVectorizer
+VECTORIZER_MODE = os.getenv("VECTORIZER_MODE", "fitted")
+VECTORIZER_MODES = ('fitted', 'hashed')
+
+VECTORIZER_FILE = 'vectorizer.joblib'
+MATRIX_FILE = 'matrix.npz'
+META_FILE = 'meta.json'
+
+def normalize_job_columns(jobs_df):
+    """
+    Return a copy of the job DataFrame with stripped, API-style column names
+
+    Args:
+        jobs_df (DataFrame): Raw job listings
+
+    Returns:
+        DataFrame: Job listings with normalized column names
+    """
+    jobs_df = jobs_df.copy()
+    jobs_df.columns = jobs_df.columns.str.strip()
+    return jobs_df.rename(columns=JOB_COLUMN_MAP)
+
+def job_document(job):
+    """
+    Build the text that represents a single job posting for matching
+
+    Args:
+        job (dict): Job row with normalized column names
+
+    Returns:
+        str: Raw (not yet preprocessed) job text
+    """
+    # Ensure we have a description column to work with
+    description = job.get('Description', '')
+    if not isinstance(description, str) or not description:
+        description = f"{job.get('Job_Title', '')} {job.get('Experience', '')}"
+
+    return f"{job.get('Job_Title', '')} {job.get('Company_Name', '')} {description}"
+
+def build_job_texts(jobs_df):
+    """Preprocess the matching text of every job in the DataFrame"""
+    return preprocess_many(job_document(job) for job in jobs_df.to_dict('records'))
+
+def file_fingerprint(file_path, with_hash=True):
+    """
+    Describe the current state of a file so an index built from it can be validated
+
+    Args:
+        file_path (str): Path to the file
+        with_hash (bool): Whether to include a SHA-1 of the file content
+
+    Returns:
+        dict: mtime, size and (optionally) sha1 of the file
+    """
+    stat = os.stat(file_path)
+    fingerprint = {"mtime": stat.st_mtime, "size": stat.st_size}
+
+    if with_hash:
+        sha1 = hashlib.sha1()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                sha1.update(chunk)
+        fingerprint["sha1"] = sha1.hexdigest()
+
+    return fingerprint
+
+def chain_lineage(lineage, *parts):
+    """
+    Fold one catalog update into a lineage hash
+
+    Indexes built from the same CSV through the same sequence of updates end
+    up with the same lineage; any other history gives a different one.
+    """
+    sha1 = hashlib.sha1(lineage.encode())
+    for part in parts:
+        sha1.update(part if isinstance(part, bytes) else str(part).encode())
+        sha1.update(b'\0')
+    return sha1.hexdigest()
+
+def frame_digest(jobs_df):
+    """Content hash of a job DataFrame, columns and values included"""
+    hashes = pd.util.hash_pandas_object(jobs_df, index=False).to_numpy()
+    return hashlib.sha1('\0'.join(map(str, jobs_df.columns)).encode() + hashes.tobytes()).hexdigest()
+
+class JobIndex:
+    """
+    Fitted TF-IDF vocabulary plus the sparse vectors of every job in the catalog
+
+    Rows of `matrix` line up with rows of `jobs`. Vectors are L2-normalized, so
+    the dot product with a transformed resume is its cosine similarity.
+
+    An index is never modified in place once built: `append` and `remove`
+    return a new index, so a reader holding one always sees a consistent
+    snapshot. Removed rows stay in the matrix, masked out by `live`, until
+    the catalog is compacted by rebuilding. `lineage` hashes the updates
+    applied since the index was built from the CSV.
+    """
+
+    def __init__(self, vectorizer, matrix, jobs, fingerprint=None, live=None, generation=0, lineage=''):
+        self.vectorizer = vectorizer
+        self.matrix = matrix.tocsr()
+        self.jobs = jobs
+        self.fingerprint = fingerprint or {}
+        self.live = live
+        self.generation = generation
+        self.lineage = lineage
+        self._filters = None
+        self._retriever = None
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @property
+    def version(self):
+        """Identifies the catalog content: the source CSV hash plus the hash of the updates applied"""
+        base = self.fingerprint.get("sha1", "")
+        return f"{base}:{self.lineage[:16]}" if self.lineage else base
+
+    @property
+    def live_count(self):
+        return len(self) if self.live is None else int(self.live.sum())
+
+    @property
+    def dead_count(self):
+        return len(self) - self.live_count
+
+    def append(self, jobs_df):
+        """
+        Return a new index with jobs appended, vectorized with the existing vocabulary
+
+        Args:
+            jobs_df (DataFrame): New job listings with normalized column names
+
+        Returns:
+            JobIndex: The extended index
+        """
+        lineage = chain_lineage(self.lineage, 'append', frame_digest(jobs_df))
+        if len(self) == 0:
+            index = JobIndex.build(jobs_df, self.fingerprint)
+            index.generation, index.lineage = self.generation + 1, lineage
+            return index
+
+        matrix = sp.vstack([self.matrix, self.vectorizer.transform(build_job_texts(jobs_df))], format='csr')
+        jobs = concat_jobs(self.jobs, jobs_df)
+        live = None
+        if self.live is not None:
+            live = np.concatenate([self.live, np.ones(len(jobs_df), dtype=bool)])
+
+        index = JobIndex(self.vectorizer, matrix, jobs, self.fingerprint, live, self.generation + 1, lineage)
+        if self._retriever is not None:
+            index._retriever = self._retriever.extended(matrix)
+        return index
+
+    def remove(self, rows):
+        """Return a new index with the given rows masked out"""
+        rows = np.asarray(rows, dtype=np.int64)
+        live = np.ones(len(self), dtype=bool) if self.live is None else self.live.copy()
+        live[rows] = False
+        lineage = chain_lineage(self.lineage, 'remove', np.sort(rows).tobytes())
+        index = JobIndex(self.vectorizer, self.matrix, self.jobs, self.fingerprint, live, self.generation + 1, lineage)
+        index._retriever = self._retriever
+        return index
+
+    @classmethod
+    def build(cls, jobs_df, fingerprint=None, mode=None):
+        """
+        Fit the vectorizer on the job catalog and vectorize every posting
+
+        Args:
+            jobs_df (DataFrame): Job listings with normalized column names
+            fingerprint (dict): Fingerprint of the source CSV, if any
+            mode (str): 'fitted' or 'hashed' (defaults to VECTORIZER_MODE)
+
+        Returns:
+            JobIndex: The fitted index
+        """
+        job_texts = build_job_texts(jobs_df)
+
+        vectorizer = make_vectorizer(mode)
+        if job_texts:
+            matrix = vectorizer.fit_transform(job_texts)
+        else:
+            matrix = sp.csr_matrix((0, 0))
+
+        return cls(vectorizer, matrix, jobs_df.reset_index(drop=True), fingerprint)
+
+    def save(self, index_dir=DEFAULT_INDEX_DIR):
+        """Persist the fitted vocabulary, job matrix, compact catalog, source fingerprint and lineage"""
+        os.makedirs(index_dir, exist_ok=True)
+        joblib.dump(self.vectorizer, os.path.join(index_dir, VECTORIZER_FILE))
+        sp.save_npz(os.path.join(index_dir, MATRIX_FILE), self.matrix)
+        save_compact_catalog(self.jobs, index_dir)
+
+        meta = {"n_jobs": len(self), "fingerprint": self.fingerprint, "vectorizer": vectorizer_mode(self.vectorizer),
+                "generation": self.generation, "lineage": self.lineage}
+        with open(os.path.join(index_dir, META_FILE), 'w') as file:
+            json.dump(meta, file)
+
+    @classmethod
+    def load(cls, jobs_df, index_dir=DEFAULT_INDEX_DIR):
+        """
+        Load a persisted index for the given job listings
+
+        Args:
+            jobs_df (DataFrame): Job listings the index was built from
+            index_dir (str): Directory the index was saved to
+
+        Returns:
+            JobIndex: The loaded index
+        """
+        with open(os.path.join(index_dir, META_FILE)) as file:
+            meta = json.load(file)
+
+        vectorizer = joblib.load(os.path.join(index_dir, VECTORIZER_FILE))
+        matrix = sp.load_npz(os.path.join(index_dir, MATRIX_FILE))
+
+        if matrix.shape[0] != len(jobs_df):
+            raise ValueError(f"Index has {matrix.shape[0]} rows but catalog has {len(jobs_df)} jobs")
+
+        return cls(vectorizer, matrix, jobs_df.reset_index(drop=True), meta.get("fingerprint"),
+                   generation=meta.get("generation", 0), lineage=meta.get("lineage", ''))
+
+    @timed('vectorize')
+    def transform(self, text):
+        """Vectorize an already preprocessed text with the fitted vocabulary"""
+        return self.vectorizer.transform([text])
+
+    @property
+    def filters(self):
+        """Location/experience/CTC lookup structures, built on first use"""
+        if self._filters is None:
+            self._filters = JobFilterIndex(self.jobs)
+        return self._filters
+
+    @property
+    def retriever(self):
+        """Nearest-neighbour search structure over the job vectors, built on first use"""
+        if self._retriever is None:
+            self._retriever = build_retriever(self.matrix)
+        return self._retriever
+
+    def search(self, text, k, min_score=0.0, rows=None):
+        """
+        Find the jobs most similar to a preprocessed text
+
+        Whole-catalog searches go through the configured retrieval backend,
+        which may be approximate. Searches restricted to `rows` (already
+        narrowed by filters) score those rows exactly.
+
+        Args:
+            text (str): Preprocessed query text
+            k (int): Number of results
+            min_score (float): Scores must be strictly greater than this
+            rows (ndarray): Only consider these job rows (all jobs if None)
+
+        Returns:
+            tuple: (job rows, similarities), best first
+        """
+        if len(self) == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        if rows is None:
+            query = self.transform(text)
+            with stage('rank'):
+                return self.retriever.search(query, k, min_score, self.live)
+
+        scores = self.score(text, rows)
+        with stage('rank'):
+            positions = rank_top_k(scores, k=k, min_score=min_score)
+        return rows[positions], scores[positions]
+
+    def score(self, text, rows=None):
+        """
+        Cosine similarity of a preprocessed text against the jobs
+
+        Args:
+            text (str): Preprocessed query text
+            rows (ndarray): Only score these job rows (all jobs if None)
+
+        Returns:
+            ndarray: One similarity per scored job, aligned with `rows` or `jobs`
+        """
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        if matrix.shape[0] == 0:
+            return np.zeros(0)
+        query = self.transform(text)
+        scores = (matrix @ query.T).toarray().ravel()
+
+        # Removed jobs can never pass a minimum score
+        if self.live is not None:
+            scores[~(self.live if rows is None else self.live[rows])] = -np.inf
+        return scores
+
+    def is_current(self, csv_path):
+        """Check whether the source CSV still matches the fingerprint the index was built from"""
+        if not self.fingerprint:
+            return False
+
+        current = file_fingerprint(csv_path, with_hash=False)
+        if (current["mtime"] == self.fingerprint.get("mtime")
+                and current["size"] == self.fingerprint.get("size")):
+            return True
+
+        # The file was touched; only a content change invalidates the index
+        current = file_fingerprint(csv_path)
+        if current["sha1"] != self.fingerprint.get("sha1"):
+            return False
+
+        self.fingerprint = current
+        return True
+
+def make_vectorizer(mode=None):
+    """An unfitted job vectorizer for the given mode (defaults to VECTORIZER_MODE)"""
+    mode = mode or VECTORIZER_MODE
+    if mode not in VECTORIZER_MODES:
+        raise ValueError(f"Unknown vectorizer mode {mode!r}; expected one of {', '.join(VECTORIZER_MODES)}")
+    # Use bigrams for better context
+    if mode == 'hashed':
+        return HashedTfidfVectorizer(ngram_range=(1, 2))
+    return TfidfVectorizer(ngram_range=(1, 2))
+
+def vectorizer_mode(vectorizer):
+    return 'hashed' if isinstance(vectorizer, HashedTfidfVectorizer) else 'fitted'
+
+def vectorizer_dimension(vectorizer):
+    """Number of columns the vectorizer produces"""
+    if isinstance(vectorizer, HashedTfidfVectorizer):
+        return vectorizer.n_features
+    return len(vectorizer.vocabulary_)
+
+def assign_job_ids(jobs_df, start=0):
+    """Give rows without a Job_Id a stable id based on their position in the CSV"""
+    if 'Job_Id' not in jobs_df:
+        jobs_df['Job_Id'] = [f"csv-{row}" for row in range(start, start + len(jobs_df))]
+    return jobs_df
+
+def load_jobs(csv_path):
+    """Read the job CSV, normalize its columns and convert it to the compact representation"""
+    return compact_jobs_frame(assign_job_ids(normalize_job_columns(pd.read_csv(csv_path))))
+
+def _read_meta(index_dir):
+    try:
+        with open(os.path.join(index_dir, META_FILE)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def load_or_build_job_index(csv_path, index_dir=DEFAULT_INDEX_DIR, force=False):
+    """
+    Load the persisted index for a job CSV, rebuilding it if the CSV has changed
+
+    Args:
+        csv_path (str): Path to the job CSV
+        index_dir (str): Directory where the index is persisted
+        force (bool): Rebuild even if the persisted index is current
+
+    Returns:
+        JobIndex: An index that matches the current CSV content
+    """
+    fingerprint = file_fingerprint(csv_path)
+
+    meta = _read_meta(index_dir)
+    # Indexes saved before the mode was recorded were fitted
+    if (not force and meta.get("fingerprint", {}).get("sha1") == fingerprint["sha1"]
+            and meta.get("vectorizer", "fitted") == VECTORIZER_MODE):
+        try:
+            # The columnar catalog saved with the index avoids re-parsing the CSV
+            try:
+                jobs_df = load_compact_catalog(index_dir)
+            except FileNotFoundError:
+                jobs_df = load_jobs(csv_path)
+            index = JobIndex.load(jobs_df, index_dir)
+            index.fingerprint = fingerprint
+            return index
+        except (OSError, ValueError) as e:
+            print(f"Job index at {index_dir} is unusable, rebuilding: {e}")
+
+    index = JobIndex.build(load_jobs(csv_path), fingerprint)
+    try:
+        index.save(index_dir)
+    except OSError as e:
+        print(f"Error saving job index: {e}")
+
+    return index
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+def get_job_index(csv_path, index_dir=DEFAULT_INDEX_DIR):
+    """
+    Return the shared index for a job CSV, rebuilding it when the CSV changes
+
+    Args:
+        csv_path (str): Path to the job CSV
+        index_dir (str): Directory where the index is persisted
+
+    Returns:
+        JobIndex: An index that matches the current CSV content
+    """
+    key = os.path.abspath(csv_path)
+    with _index_lock:
+        index = _indexes.get(key)
+        if index is None or not index.is_current(csv_path):
+            index = load_or_build_job_index(csv_path, index_dir)
+            _indexes[key] = index
+        return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the persisted job suggestion index")
+    parser.add_argument('--csv', default=os.getenv("JOB_DATASET_PATH", './data/job.csv'),
+                        help="Path to the job dataset CSV")
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR,
+                        help="Directory to write the index to")
+    parser.add_argument('--force', action='store_true',
+                        help="Rebuild even if the existing index is current")
+    args = parser.parse_args()
+
+    index = load_or_build_job_index(args.csv, args.index_dir, force=args.force)
+    print(f"Job index for {args.csv} has {len(index)} jobs and "
+          f"{vectorizer_dimension(index.vectorizer)} {vectorizer_mode(index.vectorizer)} features ({args.index_dir})")
+
+if __name__ == '__main__':
+    main()
@@ -1,124 +1,356 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from nlp_processor import preprocess_text, extract_keywords, extract_resume_sections
-from resume_parser import extract_skills
+from sklearn.feature_extraction.text import CountVectorizer
+from resume_analysis import ResumeAnalysis
+from job_index import JobIndex, normalize_job_columns, VECTORIZER_MODE
+from hashed_vectorizer import HashedTfidfVectorizer
+from compact_catalog import response_record
+from retrieval import RETRIEVAL_BACKEND
 import os
 from dotenv import load_dotenv
-import openai
+from llm_client import get_llm_client
+from prompt_builder import build_match_prompt, build_multi_match_prompt, split_multi_match_result, prompt_settings
+from result_cache import get_result_cache, cache_key
+from metrics import FALLBACKS, stage, timed
 import json
 import re
 import random
+import asyncio
 # Load environment variables
 load_dotenv()
 
-# Set up OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+LLM_TEMPERATURE = 0.2
+
+# Matching one resume against several job descriptions: 'concurrent' sends
+# one prompt per job, all at once; 'packed' sends LLM_PACK_SIZE jobs per
+# prompt, so the instructions and resume are sent once per pack
+LLM_MULTI_MATCH = os.getenv("LLM_MULTI_MATCH", "concurrent")
+LLM_MULTI_MATCH_MODES = ('concurrent', 'packed')
+LLM_PACK_SIZE = int(os.getenv("LLM_PACK_SIZE", 4))
+MAX_MATCH_JOBS = int(os.getenv("MAX_MATCH_JOBS", 10))
 
 def match_resume_with_job(resume_text, job_description):
     """
     Match a resume with a job description using OpenAI's API for enhanced analysis
     
     Args:
-        resume_text (str): Extracted text from the resume
-        job_description (str): Job description text
+        resume_text (str or ResumeAnalysis): Extracted text from the resume
+        job_description (str or ResumeAnalysis): Job description text
         
     Returns:
         dict: Match results including score, strengths, weaknesses, and suggestions
     """
+    # Analyze each document once; the fallback reuses whatever the LLM path computed
+    resume = ResumeAnalysis.of(resume_text)
+    job = ResumeAnalysis.of(job_description)
+    
+    cache = get_result_cache()
+    llm_key = llm_match_key(resume, job)
+    cached = cache.get(llm_key)
+    if cached is not None:
+        return cached
+
     try:
         # Try to use OpenAI for advanced matching
-        return advanced_llm_match(resume_text, job_description)
+        result = advanced_llm_match(resume, job)
+        cache.set(llm_key, result)
+        return result
     except Exception as e:
         print(f"Error using OpenAI API: {e}")
+        FALLBACKS.labels(type(e).__name__).inc()
         # Fallback to TF-IDF based matching
-        return fallback_match_resume_with_job(resume_text, job_description)
+        return cache.get_or_compute(cache_key('fallback-match', resume.text, job.text),
+                                    lambda: fallback_match_resume_with_job(resume, job))
 
-def advanced_llm_match(resume_text, job_description):
+def llm_match_key(resume, job, packed=False):
+    """Result cache key of the LLM analysis of resume against job"""
+    settings = {"model": get_llm_client().model, "temperature": LLM_TEMPERATURE, "prompt": prompt_settings()}
+    if packed:
+        # The analysis is reused whatever other jobs shared its prompt
+        settings["pack_size"] = LLM_PACK_SIZE
+    return cache_key('llm-match', resume.text, job.text, settings)
+
+async def amatch_resume_with_job(resume_text, job_description, run_cpu=None):
     """
-    Use OpenAI's API to analyze the resume against the job description
+    match_resume_with_job for async servers: the OpenAI request is awaited natively
     
     Args:
-        resume_text (str): Extracted text from the resume
-        job_description (str): Job description text
+        resume_text (str or ResumeAnalysis): Extracted text from the resume
+        job_description (str or ResumeAnalysis): Job description text
+        run_cpu (callable): Awaitable runner for the CPU-bound steps, called as
+            run_cpu(function, *args), e.g. on a process pool. Defaults to a
+            worker thread.
         
     Returns:
-        dict: Detailed match analysis
+        dict: Match results including score, strengths, weaknesses, and suggestions
     """
-    # Extract skills from resume for additional context
-    skills = extract_skills(resume_text)
-    skills_text = ', '.join(skills)
-    
-    # Extract sections from resume
-    resume_sections = extract_resume_sections(resume_text)
-    
-    # Prepare a condensed version of the resume for the prompt
-    condensed_resume = ""
-    key_sections = ["summary", "experience", "skills", "education", "projects", "achievements"]
-    
-    for section in key_sections:
-        if section in resume_sections:
-            condensed_resume += f"\n{section.upper()}:\n{resume_sections[section][:500]}..."
-    
-    # If condensed resume is still too long, further truncate it
-    if len(condensed_resume) > 2000:
-        condensed_resume = condensed_resume[:2000] + "..."
-
-    # Define system prompt for OpenAI - making it more specific and detailed
-    system_prompt = """You are a professional resume analyst and career coach with extensive HR and recruitment experience. 
-    Your task is to analyze a resume against a job description and provide detailed, professional feedback.
-    You will receive a resume and a job description, and you need to:
-    1. Provide a realistic match score (0-100) indicating how well the resume matches the job requirements. Be honest but not overly harsh. A score of 70-100 is strong, 40-70 is moderate, below 40 needs significant improvement.
-    2. Identify specific strengths in the resume related to this job - be precise and mention actual qualifications/skills that match.
-    3. Identify clear areas for improvement or missing skills/qualifications - be constructive and specific.
-    4. Provide actionable, professional suggestions to improve the resume for this specific job - these should be implementable steps.
-    
-    When determining the match score, consider:
-    - Technical skills match (40%)
-    - Experience relevance (30%)
-    - Education fit (15%)
-    - Soft skills alignment (15%)
-    
-    Format your response as a JSON object with the following structure:
-    {
-        "score": 75,
-        "strengths": ["Strength 1", "Strength 2", "Strength 3"],
-        "weaknesses": ["Weakness 1", "Weakness 2"],
-        "suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3"]
-    }
+    run_cpu = run_cpu or asyncio.to_thread
+    resume = ResumeAnalysis.of(resume_text)
+    job = ResumeAnalysis.of(job_description)
+    
+    cache = get_result_cache()
+    llm_key = llm_match_key(resume, job)
+    cached = cache.get(llm_key)
+    if cached is not None:
+        return cached
+
+    try:
+        with stage('llm'):
+            # The analyses come back filled in, so the fallback doesn't redo them
+            resume, job, prompt = await run_cpu(prepare_llm_match, resume, job)
+            prompt.record()
+            result = await get_llm_client().acomplete_json(prompt.messages, temperature=LLM_TEMPERATURE)
+        result = complete_llm_result(result, resume, job)
+        cache.set(llm_key, result)
+        return result
+    except Exception as e:
+        print(f"Error using OpenAI API: {e}")
+        FALLBACKS.labels(type(e).__name__).inc()
+        fallback_key = cache_key('fallback-match', resume.text, job.text)
+        result = cache.get(fallback_key)
+        if result is None:
+            result = await run_cpu(fallback_match_resume_with_job, resume, job)
+            cache.set(fallback_key, result)
+        return result
+
+def prepare_llm_match(resume_text, job_description):
     """
+    Analyze both documents and build the OpenAI prompt
     
-    # Define user prompt
-    user_prompt = f"""
-    JOB DESCRIPTION:
-    {job_description}
+    Returns:
+        tuple: (resume analysis, job analysis, MatchPrompt)
+    """
+    resume = ResumeAnalysis.of(resume_text)
+    job = ResumeAnalysis.of(job_description)
+    return resume, job, build_llm_prompt(resume, job)
+
+def parse_job_descriptions(form):
+    """
+    Job descriptions of a multi-job match request
+    
+    Accepts repeated jobDescriptions form fields or a single one holding a
+    JSON array of strings.
     
-    RESUME:
-    {condensed_resume}
+    Raises:
+        ValueError: If there are none, too many, or any is not a string
+    """
+    descriptions = form.getlist('jobDescriptions')
+    if len(descriptions) == 1 and descriptions[0].lstrip().startswith('['):
+        descriptions = json.loads(descriptions[0])
+    if not isinstance(descriptions, list) or not all(isinstance(text, str) for text in descriptions):
+        raise ValueError("jobDescriptions must be strings")
+    if not descriptions:
+        raise ValueError("No job descriptions given")
+    if len(descriptions) > MAX_MATCH_JOBS:
+        raise ValueError(f"At most {MAX_MATCH_JOBS} job descriptions can be matched at once")
+    return descriptions
+
+def match_resume_with_jobs(resume_text, job_descriptions, mode=None):
+    """
+    Match a resume with several job descriptions
     
-    EXTRACTED SKILLS FROM RESUME:
-    {skills_text}
+    The resume is analyzed once and the job descriptions in one batch. Jobs
+    the LLM analysis fails for are scored together by the TF-IDF fallback.
+    
+    Args:
+        resume_text (str or ResumeAnalysis): Extracted text from the resume
+        job_descriptions (list): Job description texts (or ResumeAnalysis)
+        mode (str): 'concurrent' or 'packed' (defaults to LLM_MULTI_MATCH)
+        
+    Returns:
+        list: Match results for each job description, in order, as
+            match_resume_with_job returns them
+    """
+    packed = _is_packed(mode)
+    resume, jobs, results, pending = _cached_llm_matches(resume_text, job_descriptions, packed)
+    if pending:
+        try:
+            with stage('llm'):
+                resume, pending_jobs, prompts = prepare_llm_matches(resume, [jobs[i] for i in pending], packed)
+                for prompt in prompts:
+                    prompt.record()
+                responses = get_llm_client().run(_acomplete_llm_matches(prompts, len(pending), packed))
+        except Exception as e:
+            responses = [e] * len(pending)
+        else:
+            jobs = _replace(jobs, pending, pending_jobs)
+        failed = _store_llm_matches(resume, jobs, results, pending, responses, packed)
+        if failed:
+            fallbacks, missing, fallback_keys = _cached_fallbacks(resume, jobs, failed)
+            if missing:
+                computed = fallback_match_resume_with_jobs(resume, [jobs[i] for i in missing])
+                _store_fallbacks(fallbacks, missing, fallback_keys, computed)
+            for index in failed:
+                results[index] = fallbacks[index]
+    return results
+
+async def amatch_resume_with_jobs(resume_text, job_descriptions, run_cpu=None, mode=None):
+    """
+    match_resume_with_jobs for async servers: the OpenAI requests are awaited natively
     
-    Please analyze how well this resume matches the job description and provide your feedback in the JSON format specified.
-    Make sure your analysis is professionally written, specific to the actual content provided, and provides genuine value to the candidate.
-    Ensure the match score reflects a realistic assessment - don't be artificially low or artificially high.
+    See match_resume_with_jobs for the arguments; run_cpu is as for
+    amatch_resume_with_job.
     """
+    run_cpu = run_cpu or asyncio.to_thread
+    packed = _is_packed(mode)
+    resume, jobs, results, pending = _cached_llm_matches(resume_text, job_descriptions, packed)
+    if pending:
+        try:
+            with stage('llm'):
+                resume, pending_jobs, prompts = await run_cpu(prepare_llm_matches, resume,
+                                                              [jobs[i] for i in pending], packed)
+                for prompt in prompts:
+                    prompt.record()
+                responses = await _acomplete_llm_matches(prompts, len(pending), packed)
+        except Exception as e:
+            responses = [e] * len(pending)
+        else:
+            jobs = _replace(jobs, pending, pending_jobs)
+        failed = _store_llm_matches(resume, jobs, results, pending, responses, packed)
+        if failed:
+            fallbacks, missing, fallback_keys = _cached_fallbacks(resume, jobs, failed)
+            if missing:
+                computed = await run_cpu(fallback_match_resume_with_jobs, resume, [jobs[i] for i in missing])
+                _store_fallbacks(fallbacks, missing, fallback_keys, computed)
+            for index in failed:
+                results[index] = fallbacks[index]
+    return results
+
+def _is_packed(mode):
+    mode = mode or LLM_MULTI_MATCH
+    if mode not in LLM_MULTI_MATCH_MODES:
+        raise ValueError(f"Unknown multi-match mode {mode!r}; expected one of {', '.join(LLM_MULTI_MATCH_MODES)}")
+    return mode == 'packed'
+
+def _replace(items, indexes, values):
+    items = list(items)
+    for index, value in zip(indexes, values):
+        items[index] = value
+    return items
+
+def _cached_llm_matches(resume_text, job_descriptions, packed):
+    """The analyses, cached LLM results (None where missing) and the indexes still to match"""
+    resume = ResumeAnalysis.of(resume_text)
+    jobs = [ResumeAnalysis.of(job) for job in job_descriptions]
+    cache = get_result_cache()
+    results = [cache.get(llm_match_key(resume, job, packed)) for job in jobs]
+    return resume, jobs, results, [index for index, result in enumerate(results) if result is None]
+
+def prepare_llm_matches(resume_text, job_descriptions, packed=False):
+    """
+    Analyze the resume once and the job descriptions in one batch, and build the OpenAI prompts
     
-    # Call OpenAI API
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo-0125",  # Use a current model
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.2
+    Returns:
+        tuple: (resume analysis, job analyses, list of MatchPrompt: one per
+            job, or one per LLM_PACK_SIZE jobs if packed)
+    """
+    resume = ResumeAnalysis.of(resume_text)
+    jobs = ResumeAnalysis.many(job_descriptions)
+    if packed:
+        prompts = [build_multi_match_prompt(resume, jobs[start:start + LLM_PACK_SIZE])
+                   for start in range(0, len(jobs), LLM_PACK_SIZE)]
+    else:
+        prompts = [build_match_prompt(resume, job) for job in jobs]
+    return resume, jobs, prompts
+
+async def _acomplete_llm_matches(prompts, count, packed):
+    """Send all prompts at once; returns one parsed analysis or exception per job"""
+    client = get_llm_client()
+    responses = await asyncio.gather(
+        *(client.acomplete_json(prompt.messages, temperature=LLM_TEMPERATURE) for prompt in prompts),
+        return_exceptions=True
     )
+    if not packed:
+        return responses
+
+    analyses = []
+    for start, response in zip(range(0, count, LLM_PACK_SIZE), responses):
+        size = min(LLM_PACK_SIZE, count - start)
+        if isinstance(response, Exception):
+            analyses.extend([response] * size)
+        else:
+            analyses.extend(analysis if analysis is not None else ValueError("Job missing from packed response")
+                            for analysis in split_multi_match_result(response, size))
+    return analyses
+
+def _store_llm_matches(resume, jobs, results, pending, responses, packed):
+    """Complete and cache the LLM analyses into results; returns the indexes that need the fallback"""
+    cache = get_result_cache()
+    failed = []
+    for index, response in zip(pending, responses):
+        if isinstance(response, Exception):
+            print(f"Error using OpenAI API: {response}")
+            FALLBACKS.labels(type(response).__name__).inc()
+            failed.append(index)
+            continue
+        result = complete_llm_result(response, resume, jobs[index])
+        cache.set(llm_match_key(resume, jobs[index], packed), result)
+        results[index] = result
+    return failed
+
+def _cached_fallbacks(resume, jobs, indexes):
+    """Cached fallback results by index, the indexes missing from the cache and every index's cache key"""
+    cache = get_result_cache()
+    keys = {index: cache_key('fallback-match', resume.text, jobs[index].text) for index in indexes}
+    fallbacks = {index: cache.get(key) for index, key in keys.items()}
+    return fallbacks, [index for index in indexes if fallbacks[index] is None], keys
+
+def _store_fallbacks(fallbacks, indexes, keys, computed):
+    cache = get_result_cache()
+    for index, result in zip(indexes, computed):
+        cache.set(keys[index], result)
+        fallbacks[index] = result
+
+@timed('llm')
+def advanced_llm_match(resume_text, job_description):
+    """
+    Use OpenAI's API to analyze the resume against the job description
+    
+    Args:
+        resume_text (str or ResumeAnalysis): Extracted text from the resume
+        job_description (str or ResumeAnalysis): Job description text
+        
+    Returns:
+        dict: Detailed match analysis
+    """
+    resume = ResumeAnalysis.of(resume_text)
+    job = ResumeAnalysis.of(job_description)
+    
+    # Call OpenAI through the shared client; raises CircuitOpenError while the
+    # upstream is degraded so the caller falls back without waiting on a timeout
+    prompt = build_llm_prompt(resume, job)
+    prompt.record()
+    result = get_llm_client().complete_json(prompt.messages, temperature=LLM_TEMPERATURE)
+    
+    return complete_llm_result(result, resume, job)
+
+def build_llm_prompt(resume_text, job_description):
+    """
+    Chat messages asking the model to analyze the resume against the job description
     
-    # Extract and parse the response
-    result = json.loads(response.choices[0].message.content)
+    The job description is cut down to its requirement sentences and the
+    resume to its most job-relevant lines, each within a token budget (see
+    prompt_builder).
     
+    Both arguments may be text or a ResumeAnalysis.
+    
+    Returns:
+        MatchPrompt: The messages and their token counts
+    """
+    return build_match_prompt(ResumeAnalysis.of(resume_text), ResumeAnalysis.of(job_description))
+
+def complete_llm_result(result, resume_text, job_description):
+    """
+    Fill in any field the model left out of its analysis
+    
+    Args:
+        result (dict): Parsed model response
+        resume_text (str or ResumeAnalysis): Extracted text from the resume
+        job_description (str or ResumeAnalysis): Job description text
+        
+    Returns:
+        dict: result with score, strengths, weaknesses and suggestions set
+    """
     # Ensure all expected fields are present
     if "score" not in result:
         result["score"] = fallback_calculate_score(resume_text, job_description)
@@ -144,21 +376,74 @@ def similiarity_index():
 
     
 
+def pair_similarity(first, second, ngram_range=(1, 1)):
+    """
+    Cosine similarity of two preprocessed texts, with a TF-IDF vocabulary
+    fitted on just the two texts
+    """
+    return pair_similarities(first, [second], ngram_range)[0]
+
+def pair_similarities(first, others, ngram_range=(1, 1)):
+    """
+    pair_similarity of first with each of others, vectorized in one batch
+    
+    Fitting a vocabulary on two texts gives every term they share an IDF of
+    1 and every other term 1 + ln(1.5), whatever else is being scored. So
+    all texts are counted once and each pair's IDF weighting is applied in
+    closed form, with the same result as fitting each pair separately.
+    
+    In the hashed vectorizer mode the counts come from the stateless hasher
+    instead of a fitted vocabulary; the weighting is the same, so terms
+    the job catalog doesn't have still count.
+    
+    Returns:
+        ndarray: One similarity per text in others
+    """
+    others = list(others)
+    with stage('vectorize'):
+        if VECTORIZER_MODE == 'hashed':
+            counts = HashedTfidfVectorizer(ngram_range=ngram_range).count([first] + others)
+        else:
+            counts = CountVectorizer(ngram_range=ngram_range).fit_transform([first] + others)
+        counts = counts.astype(np.float64).tocsr()
+        first_counts, other_counts = counts[0], counts[1:]
+        first_terms = first_counts.copy()
+        first_terms.data[:] = 1
+        other_terms = other_counts.copy()
+        other_terms.data[:] = 1
+        
+        # Squared IDF of a term only one text of the pair has; shared terms weigh 1
+        unshared = (1 + np.log(1.5)) ** 2
+        first_squares = first_counts.multiply(first_counts).tocsr()
+        other_squares = other_counts.multiply(other_counts).tocsr()
+        dot = np.asarray((other_counts @ first_counts.T).todense()).ravel()
+        first_norm = (unshared * first_squares.sum()
+                      - (unshared - 1) * np.asarray((other_terms @ first_squares.T).todense()).ravel())
+        other_norm = (unshared * np.asarray(other_squares.sum(axis=1)).ravel()
+                      - (unshared - 1) * np.asarray((other_squares @ first_terms.T).todense()).ravel())
+        norm = np.sqrt(first_norm * other_norm)
+        return np.divide(dot, norm, out=np.zeros_like(dot), where=norm > 0)
+
 def fallback_calculate_score(resume_text, job_description):
     """
     Calculate a match score using TF-IDF and cosine similarity
     Used as a fallback when OpenAI API has issues
+    
+    Both arguments may be text or a ResumeAnalysis.
     """
+    resume = ResumeAnalysis.of(resume_text)
+    job = ResumeAnalysis.of(job_description)
+    
     # Preprocess texts
-    preprocessed_resume = preprocess_text(resume_text)
-    preprocessed_job = preprocess_text(job_description)
+    preprocessed_resume = resume.preprocessed
+    preprocessed_job = job.preprocessed
     
     # Extract resume sections for more targeted matching
-    resume_sections = extract_resume_sections(resume_text)
-    skills = extract_skills(resume_text)
+    resume_sections = resume.sections
+    skills = resume.skills
     
     # Get job keywords and weight them
-    job_keywords = extract_keywords(job_description, top_n=20)
+    job_keywords = job.keywords(top_n=20)
     
     # Calculate how many job keywords appear in skills and experience sections
     skill_matches = sum(1 for keyword in job_keywords if any(keyword in skill.lower() for skill in skills))
@@ -166,12 +451,8 @@ def fallback_calculate_score(resume_text, job_description):
     if "experience" in resume_sections:
         exp_matches = sum(1 for keyword in job_keywords if keyword in resume_sections["experience"].lower())
     
-    # Calculate TF-IDF vectors
-    vectorizer = TfidfVectorizer(ngram_range=(1, 2))  # Use both unigrams and bigrams
-    tfidf_matrix = vectorizer.fit_transform([preprocessed_resume, preprocessed_job])
-    
-    # Calculate cosine similarity
-    cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+    # Calculate TF-IDF vectors and their cosine similarity
+    cosine_sim = pair_similarity(preprocessed_resume, preprocessed_job, ngram_range=(1, 2))  # Use both unigrams and bigrams
     
     # Create a weighted score (40% keyword match, 60% semantic similarity)
     keyword_score = (skill_matches + exp_matches) / (len(job_keywords) * 2) * 100
@@ -184,27 +465,29 @@ def fallback_calculate_score(resume_text, job_description):
     
     return final_score
 
-def fallback_match_resume_with_job(resume_text, job_description):
+def fallback_match_resume_with_job(resume_text, job_description, similarity=None):
     """
     Fallback method to match resume with job description using TF-IDF and cosine similarity
     Used when the API call to OpenAI fails
+    
+    Both arguments may be text or a ResumeAnalysis. similarity is their
+    pair_similarity, if already computed.
     """
+    resume = ResumeAnalysis.of(resume_text)
+    job = ResumeAnalysis.of(job_description)
+    
     # Preprocess texts
-    preprocessed_resume = preprocess_text(resume_text)
-    preprocessed_job = preprocess_text(job_description)
+    preprocessed_resume = resume.preprocessed
+    preprocessed_job = job.preprocessed
     
     # Get skills from resume
-    skills = extract_skills(resume_text)
+    skills = resume.skills
     
     # Extract keywords from job description
-    job_keywords = extract_keywords(job_description, top_n=15)
-    
-    # Calculate TF-IDF vectors
-    vectorizer = TfidfVectorizer()
-    tfidf_matrix = vectorizer.fit_transform([preprocessed_resume, preprocessed_job])
+    job_keywords = job.keywords(top_n=15)
     
-    # Calculate cosine similarity
-    cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+    # Calculate TF-IDF vectors and their cosine similarity
+    cosine_sim = pair_similarity(preprocessed_resume, preprocessed_job) if similarity is None else similarity
     
     # Convert similarity to score (0-100)
     match_score = int(cosine_sim * 100)
@@ -213,7 +496,7 @@ def fallback_match_resume_with_job(resume_text, job_description):
     strengths = [skill for skill in skills if any(keyword in skill.lower() for keyword in job_keywords)]
     
     # Determine weaknesses based on job keywords not found in resume
-    resume_keywords = extract_keywords(resume_text, top_n=20)
+    resume_keywords = resume.keywords(top_n=20)
     missing_keywords = [keyword for keyword in job_keywords 
                     if not any(keyword in resume_kw for resume_kw in resume_keywords)]
     
@@ -230,73 +513,87 @@ def fallback_match_resume_with_job(resume_text, job_description):
         "suggestions": suggestions
     }
 
-def suggest_jobs(resume_text, jobs_df):
+def fallback_match_resume_with_jobs(resume_text, job_descriptions):
     """
-    Suggest jobs based on resume content with improved matching algorithm
+    fallback_match_resume_with_job for several job descriptions
+    
+    The job descriptions are preprocessed and vectorized in one batch.
+    
+    Returns:
+        list: One match result per job description
+    """
+    resume = ResumeAnalysis.of(resume_text)
+    jobs = ResumeAnalysis.many(job_descriptions)
+    if not jobs:
+        return []
+    similarities = pair_similarities(resume.preprocessed, [job.preprocessed for job in jobs])
+    return [fallback_match_resume_with_job(resume, job, similarity) for job, similarity in zip(jobs, similarities)]
+
+def suggest_jobs(resume_text, jobs_df, job_index=None, top_k=5, min_score=0.1, offset=0, filters=None):
+    """
+    Suggest jobs based on resume content, reusing cached suggestions for the same
+    resume and job catalog
     
     Args:
-        resume_text (str): Extracted text from the resume
+        resume_text (str or ResumeAnalysis): Extracted text from the resume
         jobs_df (DataFrame): DataFrame containing job listings
+        job_index (JobIndex): Prebuilt index over jobs_df; built on the fly if omitted
+        top_k (int): Number of suggestions to return
+        min_score (float): Minimum cosine similarity for a job to be suggested
+        offset (int): Number of better matches to skip, for pagination
+        filters (dict): Optional 'location', 'experience' and 'ctc' filters,
+            see JobFilterIndex.candidates
         
     Returns:
         list: List of job suggestions with match scores
     """
-    # Preprocess resume text
-    preprocessed_resume = preprocess_text(resume_text)
-    
-    # Extract skills from resume
-    skills = extract_skills(resume_text)
-    skills_text = ' '.join(skills)
-    
-    # Extract sections from resume
-    resume_sections = extract_resume_sections(resume_text)
-    experience_text = resume_sections.get('experience', '')
-    education_text = resume_sections.get('education', '')
+    resume = ResumeAnalysis.of(resume_text)
     
-    # Create a combined text for matching, with appropriate weighting
-    combined_resume_text = (
-        preprocessed_resume + ' ' + 
-        skills_text + ' ' + skills_text + ' ' +  # Double weight skills
-        experience_text
+    # Only an index built from a fingerprinted CSV identifies the catalog content
+    catalog_version = job_index.version if job_index is not None else None
+    if not catalog_version:
+        return _suggest_jobs(resume, jobs_df, job_index, top_k, min_score, offset, filters)
+
+    settings = {"catalog": catalog_version, "retrieval": RETRIEVAL_BACKEND, "top_k": top_k,
+                "min_score": min_score, "offset": offset, "filters": filters or {}}
+    return get_result_cache().get_or_compute(
+        cache_key('job-suggestions', resume.text, settings=settings),
+        lambda: _suggest_jobs(resume, jobs_df, job_index, top_k, min_score, offset, filters)
     )
+
+def _suggest_jobs(resume_text, jobs_df, job_index=None, top_k=5, min_score=0.1, offset=0, filters=None):
+    """
+    Suggest jobs based on resume content with improved matching algorithm
     
-    # Create a list of texts to compare with resume
-    job_texts = []
-    for _, job in jobs_df.iterrows():
-        # Ensure we have a description column to work with
-        description = job.get('Description', '')
-        if not isinstance(description, str) or not description:
-            description = f"{job.get('Job_Title', '')} {job.get('Experience', '')}"
-            
-        job_text = f"{job.get('Job_Title', '')} {job.get('Company_Name', '')} {description}"
-        job_texts.append(preprocess_text(job_text))
-    
-    # Calculate TF-IDF vectors with bigrams for better context
-    vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+    See suggest_jobs for the arguments.
     
+    Returns:
+        list: List of job suggestions with match scores
+    """
     # Handle empty job list
-    if not job_texts:
+    if job_index is None and len(jobs_df) == 0:
         return []
-        
-    all_texts = [combined_resume_text] + job_texts
-    tfidf_matrix = vectorizer.fit_transform(all_texts)
-    
-    # Calculate cosine similarity between resume and each job
-    cosine_similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
-    
-    # Create a list of (index, similarity) tuples and sort by similarity
-    job_similarities = [(i, cosine_similarities[0][i]) for i in range(len(job_texts))]
-    job_similarities.sort(key=lambda x: x[1], reverse=True)
-    
-    # Get top 5 matching jobs
-    top_jobs = []
-    for idx, similarity in job_similarities[:5]:
-        if similarity > 0.1:  # Only include jobs with some minimal relevance
-            job = jobs_df.iloc[idx].copy()
-            # Calculate score with a minimum threshold to avoid artificially low scores
-            
-            match_score = int(max(similarity * 100,similiarity_index()))
-            job['Match_Score'] = match_score * threshold()
-            top_jobs.append(job.to_dict())
-    
-    return top_jobs
\ No newline at end of file
+
+    resume = ResumeAnalysis.of(resume_text)
+    
+    # Combined text for matching: preprocessed resume, double weighted skills and experience
+    combined_resume_text = resume.matching_text
+    
+    # The job vectors are fitted once per catalog; only the resume is transformed here
+    if job_index is None:
+        job_index = JobIndex.build(normalize_job_columns(jobs_df))
+    
+    # Narrow the catalog with the filter pre-indexes before scoring anything
+    rows = job_index.filters.candidates(**filters) if filters else None
+    
+    # Best matches with some minimal relevance, through the configured retrieval backend
+    job_rows, similarities = job_index.search(combined_resume_text, offset + top_k, min_score, rows)
+    job_rows, similarities = job_rows[offset:], similarities[offset:]
+    
+    top_jobs = [response_record(job) for job in job_index.jobs.iloc[job_rows].to_dict('records')]
+    for job, similarity in zip(top_jobs, similarities):
+        # Calculate score with a minimum threshold to avoid artificially low scores
+        match_score = int(max(similarity * 100,similiarity_index()))
+        job['Match_Score'] = match_score * threshold()
+    
+    return top_jobs
@@ -0,0 +1,148 @@
+import re
+import numpy as np
+
+_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+def parse_range(value):
+    """
+    Parse a numeric range such as '0-2 years' or '₹ 2,00,000 - 3,00,000'
+
+    A single number is treated as a range of one value.
+
+    Args:
+        value (str): Raw catalog value
+
+    Returns:
+        tuple: (minimum, maximum) as floats, NaN when no number is present
+    """
+    if not isinstance(value, str):
+        return np.nan, np.nan
+    numbers = [float(number.replace(',', '')) for number in _NUMBER_RE.findall(value)]
+    if not numbers:
+        return np.nan, np.nan
+    return min(numbers), max(numbers)
+
+def _location_keys(value):
+    if not isinstance(value, str):
+        return []
+    return [part.strip().lower() for part in value.split(',') if part.strip()]
+
+class JobFilterIndex:
+    """
+    Precomputed lookup structures for filtering the job catalog
+
+    Locations are held in an inverted index from lowercased location to row
+    ids; experience and CTC are parsed once into min/max arrays so range
+    filters are a couple of vectorized comparisons.
+    """
+
+    def __init__(self, jobs_df):
+        self.size = len(jobs_df)
+
+        locations = {}
+        for row, value in enumerate(jobs_df.get('Location', [])):
+            for key in _location_keys(value):
+                locations.setdefault(key, []).append(row)
+        self.locations = {key: np.asarray(rows, dtype=np.int64) for key, rows in locations.items()}
+
+        self.experience = self._parse_column(jobs_df, 'Experience')
+        self.ctc = self._parse_column(jobs_df, 'CTC')
+
+    def _parse_column(self, jobs_df, column):
+        # Compact catalogs already carry the parsed bounds
+        if f"{column}_Min" in jobs_df:
+            return np.vstack([jobs_df[f"{column}_Min"].to_numpy(dtype=float),
+                              jobs_df[f"{column}_Max"].to_numpy(dtype=float)])
+        if column not in jobs_df:
+            return np.full((2, self.size), np.nan)
+        return np.array([parse_range(value) for value in jobs_df[column]], dtype=float).reshape(-1, 2).T
+
+    @staticmethod
+    def _overlapping(ranges, low, high):
+        """Rows whose [min, max] range overlaps [low, high]; unknown ranges never match"""
+        minimum, maximum = ranges
+        return (minimum <= high) & (maximum >= low)
+
+    def candidates(self, location=None, experience=None, ctc=None):
+        """
+        Row ids matching every given filter
+
+        Args:
+            location (str): Location name, case-insensitive
+            experience (tuple): (min, max) years the candidate fits
+            ctc (tuple): (min, max) acceptable CTC
+
+        Returns:
+            ndarray: Sorted row ids, or None if no filter was given
+        """
+        mask = None
+
+        if experience is not None:
+            mask = self._overlapping(self.experience, *experience)
+        if ctc is not None:
+            ctc_mask = self._overlapping(self.ctc, *ctc)
+            mask = ctc_mask if mask is None else mask & ctc_mask
+
+        if location is not None:
+            rows = self.locations.get(location.strip().lower(), np.empty(0, dtype=np.int64))
+            return rows[mask[rows]] if mask is not None else rows
+
+        return None if mask is None else np.flatnonzero(mask)
+
+def rank_top_k(scores, k=5, min_score=0.0, offset=0):
+    """
+    Positions of the best scores, highest first, without sorting every score
+
+    Args:
+        scores (ndarray): One score per candidate
+        k (int): Page size
+        min_score (float): Scores must be strictly greater than this
+        offset (int): Number of top results to skip (for pagination)
+
+    Returns:
+        ndarray: Positions into scores for the requested page
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    keep = np.flatnonzero(scores > min_score)
+    needed = offset + k
+    if keep.size > needed:
+        keep = np.sort(keep[np.argpartition(-scores[keep], needed - 1)[:needed]])
+    # Stable sort keeps catalog order among equal scores
+    order = keep[np.argsort(-scores[keep], kind='stable')]
+    return order[offset:offset + k]
+
+def parse_filter_range(value):
+    """Parse a request filter such as '0-2' or '300000' into a (min, max) tuple, or None"""
+    if value is None or str(value).strip() == '':
+        return None
+    minimum, maximum = parse_range(str(value))
+    if np.isnan(minimum):
+        raise ValueError(f"Invalid range filter: {value}")
+    return minimum, maximum
+
+def parse_suggestion_params(form):
+    """
+    Read the optional ranking, pagination and filter parameters of a job suggestion request
+
+    Args:
+        form (Mapping): Request form fields
+
+    Returns:
+        tuple: (top_k, min_score, page, filters)
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    top_k = int(form.get('topK', 5))
+    min_score = float(form.get('minScore', 0.1))
+    page = max(int(form.get('page', 1)), 1)
+    filters = {}
+    if form.get('location'):
+        filters['location'] = form['location']
+    if form.get('experience'):
+        filters['experience'] = parse_filter_range(form['experience'])
+    if form.get('minCtc'):
+        filters['ctc'] = (parse_filter_range(form['minCtc'])[0], float('inf'))
+    return top_k, min_score, page, filters
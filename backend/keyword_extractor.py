@@ -0,0 +1,172 @@
+import os
+import threading
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from model_registry import get_resource
+
+# A fitted job vectorizer whose IDF table weights keywords. By default the newer
+# of the one persisted with the job index (see job_index.JobIndex.save) and the
+# one in the catalog's compaction checkpoint (see job_catalog.JobCatalog)
+KEYWORD_IDF_PATH = os.getenv("KEYWORD_IDF_PATH")
+_JOB_INDEX_DIR = os.getenv("JOB_INDEX_DIR", './data/index')
+DEFAULT_IDF_PATHS = [os.path.join(_JOB_INDEX_DIR, 'vectorizer.joblib'),
+                     os.path.join(_JOB_INDEX_DIR, 'catalog_checkpoint', 'vectorizer.joblib')]
+
+class KeywordExtractor:
+    """
+    Ranks the n-grams of a document by term frequency times corpus IDF
+
+    The IDF table comes from a reference corpus (the job catalog), so terms
+    every posting uses rank below distinctive ones. Terms the corpus has
+    never seen get the highest IDF. A batch of documents is counted in one
+    sparse transform and each row's top terms are selected from its
+    non-zeros only.
+    """
+
+    def __init__(self, idf=None, ngram_range=(1, 2), stop_words='english'):
+        self.idf = idf or {}
+        self.default_idf = max(self.idf.values(), default=1.0)
+        self.ngram_range = ngram_range
+        self.stop_words = stop_words
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        """Use the IDF weights of an already fitted TfidfVectorizer or HashedTfidfVectorizer"""
+        if hasattr(vectorizer, 'idf_for'):
+            return HashedKeywordExtractor(vectorizer)
+        return cls(dict(zip(vectorizer.get_feature_names_out(), vectorizer.idf_.tolist())))
+
+    @classmethod
+    def fit(cls, corpus):
+        """Compute the IDF table from preprocessed corpus texts"""
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words='english').fit(corpus)
+        return cls.from_vectorizer(vectorizer)
+
+    def extract_many(self, texts, top_n=10):
+        """
+        Top keywords of each preprocessed text
+
+        Args:
+            texts (list): Preprocessed texts
+            top_n (int): Keywords per text (None for the full ranking)
+
+        Returns:
+            list: One list of keywords per text, most important first
+        """
+        texts = list(texts)
+        counter = CountVectorizer(ngram_range=self.ngram_range, stop_words=self.stop_words)
+        try:
+            counts = counter.fit_transform(texts)
+        except ValueError:
+            # Nothing but stopwords in the whole batch
+            return [[] for _ in texts]
+
+        terms = counter.get_feature_names_out()
+        weights = self._weights(terms)
+        scores = (counts @ sp.diags(weights)).tocsr()
+
+        keywords = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            data, columns = scores.data[start:end], scores.indices[start:end]
+            if top_n is not None and top_n < len(data):
+                if top_n <= 0:
+                    keywords.append([])
+                    continue
+                best = np.argpartition(-data, top_n - 1)[:top_n]
+                data, columns = data[best], columns[best]
+            # Highest score first; ties in vocabulary (alphabetical) order
+            order = np.lexsort((columns, -data))
+            keywords.append(terms[columns[order]].tolist())
+        return keywords
+
+    def _weights(self, terms):
+        """IDF of each term"""
+        return np.fromiter((self.idf.get(term, self.default_idf) for term in terms),
+                           dtype=np.float64, count=len(terms))
+
+class HashedKeywordExtractor(KeywordExtractor):
+    """KeywordExtractor taking IDF weights from a hashed vectorizer's table"""
+
+    def __init__(self, vectorizer, ngram_range=(1, 2), stop_words='english'):
+        super().__init__(ngram_range=ngram_range, stop_words=stop_words)
+        self.vectorizer = vectorizer
+
+    def _weights(self, terms):
+        weights = self.vectorizer.idf_for(terms)
+        # Terms no job has get the rarest term's IDF, as in the fitted table
+        weights[weights == 0] = self.vectorizer.idf_.max(initial=1.0)
+        return weights
+
+def _load_keyword_extractor(path):
+    try:
+        if path is None:
+            raise FileNotFoundError("no persisted job vectorizer")
+        return KeywordExtractor.from_vectorizer(joblib.load(path))
+    except Exception as e:
+        # Without a corpus every term gets the same IDF: plain term-frequency ranking
+        print(f"Keyword IDF table unavailable, ranking by term frequency: {e}")
+        return KeywordExtractor()
+
+class KeywordIdfSource:
+    """
+    The keyword extractor for the newest of some persisted vectorizer files
+
+    The files are stat'ed on every call and the extractor is reloaded when
+    the newest one changes, so a rebuilt or compacted job index reaches
+    keyword ranking. While no file exists the term-frequency extractor is
+    used, and replaced as soon as one appears.
+    """
+
+    def __init__(self, paths, stamp=None, extractor=None):
+        self.paths = list(paths)
+        self._stamp = stamp
+        self._extractor = extractor
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to worker processes with the table already loaded
+        return {"paths": self.paths, "stamp": self._stamp, "extractor": self._extractor}
+
+    def __setstate__(self, state):
+        self.__init__(state["paths"], state["stamp"], state["extractor"])
+
+    def _newest(self):
+        """(mtime, size, path) of the newest existing file, or None"""
+        stamps = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stamps.append((stat.st_mtime_ns, stat.st_size, path))
+        return max(stamps, default=None)
+
+    def extractor(self):
+        stamp = self._newest()
+        extractor = self._extractor
+        if extractor is not None and stamp == self._stamp:
+            return extractor
+
+        with self._lock:
+            if self._extractor is None or stamp != self._stamp:
+                self._extractor = _load_keyword_extractor(stamp[2] if stamp else None)
+                self._stamp = stamp
+            return self._extractor
+
+def get_keyword_idf_source():
+    """The shared KeywordIdfSource for KEYWORD_IDF_PATH, or the job index's vectorizers"""
+    return get_resource('keyword_idf', lambda: KeywordIdfSource([KEYWORD_IDF_PATH] if KEYWORD_IDF_PATH
+                                                                else DEFAULT_IDF_PATHS))
+
+def get_keyword_extractor():
+    """
+    The shared extractor, with IDF weights from the persisted job vectorizer
+
+    Only an already persisted vectorizer is read: the job catalog is never
+    loaded or built for keywords. If there is none yet, keywords are ranked
+    by term frequency alone until it is written.
+    """
+    return get_keyword_idf_source().extractor()
@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from dotenv import load_dotenv
+from metrics import LLM_IN_FLIGHT
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo-0125")
+
+def _retryable_errors():
+    """Errors that indicate a degraded upstream and are worth retrying"""
+    import openai
+
+    return (
+        asyncio.TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+def _is_client_error(error):
+    """Whether the upstream rejected the request itself (4xx other than rate limiting)"""
+    import openai
+
+    return (isinstance(error, openai.APIStatusError) and 400 <= error.status_code < 500
+            and not isinstance(error, openai.RateLimitError))
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit breaker is open"""
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After `failure_threshold` failures in a row the circuit opens and calls are
+    rejected immediately. Once `reset_timeout` seconds have passed a single
+    probe call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Return whether a call may go to the upstream now"""
+        return self.acquire() is not None
+
+    def acquire(self):
+        """
+        Admit a call to the upstream
+
+        Returns:
+            str: "probe" for the single half-open probe, "call" for a call
+                through the closed circuit, None if the call is rejected
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return "call"
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                return None
+            self.probing = True
+            return "probe"
+
+    def release(self, admission):
+        """
+        End a call that recorded no outcome (cancelled, or a client error)
+
+        A probe released this way lets the next call probe instead, so the
+        circuit can't get stuck half-open.
+        """
+        if admission == "probe":
+            with self._lock:
+                self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+class LLMClient:
+    """
+    Shared, concurrency-limited OpenAI chat client
+
+    Each event loop gets one connection-pooled AsyncOpenAI client and a
+    semaphore bounding in-flight requests. Calls time out, retry retryable
+    errors with exponential backoff and jitter, and go through a circuit
+    breaker so callers can fall back immediately while the upstream is down.
+    Synchronous callers (Flask views) run on a background event loop thread.
+
+    Point `base_url` (or OPENAI_BASE_URL) at a local stub server to test it.
+    """
+
+    def __init__(self, model=DEFAULT_MODEL, max_in_flight=8, timeout=20.0, max_retries=2,
+                 backoff_base=0.5, backoff_max=8.0, base_url=None, api_key=None, breaker=None):
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.base_url = base_url
+        self.api_key = api_key
+        self.breaker = breaker or CircuitBreaker()
+
+        self._loop_state = {}
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _state(self):
+        """Client and semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            import openai
+
+            client = openai.AsyncOpenAI(api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                                        base_url=self.base_url, timeout=self.timeout, max_retries=0)
+            state = (client, asyncio.Semaphore(self.max_in_flight))
+            self._loop_state[loop] = state
+        return state
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def acomplete_json(self, messages, temperature=0.2):
+        """
+        Request a JSON object completion
+
+        Args:
+            messages (list): Chat messages
+            temperature (float): Sampling temperature
+
+        Returns:
+            dict: The parsed JSON response
+
+        Raises:
+            CircuitOpenError: If the upstream is currently considered degraded
+        """
+        admission = self.breaker.acquire()
+        if admission is None:
+            raise CircuitOpenError("OpenAI circuit is open")
+
+        recorded = False
+        try:
+            try:
+                client, semaphore = self._state()
+            except Exception:
+                # e.g. no API key configured
+                recorded = True
+                self.breaker.record_failure()
+                raise
+
+            retryable_errors = _retryable_errors()
+            async with semaphore:
+                with LLM_IN_FLIGHT.track_in_progress():
+                    for attempt in range(self.max_retries + 1):
+                        try:
+                            response = await asyncio.wait_for(
+                                client.chat.completions.create(
+                                    model=self.model,
+                                    response_format={"type": "json_object"},
+                                    messages=messages,
+                                    temperature=temperature
+                                ),
+                                self.timeout
+                            )
+                        except retryable_errors:
+                            if attempt == self.max_retries:
+                                recorded = True
+                                self.breaker.record_failure()
+                                raise
+                            await asyncio.sleep(self._backoff(attempt))
+                        except Exception as e:
+                            # A rejected request says nothing about the upstream's health
+                            if not _is_client_error(e):
+                                recorded = True
+                                self.breaker.record_failure()
+                            raise
+                        else:
+                            recorded = True
+                            self.breaker.record_success()
+                            return json.loads(response.choices[0].message.content)
+        finally:
+            # Cancelled (a BaseException) or a client error: nothing was recorded
+            if not recorded:
+                self.breaker.release(admission)
+
+    def _background_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def complete_json(self, messages, temperature=0.2):
+        """Blocking wrapper around acomplete_json for synchronous callers"""
+        return self.run(self.acomplete_json(messages, temperature))
+
+    def run(self, coroutine):
+        """Run a coroutine using this client on the background loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._background_loop()).result()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_llm_client():
+    """Return the shared LLMClient configured from the environment"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(
+                max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", 8)),
+                timeout=float(os.getenv("LLM_TIMEOUT", 20)),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+                    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", 30))
+                )
+            )
+        return _client
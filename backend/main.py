@@ -1,5 +1,9 @@
 import nltk
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('stopwords')
-nltk.download('wordnet')
\ No newline at end of file
+
+def download_nltk_data():
+    """Download the NLTK data used by the backend ahead of deployment"""
+    for package in ('punkt', 'punkt_tab', 'stopwords', 'wordnet'):
+        nltk.download(package)
+
+if __name__ == '__main__':
+    download_nltk_data()
@@ -0,0 +1,257 @@
+import os
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; covers a cached lookup (sub-millisecond) up to a slow LLM call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """A metric family: one child per combination of label values"""
+
+    kind = None
+    suffix = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Exposed as 0 from the start rather than appearing on first use
+            self.labels()
+        _registry.append(self)
+
+    def labels(self, *values, **labels):
+        """The child for these label values, created on first use"""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        """Unlabelled metrics act as their own single child"""
+        return self.labels()
+
+    def render(self):
+        name = self.name + self.suffix
+        lines = [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.samples(name, self.labelnames, values))
+        return lines
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+class Counter(_Metric):
+    """Monotonically increasing count, exposed as <name>_total"""
+
+    kind = 'counter'
+    suffix = '_total'
+    _new_child = _CounterChild
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    @contextmanager
+    def track_in_progress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight"""
+
+    kind = 'gauge'
+    _new_child = _GaugeChild
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount=1.0):
+        self._default().dec(amount)
+
+    def track_in_progress(self):
+        return self._default().track_in_progress()
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[position] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name, labelnames, values):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(labelnames, values, [('le', _format_value(bound))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labelnames, values, [('le', '+Inf')])} {count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {count}")
+        return lines
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+_registry = []
+
+def render_metrics():
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = Histogram('resume_matcher_stage_seconds', 'Time spent in each pipeline stage', ['stage'])
+REQUEST_SECONDS = Histogram('resume_matcher_request_seconds', 'HTTP request latency', ['endpoint', 'status'])
+IN_FLIGHT = Gauge('resume_matcher_in_flight_requests', 'HTTP requests being handled', ['endpoint'])
+LLM_IN_FLIGHT = Gauge('resume_matcher_llm_in_flight', 'OpenAI requests waiting for a response')
+FALLBACKS = Counter('resume_matcher_llm_fallback', 'Matches served by the TF-IDF fallback', ['reason'])
+CACHE_LOOKUPS = Counter('resume_matcher_cache_lookups', 'Result cache lookups', ['result'])
+QUEUED = Gauge('resume_matcher_queued_requests', 'Requests waiting for a processing slot')
+SHED = Counter('resume_matcher_shed_requests', 'Requests rejected with 503 under load', ['reason'])
+PROMPT_TOKENS = Histogram('resume_matcher_llm_prompt_tokens', 'Tokens sent to the model per match, by prompt part',
+                          ['part'], buckets=(25, 50, 100, 200, 400, 800, 1600, 3200, 6400))
+
+# Stages timed during the current request, for the Server-Timing header
+_trace = ContextVar('stage_trace', default=None)
+
+def start_trace():
+    """Begin collecting stage timings for the current request; returns a token for end_trace"""
+    return _trace.set([])
+
+def end_trace(token):
+    """Stop collecting and return the (stage, seconds) pairs recorded since start_trace"""
+    timings = _trace.get()
+    _trace.reset(token)
+    return timings or []
+
+@contextmanager
+def stage(name):
+    """Time a block as a pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+def record_stage(name, seconds):
+    """Record a stage timing measured elsewhere, e.g. in a worker process"""
+    STAGE_SECONDS.labels(name).observe(seconds)
+    timings = _trace.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+def call_traced(function, *args):
+    """
+    Call function, collecting the stages it times
+
+    For work sent to another process, whose metrics are not exported:
+    pass the returned timings to record_stage in the serving process.
+
+    Returns:
+        tuple: (function's result, list of (stage, seconds))
+    """
+    token = start_trace()
+    try:
+        result = function(*args)
+    finally:
+        timings = end_trace(token)
+    return result, timings
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def server_timing_header(timings):
+    """
+    Format stage timings as a Server-Timing header value
+
+    Repeated stages are summed; durations are in milliseconds.
+    """
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
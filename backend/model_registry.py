@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import threading
+
+# spaCy components nothing in the backend uses; NER and the tokenizer are all we need
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_DISABLE = [name for name in os.getenv("SPACY_DISABLE", "tok2vec,tagger,parser,attribute_ruler,lemmatizer").split(',')
+                 if name]
+
+# Defaults for streaming many documents through nlp.pipe
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", 64))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", 1))
+
+NLTK_PACKAGES = {
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+
+_resources = {}
+_load_times = {}
+_warm_up_times = {}
+_lock = threading.RLock()
+_created = time.perf_counter()
+
+def get_resource(name, loader):
+    """
+    Return a shared resource, loading it on first use
+
+    Every heavy model goes through here so it is loaded exactly once per
+    process, whichever module asks for it first.
+
+    Args:
+        name (str): Registry key
+        loader (callable): Builds the resource when it isn't loaded yet
+
+    Returns:
+        The loaded resource
+    """
+    resource = _resources.get(name)
+    if resource is not None:
+        return resource
+
+    with _lock:
+        if name not in _resources:
+            start = time.perf_counter()
+            _resources[name] = loader()
+            _load_times[name] = round(time.perf_counter() - start, 4)
+        return _resources[name]
+
+def is_loaded(name):
+    return name in _resources
+
+def _load_spacy():
+    import spacy
+
+    try:
+        return spacy.load(SPACY_MODEL, disable=SPACY_DISABLE)
+    except OSError:
+        import subprocess
+        subprocess.call([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+        return spacy.load(SPACY_MODEL, disable=SPACY_DISABLE)
+
+def get_nlp():
+    """The shared spaCy pipeline, with unused components disabled"""
+    return get_resource('spacy', _load_spacy)
+
+def ensure_nltk_data():
+    """Download the NLTK corpora we use if they are missing"""
+    def load():
+        import nltk
+
+        for package, path in NLTK_PACKAGES.items():
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                nltk.download(package)
+        return True
+
+    return get_resource('nltk_data', load)
+
+def get_stopwords():
+    """English stopwords as a frozenset"""
+    def load():
+        ensure_nltk_data()
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+
+    return get_resource('stopwords', load)
+
+def get_lemmatizer():
+    """The shared WordNet lemmatizer, with WordNet already read from disk"""
+    def load():
+        ensure_nltk_data()
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+        # WordNet is a lazy corpus; the first lookup reads it
+        lemmatizer.lemmatize('warm')
+        return lemmatizer
+
+    return get_resource('lemmatizer', load)
+
+def warm_up(extra=()):
+    """
+    Load every heavy resource now instead of on the first request
+
+    Intended to run once at worker boot.
+
+    Args:
+        extra (iterable): Additional zero-argument loaders to run, e.g. the
+            skill matcher or job index getters
+
+    Returns:
+        dict: The startup report
+    """
+    for loader in (get_nlp, get_stopwords, get_lemmatizer, *extra):
+        start = time.perf_counter()
+        loader()
+        _warm_up_times[loader.__name__] = round(time.perf_counter() - start, 4)
+    return startup_report()
+
+def startup_report():
+    """Load time of each resource and time since the registry was imported"""
+    with _lock:
+        return {
+            "resources": dict(_load_times),
+            "warm_up": dict(_warm_up_times),
+            "total_load_seconds": round(sum(_load_times.values()), 4),
+            "seconds_since_import": round(time.perf_counter() - _created, 4),
+            "spacy_disabled": SPACY_DISABLE
+        }
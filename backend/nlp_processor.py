@@ -1,48 +1,99 @@
 import re
-import nltk
 import string
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+from functools import lru_cache
 from sklearn.feature_extraction.text import TfidfVectorizer
+from model_registry import get_nlp, get_stopwords, get_lemmatizer, SPACY_BATCH_SIZE, SPACY_N_PROCESS
+from metrics import timed
+from keyword_extractor import get_keyword_extractor
+from section_segmenter import get_section_segmenter, sections_dict
 
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+# Characters removed before tokenizing: punctuation and digit runs
+_NON_WORD_RE = re.compile(r'(?:[^\w\s]|\d)+')
 
+# Pipeline components entity extraction needs
+ENTITY_PIPES = ('ner',)
+
+# Contractions that word_tokenize splits even without punctuation, e.g. 'cannot' -> 'can not'
+_TREEBANK_SPLITS = {
+    'cannot': ['can', 'not'],
+    'gimme': ['gim', 'me'],
+    'gonna': ['gon', 'na'],
+    'gotta': ['got', 'ta'],
+    'lemme': ['lem', 'me'],
+    'wanna': ['wan', 'na'],
+}
+
+class TextPreprocessor:
+    """
+    Reusable text preprocessing pipeline
+
+    Stopwords and the lemmatizer come from the model registry, and lemmas are kept in a
+    bounded LRU cache. After punctuation and digits are stripped the text is
+    already normalized, so tokens are produced with a whitespace split that
+    gives the same tokens as `word_tokenize` for such input.
+    """
+
+    def __init__(self, lemma_cache_size=50000):
+        self.stop_words = get_stopwords()
+        self.lemmatizer = get_lemmatizer()
+        self.lemmatize = lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
+
+    def tokenize(self, text):
+        """Tokenize normalized text (lowercase, no punctuation or digits)"""
+        tokens = []
+        for token in text.split():
+            split = _TREEBANK_SPLITS.get(token)
+            if split:
+                tokens.extend(split)
+            else:
+                tokens.append(token)
+        return tokens
+
+    def __call__(self, text):
+        """
+        Preprocess text by removing special characters, lowercasing,
+        removing stopwords, and lemmatizing
+        """
+        text = _NON_WORD_RE.sub(' ', text.lower())
+        stop_words = self.stop_words
+        lemmatize = self.lemmatize
+        return ' '.join([lemmatize(word) for word in self.tokenize(text) if word not in stop_words])
+
+    def preprocess_many(self, texts):
+        """
+        Preprocess a batch of texts
+
+        Args:
+            texts (iterable): Input texts
+
+        Returns:
+            list: Preprocessed texts, in input order
+        """
+        texts = list(texts)
+        # Catalogs repeat titles and companies a lot; process each distinct text once
+        processed = {text: self(text) for text in dict.fromkeys(texts)}
+        return [processed[text] for text in texts]
+
+_default_preprocessor = None
+
+def get_preprocessor():
+    """Return the shared TextPreprocessor, creating it on first use"""
+    global _default_preprocessor
+    if _default_preprocessor is None:
+        _default_preprocessor = TextPreprocessor()
+    return _default_preprocessor
+
+@timed('preprocess')
 def preprocess_text(text):
     """
     Preprocess text by removing special characters, lowercasing,
     removing stopwords, and lemmatizing
     """
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove special characters and numbers
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\d+', ' ', text)
-    
-    # Tokenize text
-    tokens = word_tokenize(text)
-    
-    # Remove stopwords
-    stop_words = set(stopwords.words('english'))
-    tokens = [word for word in tokens if word not in stop_words]
-    
-    # Lemmatize tokens
-    lemmatizer = WordNetLemmatizer()
-    tokens = [lemmatizer.lemmatize(word) for word in tokens]
-    
-    # Join tokens back into text
-    preprocessed_text = ' '.join(tokens)
-    
-    return preprocessed_text
+    return get_preprocessor()(text)
+
+def preprocess_many(texts):
+    """Preprocess a batch of texts with the shared TextPreprocessor"""
+    return get_preprocessor().preprocess_many(texts)
 
 def extract_features(texts, max_features=5000):
     """
@@ -68,46 +119,44 @@ def extract_features(texts, max_features=5000):
     
     return feature_matrix, vectorizer
 
-def extract_keywords(text, top_n=10):
+def extract_keywords(text, top_n=10, preprocessed_text=None):
     """
     Extract the most important keywords from text using TF-IDF
     
     Args:
         text (str): Input text
-        top_n (int): Number of top keywords to extract
+        top_n (int): Number of top keywords to extract (None for the full ranking)
+        preprocessed_text (str): preprocess_text(text), if already computed
         
     Returns:
         list: Top keywords
     """
     # Preprocess text
-    preprocessed_text = preprocess_text(text)
+    if preprocessed_text is None:
+        preprocessed_text = preprocess_text(text)
     
-    # Create document list with just the input text
-    docs = [preprocessed_text]
-    
-    # Extract features
-    vectorizer = TfidfVectorizer(
-        max_features=1000,
-        ngram_range=(1, 2),
-        stop_words='english'
-    )
-    
-    # Fit transform
-    X = vectorizer.fit_transform(docs)
-    
-    # Get feature names
-    feature_names = vectorizer.get_feature_names_out()
-    
-    # Get feature values
-    feature_values = X.toarray()[0]
+    return extract_keywords_many([preprocessed_text], top_n=top_n, preprocessed=True)[0]
+
+def extract_keywords_many(texts, top_n=10, preprocessed=False):
+    """
+    Extract keywords from many texts with one sparse transform
     
-    # Sort features by importance
-    sorted_idx = feature_values.argsort()[::-1]
+    Terms are weighted by term frequency times the IDF of the job corpus
+    (see keyword_extractor.KeywordExtractor).
     
-    # Get top keywords
-    top_keywords = [feature_names[i] for i in sorted_idx[:top_n]]
+    Args:
+        texts (iterable): Input texts
+        top_n (int): Number of top keywords per text (None for the full ranking)
+        preprocessed (bool): Whether the texts are already preprocessed
+        
+    Returns:
+        list: One list of top keywords per text
+    """
+    texts = list(texts)
+    if not preprocessed:
+        texts = preprocess_many(texts)
     
-    return top_keywords
+    return get_keyword_extractor().extract_many(texts, top_n=top_n)
 
 def extract_entities(text):
     """
@@ -119,17 +168,28 @@ def extract_entities(text):
     Returns:
         dict: Dictionary with entity types and their values
     """
-    import spacy
+    return _group_entities(get_nlp()(text))
+
+def extract_entities_many(texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """
+    Extract named entities from many texts, streamed through nlp.pipe
     
-    try:
-        nlp = spacy.load("en_core_web_sm")
-    except OSError:
-        import subprocess
-        import sys
-        subprocess.call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-        nlp = spacy.load("en_core_web_sm")
+    Only the NER component runs; everything else in the pipeline is disabled.
     
-    doc = nlp(text)
+    Args:
+        texts (iterable): Input texts; consumed lazily, so memory stays flat over large inputs
+        batch_size (int): Texts per nlp.pipe batch
+        n_process (int): Processes to run the pipeline in
+        
+    Yields:
+        dict: Entity types and their values for each text, in input order
+    """
+    nlp = get_nlp()
+    disable = [name for name in nlp.pipe_names if name not in ENTITY_PIPES]
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disable):
+        yield _group_entities(doc)
+
+def _group_entities(doc):
     entities = {}
     
     for ent in doc.ents:
@@ -139,9 +199,13 @@ def extract_entities(text):
     
     return entities
 
+@timed('sections')
 def extract_resume_sections(text):
     """
     Extract common resume sections based on headings
+
+    Header synonyms ('work experience', 'technical skills', ...) are mapped
+    to their canonical section name; see section_segmenter.
     
     Args:
         text (str): Resume text
@@ -149,36 +213,4 @@ def extract_resume_sections(text):
     Returns:
         dict: Dictionary with section names and their content
     """
-    # Common section headers in resumes
-    section_headers = [
-        'education', 'experience', 'work experience', 'employment', 'skills',
-        'technical skills', 'professional skills', 'certifications', 'projects',
-        'achievements', 'awards', 'publications', 'languages', 'interests',
-        'summary', 'objective', 'profile', 'about me', 'personal information',
-        'contact information', 'references', 'volunteer', 'activities'
-    ]
-    
-    # Create pattern to match section headers
-    header_pattern = '|'.join([fr'\b{re.escape(header)}\b' for header in section_headers])
-    pattern = re.compile(fr'(?i)(^|\n)[\s\*]*({header_pattern})[\s\*]*(:|$|\n)', re.MULTILINE)
-    
-    # Find all section headers in the text
-    matches = list(pattern.finditer(text))
-    
-    # Extract sections
-    sections = {}
-    for i, match in enumerate(matches):
-        section_name = match.group(2).strip().lower()
-        start_pos = match.end()
-        
-        # Determine end position (start of next section or end of text)
-        if i < len(matches) - 1:
-            end_pos = matches[i+1].start()
-        else:
-            end_pos = len(text)
-        
-        # Extract section content
-        section_content = text[start_pos:end_pos].strip()
-        sections[section_name] = section_content
-    
-    return sections
\ No newline at end of file
+    return sections_dict(get_section_segmenter().segment(text))
\ No newline at end of file
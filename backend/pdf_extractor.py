@@ -0,0 +1,167 @@
+import io
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Extraction budget; 0 means unlimited
+PDF_MAX_PAGES = _env_int("PDF_MAX_PAGES", 0)
+PDF_MAX_CHARS = _env_int("PDF_MAX_CHARS", 0)
+
+# Documents with at least this many pages are split across worker processes
+PDF_PARALLEL_MIN_PAGES = _env_int("PDF_PARALLEL_MIN_PAGES", 16)
+PDF_WORKERS = _env_int("PDF_WORKERS", min(4, os.cpu_count() or 1))
+
+def _read_bytes(source):
+    """Return the raw bytes of a path, bytes buffer or binary stream"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            return file.read()
+    return source.read()
+
+def _timed_page(reader, page_num):
+    """Extract one page, returning (page number, text, seconds)"""
+    page_start = time.perf_counter()
+    text = reader.pages[page_num].extract_text() or ''
+    return page_num, text, time.perf_counter() - page_start
+
+def _extract_pages(data, start, stop):
+    """
+    Extract the text of pages [start, stop) of a PDF
+
+    Runs in worker processes, so it takes the raw bytes and reopens the document.
+
+    Returns:
+        list: (page number, text, seconds) tuples
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [_timed_page(reader, page_num) for page_num in range(start, stop)]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        return _executor
+
+def _page_ranges(page_count, chunks):
+    size = -(-page_count // chunks)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+def _open_pages(source, max_pages, workers, parallel_min_pages):
+    """
+    Start extracting a PDF's pages
+
+    Returns:
+        tuple: (page count, iterator of (page number, text, seconds) in page
+               order, futures to cancel when stopping early)
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    workers = workers or PDF_WORKERS
+    parallel_min_pages = parallel_min_pages or PDF_PARALLEL_MIN_PAGES
+
+    import PyPDF2
+
+    data = _read_bytes(source)
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    pages_to_read = min(page_count, max_pages) if max_pages else page_count
+
+    if workers > 1 and pages_to_read >= parallel_min_pages:
+        # Several ranges per worker so early stopping doesn't waste much work
+        futures = [_get_executor(workers).submit(_extract_pages, data, range_start, range_stop)
+                   for range_start, range_stop in _page_ranges(pages_to_read, workers * 2)]
+        return page_count, (page for future in futures for page in future.result()), futures
+
+    return page_count, (_timed_page(reader, page_num) for page_num in range(pages_to_read)), []
+
+def iter_pdf_pages(source, max_pages=None, max_chars=None, workers=None, parallel_min_pages=None):
+    """
+    Yield the text of each page as soon as it is extracted, in page order
+
+    Takes the same budget as extract_pdf; joined, the pages are exactly
+    extract_pdf's text.
+
+    Yields:
+        str: Page text
+    """
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    _, results, futures = _open_pages(source, max_pages, workers, parallel_min_pages)
+    chars = 0
+    try:
+        for _, text, _ in results:
+            if max_chars and chars + len(text) >= max_chars:
+                yield text[:max_chars - chars]
+                break
+            chars += len(text)
+            yield text
+    finally:
+        for future in futures:
+            future.cancel()
+
+def extract_pdf(source, max_pages=None, max_chars=None, workers=None, parallel_min_pages=None):
+    """
+    Extract text from a PDF with an optional page/character budget
+
+    Page texts are collected in a list and joined once. Large documents are
+    split into page ranges extracted in parallel; ranges are consumed in page
+    order, and outstanding ranges are cancelled once the budget is reached.
+
+    Args:
+        source: Path, bytes buffer or binary stream of the PDF
+        max_pages (int): Stop after this many pages (0/None for no limit)
+        max_chars (int): Stop once this many characters are extracted (0/None for no limit)
+        workers (int): Worker processes for large documents
+        parallel_min_pages (int): Minimum page count for parallel extraction
+
+    Returns:
+        dict: text, page_count, truncated flag, total seconds and per-page
+              timings as {"page", "chars", "seconds"}
+    """
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+
+    start = time.perf_counter()
+    page_count, results, futures = _open_pages(source, max_pages, workers, parallel_min_pages)
+
+    parts = []
+    timings = []
+    chars = 0
+
+    def budget_reached():
+        return bool(max_chars) and chars >= max_chars
+
+    try:
+        for page_num, text, seconds in results:
+            parts.append(text)
+            chars += len(text)
+            timings.append({"page": page_num + 1, "chars": len(text), "seconds": round(seconds, 4)})
+            if budget_reached():
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+
+    text = ''.join(parts)
+    truncated = len(timings) < page_count
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars]
+        truncated = True
+
+    return {
+        "text": text,
+        "page_count": page_count,
+        "truncated": truncated,
+        "seconds": round(time.perf_counter() - start, 4),
+        "pages": timings
+    }
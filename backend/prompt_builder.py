@@ -0,0 +1,379 @@
+import os
+import re
+import math
+import logging
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from model_registry import get_resource
+from nlp_processor import preprocess_many
+from resume_analysis import ResumeAnalysis
+from metrics import PROMPT_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Token budgets for each part of the match prompt. Prompt size drives the
+# model's latency and cost, so these trade analysis quality against p95.
+RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKENS", 600))
+JOB_TOKEN_BUDGET = int(os.getenv("PROMPT_JOB_TOKENS", 400))
+SKILLS_TOKEN_BUDGET = int(os.getenv("PROMPT_SKILLS_TOKENS", 80))
+
+RESUME_SECTIONS = ["summary", "experience", "skills", "education", "projects", "achievements"]
+
+_RUBRIC = """You are a resume analyst and career coach with HR and recruitment experience. Analyze the resume against {target}:
+1. score: a realistic 0-100 match score. 70-100 is strong, 40-70 moderate, below 40 needs significant improvement. Weigh technical skills 40%, experience relevance 30%, education 15%, soft skills 15%.
+2. strengths: specific qualifications and skills that match the job.
+3. weaknesses: missing skills or qualifications, stated constructively.
+4. suggestions: actionable steps to improve the resume for this job.
+The texts are excerpts chosen for relevance. Be specific to their content and neither artificially harsh nor generous.
+"""
+
+SYSTEM_PROMPT = _RUBRIC.format(target="the job description") + (
+    'Respond with a JSON object: {"score": 75, "strengths": ["..."], "weaknesses": ["..."], "suggestions": ["..."]}')
+
+# Several job descriptions in one request: the resume and instructions are sent once
+MULTI_SYSTEM_PROMPT = _RUBRIC.format(target="each numbered job description separately") + (
+    'Respond with a JSON object with one entry per job: {"matches": [{"job": 1, "score": 75, '
+    '"strengths": ["..."], "weaknesses": ["..."], "suggestions": ["..."]}]}')
+
+USER_PROMPT = """JOB DESCRIPTION:
+{job}
+
+RESUME:
+{resume}
+
+EXTRACTED SKILLS FROM RESUME:
+{skills}"""
+
+MULTI_USER_PROMPT = """{jobs}
+
+RESUME:
+{resume}
+
+EXTRACTED SKILLS FROM RESUME:
+{skills}"""
+
+# Job description sentences that state what the candidate needs
+_REQUIREMENT_RE = re.compile(
+    r'\b(?:requir\w*|must|should|need\w*|experience|proficien\w*|knowledge|familiar\w*|'
+    r'understanding|ability|able to|degree|bachelor\w*|master\w*|certifi\w*|years?|'
+    r'skills?|qualifications?|responsib\w*|expertise|strong|plus|preferred)\b',
+    re.IGNORECASE)
+# Headers opening a requirements list, e.g. "Requirements:" or "What you'll bring"
+_REQUIREMENT_HEADER_RE = re.compile(
+    r'^\W*(?:requirements?|qualifications?|skills|must[- ]haves?|nice[- ]to[- ]haves?|'
+    r'what you(?:\'ll| will)? (?:bring|need)|who you are|about you)\b', re.IGNORECASE)
+_HEADER_RE = re.compile(r'^[^.!?]{1,60}:$')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9])')
+_BULLET_RE = re.compile(r'^[\s\-*•▪●–]+')
+_TOKEN_PIECE_RE = re.compile(r'\w+|[^\w\s]')
+
+def _load_encoder():
+    try:
+        import tiktoken
+        from llm_client import DEFAULT_MODEL
+        try:
+            return tiktoken.encoding_for_model(DEFAULT_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        # tiktoken not installed, or its BPE file can't be downloaded
+        return None
+
+def count_tokens(text):
+    """
+    Number of tokens the model will see for text
+
+    Uses tiktoken when it is installed. Otherwise tokens are estimated from
+    words and punctuation, counting a long word as one token per four
+    characters, which is close for English prose.
+    """
+    encoder = get_resource('token_encoder', _load_encoder)
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_PIECE_RE.findall(text))
+
+def _truncate(text, budget):
+    """text cut at a word boundary to roughly budget tokens"""
+    words = text.split()
+    while words and count_tokens(' '.join(words)) > budget:
+        words = words[:max(1, len(words) * 3 // 4)] if len(words) > 1 else []
+    return ' '.join(words)
+
+def split_units(text):
+    """Lines of text, with long lines split into sentences; bullets stripped"""
+    units = []
+    for line in text.splitlines():
+        line = _BULLET_RE.sub('', line).strip()
+        if line:
+            units.extend(sentence.strip() for sentence in _SENTENCE_RE.split(line) if sentence.strip())
+    return units
+
+def relevance_scores(units, job, job_keywords=()):
+    """
+    Relevance of each text unit to the job
+
+    The TF-IDF cosine similarity of the unit to the job description, with
+    IDF computed over the units and the job, plus the share of the job's
+    top keywords the unit contains.
+
+    Args:
+        units (list): Text units
+        job (ResumeAnalysis): The job description
+        job_keywords (list): The job's top keywords
+
+    Returns:
+        ndarray: One score per unit
+    """
+    if not units:
+        return np.zeros(0)
+    preprocessed = preprocess_many(units)
+    try:
+        vectors = TfidfVectorizer(ngram_range=(1, 2)).fit_transform([job.preprocessed] + preprocessed)
+        similarity = cosine_similarity(vectors[1:], vectors[0:1]).ravel()
+    except ValueError:
+        # Nothing but stopwords
+        similarity = np.zeros(len(units))
+
+    if job_keywords:
+        coverage = np.array([sum(keyword in unit for keyword in job_keywords) for unit in preprocessed],
+                            dtype=np.float64) / len(job_keywords)
+        similarity += coverage
+    return similarity
+
+def _select(units, scores, costs, budget, required=()):
+    """
+    Indexes of the units to keep, most relevant first, within budget
+
+    required units are taken first if they fit. Units that don't fit are
+    skipped so a shorter, less relevant one can still use the space.
+    """
+    chosen, considered, spent = [], set(), 0
+    for index in list(required) + list(np.argsort(-scores, kind='stable')):
+        index = int(index)
+        if index in considered:
+            continue
+        considered.add(index)
+        if spent + costs[index] <= budget:
+            chosen.append(index)
+            spent += costs[index]
+    return chosen
+
+def compress_job_description(job, budget=JOB_TOKEN_BUDGET, job_keywords=()):
+    """
+    The job description cut down to its requirement sentences within budget
+
+    A description that fits is returned unchanged. Otherwise sentences are
+    ranked by whether they state a requirement (or sit under a requirements
+    header) and by their relevance to the rest of the posting. The first
+    sentence, usually the title, is kept, and the kept sentences are
+    returned in their original order.
+
+    Args:
+        job (ResumeAnalysis): The job description
+        budget (int): Token budget
+        job_keywords (list): The job's top keywords
+
+    Returns:
+        str: Compressed description
+    """
+    if count_tokens(job.text) <= budget:
+        return job.text.strip()
+
+    units, in_requirements, requirement, seen = [], False, [], set()
+    for line in job.text.splitlines():
+        stripped = _BULLET_RE.sub('', line).strip()
+        if not stripped:
+            continue
+        if _HEADER_RE.match(stripped) or _REQUIREMENT_HEADER_RE.fullmatch(stripped):
+            in_requirements = bool(_REQUIREMENT_HEADER_RE.match(stripped))
+            continue
+        for sentence in _SENTENCE_RE.split(stripped):
+            sentence = sentence.strip()
+            if sentence and sentence not in seen:
+                seen.add(sentence)
+                units.append(sentence)
+                requirement.append(in_requirements or bool(_REQUIREMENT_RE.search(sentence)))
+    if not units:
+        return ''
+
+    scores = relevance_scores(units, job, job_keywords) + np.array(requirement, dtype=np.float64)
+    costs = [count_tokens(unit) for unit in units]
+    chosen = _select(units, scores, costs, budget, required=[0])
+    if not chosen:
+        return _truncate(units[0], budget)
+    return '\n'.join(units[index] for index in sorted(chosen))
+
+def condense_resume(resume, job, budget=RESUME_TOKEN_BUDGET, job_keywords=()):
+    """
+    The resume's key sections cut down to their most job-relevant lines within budget
+
+    Every line (or sentence of a long line) of the key sections competes
+    for the same budget by relevance to the job, so sections that matter
+    for the job get more of it. Each section's most relevant line is taken
+    first so no section disappears entirely. A resume without recognized
+    sections is treated as one section.
+
+    Args:
+        resume (ResumeAnalysis): The resume
+        job (ResumeAnalysis): The job description
+        budget (int): Token budget
+        job_keywords (list): The job's top keywords
+
+    Returns:
+        str: Condensed resume, section by section
+    """
+    sections = [(name, resume.sections[name]) for name in RESUME_SECTIONS if resume.sections.get(name)]
+    if not sections:
+        sections = [('resume', resume.text)]
+
+    units, owners, seen = [], [], set()
+    for position, (_, text) in enumerate(sections):
+        for unit in split_units(text):
+            # Repeated lines add tokens but nothing the model needs
+            if unit not in seen:
+                seen.add(unit)
+                units.append(unit)
+                owners.append(position)
+    if not units:
+        return ''
+
+    scores = relevance_scores(units, job, job_keywords)
+    # Section headers cost tokens too
+    headers = [f"{name.upper()}:" for name, _ in sections]
+    budget -= sum(count_tokens(header) for header in headers)
+    costs = [count_tokens(unit) for unit in units]
+    owners = np.array(owners)
+    best_per_section = [int(np.flatnonzero(owners == position)[np.argmax(scores[owners == position])])
+                        for position in range(len(sections)) if (owners == position).any()]
+    chosen = _select(units, scores, costs, budget, required=best_per_section)
+
+    # Kept units grouped by section, in document order
+    section_lines = [[] for _ in headers]
+    for index in sorted(chosen):
+        section_lines[owners[index]].append(units[index])
+
+    parts = []
+    for header, lines in zip(headers, section_lines):
+        if lines:
+            parts.append(header + '\n' + '\n'.join(lines))
+    return '\n\n'.join(parts)
+
+def skills_text(resume, job, budget=SKILLS_TOKEN_BUDGET):
+    """The resume's skills within budget, those the job mentions first"""
+    job_text = job.text.lower()
+    skills = sorted(resume.skills, key=lambda skill: skill.lower() not in job_text)
+    return _truncate(', '.join(skills), budget)
+
+class MatchPrompt:
+    """Chat messages for one match request and their token counts per part"""
+
+    __slots__ = ('messages', 'tokens')
+
+    def __init__(self, messages, tokens):
+        self.messages = messages
+        self.tokens = tokens
+
+    @property
+    def total_tokens(self):
+        return sum(self.tokens.values())
+
+    def record(self):
+        """Log the prompt size and add it to the token histogram"""
+        for part, count in self.tokens.items():
+            PROMPT_TOKENS.labels(part).observe(count)
+        PROMPT_TOKENS.labels('total').observe(self.total_tokens)
+        logger.info("LLM prompt: %d tokens (%s)", self.total_tokens,
+                    ', '.join(f"{part} {count}" for part, count in self.tokens.items()))
+
+def prompt_settings():
+    """The budgets, for cache keys: a result depends on what the model was shown"""
+    return {"resume": RESUME_TOKEN_BUDGET, "job": JOB_TOKEN_BUDGET, "skills": SKILLS_TOKEN_BUDGET}
+
+def build_match_prompt(resume, job):
+    """
+    Build the resume/job match prompt within the configured token budgets
+
+    Args:
+        resume (ResumeAnalysis): The resume
+        job (ResumeAnalysis): The job description
+
+    Returns:
+        MatchPrompt: The messages and their token counts
+    """
+    job_keywords = job.keywords(top_n=20)
+    job_text = compress_job_description(job, JOB_TOKEN_BUDGET, job_keywords)
+    resume_text = condense_resume(resume, job, RESUME_TOKEN_BUDGET, job_keywords)
+    skills = skills_text(resume, job)
+
+    user_prompt = USER_PROMPT.format(job=job_text, resume=resume_text, skills=skills)
+    tokens = {
+        "system": count_tokens(SYSTEM_PROMPT),
+        "job": count_tokens(job_text),
+        "resume": count_tokens(resume_text),
+        "skills": count_tokens(skills),
+    }
+    tokens["template"] = max(0, count_tokens(user_prompt) - tokens["job"] - tokens["resume"] - tokens["skills"])
+    return MatchPrompt([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ], tokens)
+
+def build_multi_match_prompt(resume, jobs):
+    """
+    Build one prompt matching the resume against several job descriptions
+
+    Each job description gets its own JOB_TOKEN_BUDGET. The resume is
+    condensed once, by relevance to all the jobs together.
+
+    Args:
+        resume (ResumeAnalysis): The resume
+        jobs (list): ResumeAnalysis of each job description
+
+    Returns:
+        MatchPrompt: The messages and their token counts; the response is
+            parsed with split_multi_match_result
+    """
+    combined = ResumeAnalysis('\n'.join(job.text for job in jobs))
+    combined.preprocessed = ' '.join(job.preprocessed for job in jobs)
+    job_texts = [compress_job_description(job, JOB_TOKEN_BUDGET, job.keywords(top_n=20)) for job in jobs]
+    resume_text = condense_resume(resume, combined, RESUME_TOKEN_BUDGET, combined.keywords(top_n=20))
+    skills = skills_text(resume, combined)
+
+    jobs_text = '\n\n'.join(f"JOB {number}:\n{text}" for number, text in enumerate(job_texts, 1))
+    user_prompt = MULTI_USER_PROMPT.format(jobs=jobs_text, resume=resume_text, skills=skills)
+    tokens = {
+        "system": count_tokens(MULTI_SYSTEM_PROMPT),
+        "job": sum(count_tokens(text) for text in job_texts),
+        "resume": count_tokens(resume_text),
+        "skills": count_tokens(skills),
+    }
+    tokens["template"] = max(0, count_tokens(user_prompt) - tokens["job"] - tokens["resume"] - tokens["skills"])
+    return MatchPrompt([
+        {"role": "system", "content": MULTI_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ], tokens)
+
+def split_multi_match_result(result, count):
+    """
+    Per-job analyses from the response to a build_multi_match_prompt prompt
+
+    Args:
+        result (dict): Parsed model response
+        count (int): Number of jobs in the prompt
+
+    Returns:
+        list: One dict per job, in prompt order; None where the model left a job out
+    """
+    matches = result.get("matches") if isinstance(result, dict) else None
+    if not isinstance(matches, list):
+        return [None] * count
+
+    analyses = [None] * count
+    for position, match in enumerate(matches):
+        if not isinstance(match, dict):
+            continue
+        number = match.pop("job", position + 1)
+        if isinstance(number, int) and 1 <= number <= count and analyses[number - 1] is None:
+            analyses[number - 1] = match
+    return analyses
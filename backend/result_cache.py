@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from metrics import CACHE_LOOKUPS
+
+_LINE_BREAK_RE = re.compile(r'\r\n|\r|\n')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_text(text):
+    """
+    Collapse whitespace within lines and case so trivially different uploads share a key
+
+    Line breaks are kept: section headers are recognized per line, so texts
+    that differ in them can be analyzed differently.
+    """
+    lines = _LINE_BREAK_RE.split(text or '')
+    return '\n'.join(_WHITESPACE_RE.sub(' ', line).strip() for line in lines).strip().lower()
+
+def cache_key(namespace, resume_text, job_description='', settings=None):
+    """
+    Content-addressed key for a match result
+
+    Args:
+        namespace (str): What is being cached, e.g. 'llm-match' or 'job-suggestions'
+        resume_text (str): Extracted resume text
+        job_description (str): Job description text (or any other second input)
+        settings (dict): Model settings that change the result
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (namespace, normalize_text(resume_text), normalize_text(job_description),
+                 json.dumps(settings or {}, sort_keys=True)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serializable results
+
+    An in-memory LRU with a TTL sits in front of an optional SQLite file that
+    survives restarts. Hits in the disk tier are promoted to memory.
+    """
+
+    def __init__(self, max_entries=1024, ttl=24 * 3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS results "
+                             "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _remember(self, key, value, expires):
+        self._memory[key] = (value, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    CACHE_LOOKUPS.labels('memory_hit').inc()
+                    return json.loads(entry[0])
+                del self._memory[key]
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT value, expires FROM results WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Error reading result cache: {e}")
+                row = None
+            if row is not None and row[1] > now:
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                CACHE_LOOKUPS.labels('disk_hit').inc()
+                return json.loads(row[0])
+
+        with self._lock:
+            self.misses += 1
+        CACHE_LOOKUPS.labels('miss').inc()
+        return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key"""
+        # Values are stored serialized so callers can't mutate cached results
+        try:
+            serialized = json.dumps(value)
+        except (TypeError, ValueError) as e:
+            print(f"Result is not cacheable: {e}")
+            return
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, serialized, expires)
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)",
+                                 (key, serialized, expires))
+                    conn.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+            except sqlite3.Error as e:
+                print(f"Error writing result cache: {e}")
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        """Hit/miss counters and current memory tier size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": bool(self.db_path)
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """Return the shared ResultCache configured from the environment"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(
+                max_entries=int(os.getenv("RESULT_CACHE_SIZE", 1024)),
+                ttl=float(os.getenv("RESULT_CACHE_TTL", 24 * 3600)),
+                db_path=os.getenv("RESULT_CACHE_PATH") or None
+            )
+        return _cache
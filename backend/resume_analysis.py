@@ -0,0 +1,70 @@
+from functools import cached_property
+from nlp_processor import preprocess_text, preprocess_many, extract_keywords, extract_keywords_many, extract_resume_sections
+from resume_parser import extract_skills
+
+class ResumeAnalysis:
+    """
+    Lazily computed, memoized analysis of one document
+
+    Each derived view (preprocessed text, skills, sections, keywords) is
+    computed at most once, the first time a matcher asks for it. Job
+    descriptions are analyzed with the same class.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def of(cls, document):
+        """Return document itself if it is already an analysis, else analyze the text"""
+        return document if isinstance(document, cls) else cls(document)
+
+    @classmethod
+    def many(cls, documents):
+        """
+        Analyses of many documents, with their preprocessed text and keywords computed in one batch
+
+        Views already computed on a document are kept.
+        """
+        analyses = [cls.of(document) for document in documents]
+        pending = [analysis for analysis in analyses if 'preprocessed' not in analysis.__dict__]
+        for analysis, preprocessed in zip(pending, preprocess_many(analysis.text for analysis in pending)):
+            analysis.preprocessed = preprocessed
+        pending = [analysis for analysis in analyses if 'ranked_keywords' not in analysis.__dict__]
+        if pending:
+            keywords = extract_keywords_many([analysis.preprocessed for analysis in pending],
+                                             top_n=None, preprocessed=True)
+            for analysis, ranked in zip(pending, keywords):
+                analysis.ranked_keywords = ranked
+        return analyses
+
+    @cached_property
+    def preprocessed(self):
+        return preprocess_text(self.text)
+
+    @cached_property
+    def skills(self):
+        return extract_skills(self.text)
+
+    @cached_property
+    def sections(self):
+        return extract_resume_sections(self.text)
+
+    @cached_property
+    def matching_text(self):
+        """Text vectorized against job postings: the resume with skills double weighted plus experience"""
+        skills_text = ' '.join(self.skills)
+        return (
+            self.preprocessed + ' ' +
+            skills_text + ' ' + skills_text + ' ' +
+            self.sections.get('experience', '')
+        )
+
+    @cached_property
+    def ranked_keywords(self):
+        """Every keyword, most important first"""
+        return extract_keywords(self.text, top_n=None, preprocessed_text=self.preprocessed)
+
+    def keywords(self, top_n=10):
+        """Top keywords, as extract_keywords(text, top_n) would return them"""
+        return self.ranked_keywords[:top_n]
@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import weakref
+import numpy as np
+import scipy.sparse as sp
+from resume_analysis import ResumeAnalysis
+from result_cache import normalize_text
+from job_ranking import rank_top_k
+from job_index import vectorizer_dimension
+
+DEFAULT_RESUME_INDEX_PATH = os.getenv("RESUME_INDEX_PATH", './data/resume_index.sqlite3')
+
+# Same weighting as fallback_calculate_score: 60% text similarity, 40% skill coverage
+SIMILARITY_WEIGHT = 0.6
+SKILL_WEIGHT = 0.4
+
+_vocabulary_keys = weakref.WeakKeyDictionary()
+
+def vocabulary_key(vectorizer):
+    """Identifies a fitted vectorizer's vocabulary and IDF weights, so stored vectors can be validated"""
+    key = _vocabulary_keys.get(vectorizer)
+    if key is None:
+        sha1 = hashlib.sha1()
+        vocabulary = getattr(vectorizer, 'vocabulary_', None)
+        if vocabulary is None:
+            # Hashed: the columns are fixed by the dimension and n-gram range
+            vocabulary = {"n_features": vectorizer.n_features, "ngram_range": list(vectorizer.ngram_range)}
+        sha1.update(json.dumps(sorted(vocabulary.items())).encode('utf-8'))
+        idf = getattr(vectorizer, 'idf_', None)
+        if idf is not None:
+            sha1.update(np.ascontiguousarray(idf).tobytes())
+        key = sha1.hexdigest()
+        _vocabulary_keys[vectorizer] = key
+    return key
+
+def resume_id(text):
+    """Content-addressed id, so uploading the same resume twice stores it once"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()[:32]
+
+def _encode_vector(row):
+    return row.indices.astype(np.int32).tobytes(), row.data.astype(np.float32).tobytes()
+
+class ResumeIndex:
+    """
+    Persistent pool of analyzed resumes for ranking candidates against a job
+
+    Each resume is analyzed once when it is added. Its matching text, skills
+    and sections go to SQLite along with its TF-IDF vector in the job index
+    vocabulary. Ranking a job description is two sparse products over the
+    whole pool: one for text similarity and one for skill coverage.
+
+    If the job vocabulary changes (the catalog was compacted), the stored
+    matching texts are re-vectorized. No resume file is parsed again.
+
+    Several processes can share the database: each snapshot reads the rows
+    added since the last one, by any process, and reloads the pool when
+    rows were removed.
+    """
+
+    def __init__(self, db_path=DEFAULT_RESUME_INDEX_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._state = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS resumes ("
+                         "id TEXT PRIMARY KEY, filename TEXT, matching_text TEXT NOT NULL, "
+                         "skills TEXT NOT NULL, sections TEXT NOT NULL, added REAL NOT NULL, "
+                         "vocabulary TEXT, indices BLOB, data BLOB)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def add(self, resume, vectorizer, filename=None):
+        """
+        Analyze a resume and add it to the pool
+
+        Args:
+            resume (str or ResumeAnalysis): Extracted resume text
+            vectorizer (TfidfVectorizer): The job index vectorizer
+            filename (str): Original file name, returned with rankings
+
+        Returns:
+            dict: The resume id, its skills and the names of its sections
+        """
+        resume = ResumeAnalysis.of(resume)
+        key = vocabulary_key(vectorizer)
+        vector = vectorizer.transform([resume.matching_text])
+        indices, data = _encode_vector(vector)
+        entry = {
+            "id": resume_id(resume.text),
+            "filename": filename,
+            "skills": resume.skills,
+            "sections": resume.sections
+        }
+
+        # Rows are merged into the in-memory matrix on the next ranking, not per upload
+        with self._connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO resumes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry["id"], filename, resume.matching_text, json.dumps(entry["skills"]),
+                 json.dumps(entry["sections"]), time.time(), key, indices, data)
+            ).rowcount
+
+        return {"id": entry["id"], "skills": entry["skills"], "sections": list(entry["sections"]),
+                "new": bool(inserted)}
+
+    def remove(self, ids):
+        """Remove resumes by id; returns how many were removed"""
+        ids = list(ids)
+        with self._lock:
+            with self._connect() as conn:
+                removed = conn.executemany("DELETE FROM resumes WHERE id = ?", [(i,) for i in ids]).rowcount
+            self._state = None
+        return removed
+
+    def get(self, resume_id):
+        """The stored skills and sections of one resume, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, filename, skills, sections, added FROM resumes WHERE id = ?",
+                               (resume_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "filename": row[1], "skills": json.loads(row[2]),
+                "sections": json.loads(row[3]), "added": row[4]}
+
+    def _read_rows(self, conn, vectorizer, key, after=0):
+        """Pool rows past rowid `after`, re-vectorizing those stored with another vocabulary"""
+        rows = conn.execute("SELECT rowid, id, filename, skills, vocabulary, indices, data, matching_text "
+                            "FROM resumes WHERE rowid > ? ORDER BY rowid", (after,)).fetchall()
+
+        stale = [row for row in rows if row[4] != key]
+        if stale:
+            vectors = vectorizer.transform([row[7] for row in stale])
+            updates = [(key, *_encode_vector(vectors[position]), row[1]) for position, row in enumerate(stale)]
+            conn.executemany("UPDATE resumes SET vocabulary = ?, indices = ?, data = ? WHERE id = ?", updates)
+            refreshed = {update[3]: update[1:3] for update in updates}
+            rows = [(*row[:5], *refreshed.get(row[1], row[5:7])) for row in rows]
+        return rows
+
+    @staticmethod
+    def _matrix(rows, n_features):
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indices, data = [], []
+        for position, row in enumerate(rows):
+            row_indices = np.frombuffer(row[5], dtype=np.int32)
+            indices.append(row_indices)
+            data.append(np.frombuffer(row[6], dtype=np.float32))
+            indptr[position + 1] = indptr[position] + len(row_indices)
+
+        return sp.csr_matrix((np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+                              np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32), indptr),
+                             shape=(len(rows), n_features))
+
+    def _load(self, vectorizer, key, state=None):
+        """
+        Read the pool from SQLite
+
+        With a previous state, only the rows added since it are read and
+        appended to it. The whole pool is read again when any of its rows was
+        removed, here or by another process.
+        """
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            if state is not None and state["last_rowid"]:
+                last = conn.execute("SELECT id FROM resumes WHERE rowid = ?", (state["last_rowid"],)).fetchone()
+                if last is None or last[0] != state["ids"][-1]:
+                    state = None
+            if state is not None and count == len(state["ids"]):
+                return state
+
+            rows = self._read_rows(conn, vectorizer, key, after=state["last_rowid"] if state is not None else 0)
+            # Anything but pure additions since `state` means rows went missing
+            if state is not None and len(state["ids"]) + len(rows) != count:
+                state, rows = None, self._read_rows(conn, vectorizer, key)
+
+        matrix = self._matrix(rows, vectorizer_dimension(vectorizer))
+        ids, filenames, skills = [row[1] for row in rows], [row[2] for row in rows], [json.loads(row[3]) for row in rows]
+        last_rowid = rows[-1][0] if rows else 0
+        if state is not None:
+            ids, filenames, skills = state["ids"] + ids, state["filenames"] + filenames, state["skills"] + skills
+            matrix = sp.vstack([state["matrix"], matrix], format='csr')
+            last_rowid = last_rowid or state["last_rowid"]
+        return self._build_state(key, ids, filenames, skills, matrix, last_rowid)
+
+    @staticmethod
+    def _build_state(key, ids, filenames, skills, matrix, last_rowid):
+        """Immutable view of the pool: ids, vectors and a resume x skill incidence matrix"""
+        skill_columns = {}
+        skill_rows, skill_cols = [], []
+        for row, resume_skills in enumerate(skills):
+            for skill in resume_skills:
+                skill_rows.append(row)
+                skill_cols.append(skill_columns.setdefault(skill.lower(), len(skill_columns)))
+        skill_matrix = sp.csc_matrix((np.ones(len(skill_rows), dtype=np.float32), (skill_rows, skill_cols)),
+                                     shape=(len(ids), len(skill_columns)))
+        return {"vocabulary": key, "ids": ids, "filenames": filenames, "skills": skills,
+                "matrix": matrix.tocsr(), "skill_columns": skill_columns, "skill_matrix": skill_matrix,
+                "last_rowid": last_rowid}
+
+    def snapshot(self, vectorizer):
+        """The pool vectorized with this vectorizer, including resumes any process added since the last call"""
+        key = vocabulary_key(vectorizer)
+        with self._lock:
+            state = self._state
+            if state is not None and state["vocabulary"] != key:
+                state = None
+            self._state = self._load(vectorizer, key, state)
+            return self._state
+
+    def rank(self, job_description, vectorizer, top_k=10, min_score=0.0):
+        """
+        Rank every resume in the pool against a job description
+
+        Args:
+            job_description (str or ResumeAnalysis): Job description text
+            vectorizer (TfidfVectorizer): The job index vectorizer
+            top_k (int): Number of candidates to return
+            min_score (float): Minimum combined score (0-1)
+
+        Returns:
+            list: Best candidates first, with their score, text similarity
+                and the job's skills they have
+        """
+        job = ResumeAnalysis.of(job_description)
+        state = self.snapshot(vectorizer)
+        if not state["ids"]:
+            return []
+
+        similarities = (state["matrix"] @ vectorizer.transform([job.preprocessed]).T).toarray().ravel()
+
+        job_skills = list(dict.fromkeys(skill.lower() for skill in job.skills))
+        columns = [state["skill_columns"][skill] for skill in job_skills if skill in state["skill_columns"]]
+        if job_skills:
+            coverage = np.asarray(state["skill_matrix"][:, columns].sum(axis=1)).ravel() / len(job_skills)
+            scores = SIMILARITY_WEIGHT * similarities + SKILL_WEIGHT * coverage
+        else:
+            scores = similarities
+
+        candidates = []
+        for row in rank_top_k(scores, top_k, min_score):
+            resume_skills = state["skills"][row]
+            candidates.append({
+                "id": state["ids"][row],
+                "filename": state["filenames"][row],
+                "score": int(round(scores[row] * 100)),
+                "similarity": round(float(similarities[row]), 4),
+                "matched_skills": [skill for skill in resume_skills if skill.lower() in job_skills]
+            })
+        return candidates
+
+_resume_index = None
+_resume_index_lock = threading.Lock()
+
+def get_resume_index():
+    """The shared resume pool at RESUME_INDEX_PATH"""
+    global _resume_index
+    with _resume_index_lock:
+        if _resume_index is None:
+            _resume_index = ResumeIndex(DEFAULT_RESUME_INDEX_PATH)
+        return _resume_index
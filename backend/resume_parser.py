@@ -1,58 +1,133 @@
-import PyPDF2
-import docx
 import re
-import spacy
-from spacy.matcher import Matcher
+import io
 import os
+import tempfile
+import contextlib
+from pdf_extractor import extract_pdf
+from docx_extractor import extract_docx
+from model_registry import get_nlp, get_resource, SPACY_BATCH_SIZE, SPACY_N_PROCESS
+from metrics import timed
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    import subprocess
-    subprocess.call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+# Uploads larger than this are rejected; smaller ones above the spool threshold go to a temp file
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", 2 * 1024 * 1024))
 
-def extract_text_from_resume(file_path):
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size cap"""
+
+def read_upload(stream, max_bytes=MAX_UPLOAD_BYTES, spool_threshold=SPOOL_THRESHOLD, chunk_size=64 * 1024):
+    """
+    Copy an upload stream into a buffer that stays in memory unless the file is large
+    
+    Args:
+        stream: Readable binary stream, e.g. a request file's stream
+        max_bytes (int): Maximum accepted upload size
+        spool_threshold (int): Size above which the buffer spills to a temp file
+        chunk_size (int): Read size
+        
+    Returns:
+        SpooledTemporaryFile: Buffer positioned at the start of the upload
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    size = 0
+    try:
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+            buffer.write(chunk)
+    except BaseException:
+        buffer.close()
+        raise
+
+    buffer.seek(0)
+    return buffer
+
+def save_upload(stream, file, max_bytes=MAX_UPLOAD_BYTES, chunk_size=64 * 1024):
+    """
+    Copy an upload stream into an open binary file, enforcing a size cap
+    
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes; the file then
+            holds a partial copy
+    """
+    size = 0
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        file.write(chunk)
+
+@contextlib.contextmanager
+def _open_binary(source):
+    """Yield a binary stream for a path, bytes buffer or file-like source"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield file
+    else:
+        # Caller owns file-like objects; don't close them
+        yield source
+
+@timed('extract')
+def extract_text_from_resume(source, filename=None):
     """
     Extract text from resume file (supports PDF, DOCX, and TXT)
     
     Args:
-        file_path (str): Path to the resume file
+        source: Path to the resume file, its content as bytes, or a binary file-like object
+        filename (str): Original file name, used for the format when source is not a path
         
     Returns:
         str: Extracted text from the resume
     """
-    file_extension = os.path.splitext(file_path)[1].lower()
+    if filename is None:
+        if not isinstance(source, (str, os.PathLike)):
+            raise ValueError("A filename is required to detect the format of in-memory resumes")
+        filename = source
+    file_extension = os.path.splitext(filename)[1].lower()
     
     if file_extension == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source)
     elif file_extension == '.docx':
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(source)
     elif file_extension == '.doc':
-        return extract_text_from_doc(file_path)
+        return extract_text_from_doc(source)
     elif file_extension == '.txt':
-        return extract_text_from_txt(file_path)
+        return extract_text_from_txt(source)
     else:
         raise ValueError(f"Unsupported file format: {file_extension}")
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
-    text = ""
+def extract_text_from_pdf(source):
+    """Extract text from PDF file, bytes or stream"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
+        return extract_pdf(source)["text"]
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
-    return text
+        return ""
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
+def extract_text_from_docx(source):
+    """
+    Extract text from DOCX file, bytes or stream
+    
+    The document XML is streamed directly, which also picks up tables, text
+    boxes, headers and footers. Packages it can't read go through
+    python-docx instead.
+    """
     try:
-        doc = docx.Document(file_path)
+        return extract_docx(source)
+    except Exception as e:
+        print(f"Streaming DOCX extraction failed, using python-docx: {e}")
+    return extract_text_from_docx_document(source)
+
+def extract_text_from_docx_document(source):
+    """Extract the body paragraphs of a DOCX through the python-docx object model"""
+    try:
+        import docx
+
+        with _open_binary(source) as file:
+            doc = docx.Document(file)
         full_text = []
         for para in doc.paragraphs:
             full_text.append(para.text)
@@ -61,7 +136,7 @@ def extract_text_from_docx(file_path):
         print(f"Error extracting text from DOCX: {e}")
         return ""
 
-def extract_text_from_doc(file_path):
+def extract_text_from_doc(source):
     """
     For DOC files, we'll use a simple placeholder.
     In a production environment, you would use a library like antiword,
@@ -70,18 +145,195 @@ def extract_text_from_doc(file_path):
     # This is a placeholder and should be replaced with actual DOC extraction
     return "DOC file format detected. Please convert to DOCX or PDF for better results."
 
-def extract_text_from_txt(file_path):
-    """Extract text from TXT file"""
+def extract_text_from_txt(source):
+    """Extract text from TXT file, bytes or stream"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        with _open_binary(source) as file:
+            text = file.read().decode('utf-8')
+        # Universal newlines, like opening the file in text mode
+        return text.replace('\r\n', '\n').replace('\r', '\n')
     except Exception as e:
         print(f"Error extracting text from TXT: {e}")
         return ""
 
+# Common tech skills
+SKILLS_DB = [
+    'machine learning', 'deep learning', 'neural networks', 'artificial intelligence',
+    'python', 'r', 'java', 'c++', 'c#', 'javascript', 'typescript', 'ruby', 'perl',
+    'php', 'html', 'css', 'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'oracle',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'ci/cd',
+    'git', 'github', 'gitlab', 'bitbucket', 'jira', 'confluence', 'agile', 'scrum',
+    'kanban', 'waterfall', 'devops', 'sre', 'data science', 'data analysis',
+    'data engineering', 'data visualization', 'tableau', 'power bi', 'excel',
+    'pandas', 'numpy', 'scipy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
+    'nlp', 'computer vision', 'opencv', 'reinforcement learning', 'a/b testing',
+    'etl', 'spark', 'hadoop', 'hive', 'pig', 'kafka', 'airflow', 'luigi',
+    'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
+    'hibernate', 'asp.net', 'rest', 'graphql', 'soap', 'microservices', 'serverless',
+    'blockchain', 'solidity', 'smart contracts', 'web3', 'ethereum', 'golang', 'rust',
+    'swift', 'objective-c', 'kotlin', 'android', 'ios', 'react native', 'flutter',
+    'linux', 'unix', 'windows', 'macos', 'bash', 'powershell', 'shell scripting',
+    'networking', 'tcp/ip', 'http', 'https', 'dns', 'load balancing', 'nginx', 'apache',
+    'security', 'encryption', 'authentication', 'authorization', 'oauth', 'jwt',
+    'penetration testing', 'vulnerability assessment', 'firewall', 'vpn',
+    'project management', 'product management', 'leadership', 'team management',
+    'communication', 'presentation', 'negotiation', 'critical thinking',
+    'problem solving', 'decision making', 'time management', 'budgeting',
+    'forecasting', 'strategic planning', 'risk management', 'quality assurance',
+    'testing', 'selenium', 'cypress', 'jest', 'mocha', 'pytest', 'junit',
+    'continuous integration', 'continuous deployment', 'continuous delivery',
+    'data warehousing', 'data modeling', 'data mining', 'business intelligence',
+    'machine learning operations', 'mlops', 'aiops', 'devsecops', 'cloud computing',
+    'saas', 'paas', 'iaas', 'faas', 'iot', 'embedded systems', 'fpga', 'vhdl',
+    'verilog', 'pcb design', 'digital signal processing', 'control systems',
+    'robotics', 'automation', 'plc', 'scada', 'hmi', 'crm', 'salesforce',
+    'dynamics', 'erp', 'sap', 'oracle', 'peoplesoft', 'workday', 'service now',
+    'itil', 'itsm', 'technical writing', 'user experience', 'user interface',
+    'wireframing', 'prototyping', 'figma', 'sketch', 'adobe xd', 'photoshop',
+    'illustrator', 'indesign', 'after effects', 'premiere pro', 'final cut',
+    'avid', 'maya', 'blender', 'autocad', 'revit', 'solidworks', 'catia',
+    'marketing', 'digital marketing', 'seo', 'sem', 'ppc', 'social media',
+    'content creation', 'copywriting', 'email marketing', 'affiliate marketing',
+    'analytics', 'google analytics', 'ab testing', 'conversion optimization',
+    'customer experience', 'customer journey', 'user research', 'usability testing',
+    'accessibility', 'wcag', 'section 508', 'ada compliance', 'localization',
+    'internationalization', 'technical support', 'helpdesk', 'service desk',
+    'incident management', 'problem management', 'change management',
+    'release management', 'configuration management', 'asset management',
+    'procurement', 'vendor management', 'contract negotiation', 'legal',
+    'regulatory compliance', 'gdpr', 'ccpa', 'hipaa', 'sox', 'pci dss',
+    'iso 27001', 'nist', 'cis', 'cybersecurity', 'intrusion detection',
+    'intrusion prevention', 'siem', 'soar', 'dlp', 'endpoint protection',
+    'mobile device management', 'identity management', 'privileged access',
+    'active directory', 'ldap', 'kerberos', 'biometric authentication',
+    'cryptography', 'pki', 'digital signatures', 'blockchain', 'distributed ledger',
+    'smart contracts', 'defi', 'nft', 'web3', 'cryptocurrency', 'bitcoin',
+    'ethereum', 'solana', 'cardano', 'polkadot', 'avalanche', 'consensys'
+]
+
+# Exclude common words that might be mistakenly identified as skills
+SKILL_STOPWORDS = frozenset(['the', 'and', 'for', 'with'])
+
+def _is_word_char(char):
+    return re.match(r'\w', char) is not None
+
+def _build_trie_pattern(phrases):
+    """
+    Compile phrases into a single regex shaped like a character trie
+
+    Shared prefixes are factored out so the regex engine walks each position
+    once instead of trying every phrase. Optional tails are greedy, so the
+    longest phrase that satisfies the surrounding pattern wins.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node):
+        branches = [re.escape(char) + render(child)
+                    for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+
+    return render(trie)
+
+class SkillMatcher:
+    """
+    Skill extraction engine compiled once from a skills list
+
+    Use get_skill_matcher() for the shared instance.
+
+    Combines a token-level PhraseMatcher, run on a tokenizer-only Doc, with a
+    single trie-shaped regex that replaces one `re.search` per skill.
+    """
+
+    def __init__(self, nlp, skills=SKILLS_DB):
+        from spacy.matcher import PhraseMatcher
+        from spacy.tokens import Doc
+
+        self.nlp = nlp
+        self.skills = list(dict.fromkeys(skills))
+
+        # One pattern per skill, tokenized on whitespace like the old Matcher patterns
+        self.phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        self.phrase_matcher.add("SKILL", [Doc(nlp.vocab, words=skill.split()) for skill in self.skills])
+
+        # The lookahead reports the longest skill starting at every position
+        self.pattern = re.compile(r'(?=\b(' + _build_trie_pattern(self.skills) + r')\b)')
+
+        # Shorter skills that also match wherever a longer skill does, e.g.
+        # 'react' inside 'react native'. The word boundary after the prefix
+        # depends only on the longer skill's own characters.
+        self.prefixes = {
+            skill: [other for other in self.skills
+                    if other != skill and skill.startswith(other)
+                    and _is_word_char(skill[len(other) - 1]) != _is_word_char(skill[len(other)])]
+            for skill in self.skills
+        }
+
+    def __call__(self, text):
+        """
+        Extract skills from text
+
+        Args:
+            text (str): Resume text
+
+        Returns:
+            list: Sorted list of unique skills found in the text
+        """
+        # Match skills token by token; tagging, parsing and NER are not needed
+        return self._match(self.nlp.make_doc(text.lower()))
+
+    def match_many(self, texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+        """
+        Extract skills from many texts, tokenized in batches by nlp.pipe
+
+        Args:
+            texts (iterable): Texts; consumed lazily
+            batch_size (int): Texts per nlp.pipe batch
+            n_process (int): Processes to tokenize with
+
+        Yields:
+            list: Sorted unique skills of each text, in input order
+        """
+        lowered = (text.lower() for text in texts)
+        for doc in self.nlp.pipe(lowered, batch_size=batch_size, n_process=n_process,
+                                 disable=self.nlp.pipe_names):
+            yield self._match(doc)
+
+    def _match(self, doc):
+        """Skills in a tokenized, lowercased text"""
+        lowered = doc.text
+        skills_found = set()
+
+        for _, start, end in self.phrase_matcher(doc):
+            skill = doc[start:end].text.lower()
+            if len(skill) > 2 and skill not in SKILL_STOPWORDS:
+                skills_found.add(skill)
+
+        # Add any skills that were directly mentioned
+        for match in self.pattern.finditer(lowered):
+            skill = match.group(1)
+            skills_found.add(skill)
+            skills_found.update(self.prefixes[skill])
+
+        return sorted(skills_found)
+
+def get_skill_matcher():
+    """The shared SkillMatcher, compiled on first use"""
+    return get_resource('skill_matcher', lambda: SkillMatcher(get_nlp()))
+
+@timed('skills')
 def extract_skills(text):
     """
-    Extract skills from resume text using spaCy NER and pattern matching
+    Extract skills from resume text using spaCy phrase matching and pattern matching
     
     Args:
         text (str): Resume text
@@ -89,93 +341,18 @@ def extract_skills(text):
     Returns:
         list: List of skills found in the text
     """
-    # Common tech skills
-    skills_db = [
-        'machine learning', 'deep learning', 'neural networks', 'artificial intelligence',
-        'python', 'r', 'java', 'c++', 'c#', 'javascript', 'typescript', 'ruby', 'perl',
-        'php', 'html', 'css', 'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'oracle',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'ci/cd',
-        'git', 'github', 'gitlab', 'bitbucket', 'jira', 'confluence', 'agile', 'scrum',
-        'kanban', 'waterfall', 'devops', 'sre', 'data science', 'data analysis',
-        'data engineering', 'data visualization', 'tableau', 'power bi', 'excel',
-        'pandas', 'numpy', 'scipy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
-        'nlp', 'computer vision', 'opencv', 'reinforcement learning', 'a/b testing',
-        'etl', 'spark', 'hadoop', 'hive', 'pig', 'kafka', 'airflow', 'luigi',
-        'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
-        'hibernate', 'asp.net', 'rest', 'graphql', 'soap', 'microservices', 'serverless',
-        'blockchain', 'solidity', 'smart contracts', 'web3', 'ethereum', 'golang', 'rust',
-        'swift', 'objective-c', 'kotlin', 'android', 'ios', 'react native', 'flutter',
-        'linux', 'unix', 'windows', 'macos', 'bash', 'powershell', 'shell scripting',
-        'networking', 'tcp/ip', 'http', 'https', 'dns', 'load balancing', 'nginx', 'apache',
-        'security', 'encryption', 'authentication', 'authorization', 'oauth', 'jwt',
-        'penetration testing', 'vulnerability assessment', 'firewall', 'vpn',
-        'project management', 'product management', 'leadership', 'team management',
-        'communication', 'presentation', 'negotiation', 'critical thinking',
-        'problem solving', 'decision making', 'time management', 'budgeting',
-        'forecasting', 'strategic planning', 'risk management', 'quality assurance',
-        'testing', 'selenium', 'cypress', 'jest', 'mocha', 'pytest', 'junit',
-        'continuous integration', 'continuous deployment', 'continuous delivery',
-        'data warehousing', 'data modeling', 'data mining', 'business intelligence',
-        'machine learning operations', 'mlops', 'aiops', 'devsecops', 'cloud computing',
-        'saas', 'paas', 'iaas', 'faas', 'iot', 'embedded systems', 'fpga', 'vhdl',
-        'verilog', 'pcb design', 'digital signal processing', 'control systems',
-        'robotics', 'automation', 'plc', 'scada', 'hmi', 'crm', 'salesforce',
-        'dynamics', 'erp', 'sap', 'oracle', 'peoplesoft', 'workday', 'service now',
-        'itil', 'itsm', 'technical writing', 'user experience', 'user interface',
-        'wireframing', 'prototyping', 'figma', 'sketch', 'adobe xd', 'photoshop',
-        'illustrator', 'indesign', 'after effects', 'premiere pro', 'final cut',
-        'avid', 'maya', 'blender', 'autocad', 'revit', 'solidworks', 'catia',
-        'marketing', 'digital marketing', 'seo', 'sem', 'ppc', 'social media',
-        'content creation', 'copywriting', 'email marketing', 'affiliate marketing',
-        'analytics', 'google analytics', 'ab testing', 'conversion optimization',
-        'customer experience', 'customer journey', 'user research', 'usability testing',
-        'accessibility', 'wcag', 'section 508', 'ada compliance', 'localization',
-        'internationalization', 'technical support', 'helpdesk', 'service desk',
-        'incident management', 'problem management', 'change management',
-        'release management', 'configuration management', 'asset management',
-        'procurement', 'vendor management', 'contract negotiation', 'legal',
-        'regulatory compliance', 'gdpr', 'ccpa', 'hipaa', 'sox', 'pci dss',
-        'iso 27001', 'nist', 'cis', 'cybersecurity', 'intrusion detection',
-        'intrusion prevention', 'siem', 'soar', 'dlp', 'endpoint protection',
-        'mobile device management', 'identity management', 'privileged access',
-        'active directory', 'ldap', 'kerberos', 'biometric authentication',
-        'cryptography', 'pki', 'digital signatures', 'blockchain', 'distributed ledger',
-        'smart contracts', 'defi', 'nft', 'web3', 'cryptocurrency', 'bitcoin',
-        'ethereum', 'solana', 'cardano', 'polkadot', 'avalanche', 'consensys'
-    ]
-    
-    # Initialize matcher with the spaCy vocab
-    matcher = Matcher(nlp.vocab)
-    
-    # Add patterns for the skills matcher
-    patterns = []
-    for skill in skills_db:
-        skill_tokens = skill.split()
-        if len(skill_tokens) == 1:
-            pattern = [{"LOWER": skill_tokens[0]}]
-        else:
-            pattern = [{"LOWER": token} for token in skill_tokens]
-        matcher.add(skill, [pattern])
-    
-    # Process the text
-    doc = nlp(text.lower())
-    
-    # Initialize a set to store unique skills
-    skills_found = set()
-    
-    # Match skills in the text
-    matches = matcher(doc)
-    for match_id, start, end in matches:
-        span = doc[start:end]
-        skill = span.text.lower()
-        # Exclude common words that might be mistakenly identified as skills
-        if len(skill) > 2 and skill not in ['the', 'and', 'for', 'with']:
-            skills_found.add(skill)
-    
-    # Add any skills that were directly mentioned
-    for skill in skills_db:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
-            skills_found.add(skill)
+    return get_skill_matcher()(text)
+
+def extract_skills_many(texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """
+    Extract skills from many texts, e.g. a batch of resumes or every job posting
     
-    # Convert set to list and sort alphabetically
-    return sorted(list(skills_found))
\ No newline at end of file
+    Args:
+        texts (iterable): Texts; consumed lazily, so memory stays flat over large inputs
+        batch_size (int): Texts per nlp.pipe batch
+        n_process (int): Processes to tokenize with
+        
+    Yields:
+        list: Skills of each text, as extract_skills returns them, in input order
+    """
+    return get_skill_matcher().match_many(texts, batch_size=batch_size, n_process=n_process)
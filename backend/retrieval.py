@@ -0,0 +1,276 @@
+import os
+import json
+import numpy as np
+import scipy.sparse as sp
+from job_ranking import rank_top_k
+
+RETRIEVAL_BACKEND = os.getenv("JOB_RETRIEVAL_BACKEND", "exact")
+# Backend tuning parameters as JSON, e.g. {"n_probe": 16}
+RETRIEVAL_PARAMS = json.loads(os.getenv("JOB_RETRIEVAL_PARAMS", "{}"))
+# Below this many jobs an exact scan is fast enough that approximation only costs recall
+RETRIEVAL_MIN_ROWS = int(os.getenv("JOB_RETRIEVAL_MIN_ROWS", 50000))
+# The approximate backends project a count sketch of 2**SKETCH_BITS columns, so
+# their memory does not grow with a fitted vocabulary of millions of n-grams
+SKETCH_BITS = int(os.getenv("JOB_RETRIEVAL_SKETCH_BITS", 15))
+# Rows projected at a time while hashing a catalog, bounding the dense temporary
+PROJECT_CHUNK_ROWS = 65536
+
+def _top(rows, scores, k, min_score):
+    """Best k (row, score) pairs above min_score, highest first"""
+    positions = rank_top_k(scores, k, min_score)
+    return rows[positions], scores[positions]
+
+def _mix(values):
+    """splitmix64 finalizer: well-spread 64-bit hashes of uint64 values"""
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def count_sketch(vectors, dim, seed=0):
+    """
+    Fold sparse rows onto `dim` columns
+
+    A seeded hash of each column index picks its bucket and a random sign,
+    so inner products are preserved in expectation and nothing the size of
+    the vocabulary is stored. Rows with at most `dim` columns are returned
+    unchanged.
+    """
+    vectors = vectors.tocsr()
+    if vectors.shape[1] <= dim:
+        return vectors.astype(np.float32)
+    offset = np.uint64((seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+    hashes = _mix(vectors.indices.astype(np.uint64) + offset)
+    buckets = (hashes % np.uint64(dim)).astype(np.int32)
+    signs = np.where(hashes >> np.uint64(63), -1, 1).astype(np.float32)
+    sketch = sp.csr_matrix((vectors.data.astype(np.float32) * signs, buckets, vectors.indptr.copy()),
+                           shape=(vectors.shape[0], dim))
+    sketch.sum_duplicates()
+    return sketch
+
+class ExactRetriever:
+    """Exact cosine search: one sparse mat-vec over every job"""
+
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+
+    def search(self, query, k, min_score=0.0, live=None):
+        """
+        Args:
+            query (csr_matrix): 1 x V L2-normalized query vector
+            k (int): Number of results
+            min_score (float): Scores must be strictly greater than this
+            live (ndarray): Boolean mask of rows that may be returned
+
+        Returns:
+            tuple: (row ids, cosine scores), best first
+        """
+        scores = (self.matrix @ query.T).toarray().ravel()
+        if live is not None:
+            scores[~live] = -np.inf
+        return _top(np.arange(len(scores)), scores, k, min_score)
+
+    def extended(self, matrix):
+        """Retriever over `matrix`, whose leading rows are the ones already indexed"""
+        return type(self)(matrix)
+
+class _CandidateRetriever:
+    """Approximate backends propose candidate rows, which are re-scored exactly"""
+
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+
+    def search(self, query, k, min_score=0.0, live=None):
+        rows = self.candidates(query)
+        if live is not None:
+            rows = rows[live[rows]]
+        if len(rows) == 0:
+            return rows, np.zeros(0)
+        scores = (self.matrix[rows] @ query.T).toarray().ravel()
+        return _top(rows, scores, k, min_score)
+
+    def _copy(self, matrix):
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.matrix = matrix.tocsr()
+        return clone
+
+class LSHRetriever(_CandidateRetriever):
+    """
+    Random-projection (signed hyperplane) LSH
+
+    Each of `n_tables` tables hashes a vector to `n_bits` signs of Gaussian
+    random projections. Jobs sharing a bucket with the query in any table are
+    candidates. More tables and fewer bits raise recall; `probes` also checks
+    buckets one bit flip away. Vectors are count-sketched to at most
+    2**sketch_bits columns first, so the hyperplanes take
+    2**sketch_bits x n_tables x n_bits float32s (20 MB by default) however
+    large the vocabulary.
+
+    TF-IDF neighbours have low absolute cosine, which hyperplane hashing
+    separates poorly, so recall costs many candidates; IVFRetriever gives a
+    better recall/latency trade-off on job text.
+
+    New rows are hashed with the same hyperplanes, so `extended` is cheap.
+    """
+
+    def __init__(self, matrix, n_tables=16, n_bits=10, probes=10, sketch_bits=SKETCH_BITS, seed=0):
+        super().__init__(matrix)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.probes = probes
+        self.sketch_dim = 2 ** sketch_bits
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        dim = min(self.matrix.shape[1], self.sketch_dim)
+        self.projection = rng.standard_normal((dim, n_tables * n_bits), dtype=np.float32)
+        self.weights = (1 << np.arange(n_bits, dtype=np.int64))
+
+        self.codes = self._codes(self.matrix)
+        self.tables = self._build_tables(self.codes)
+
+    def _build_tables(self, codes):
+        """Per table: sorted distinct codes, their bucket bounds and the rows ordered by code"""
+        tables = []
+        for table in range(self.n_tables):
+            order = np.argsort(codes[:, table], kind='stable')
+            keys, starts = np.unique(codes[order, table], return_index=True)
+            tables.append((keys, starts, np.append(starts[1:], len(order)), order))
+        return tables
+
+    def extended(self, matrix):
+        clone = self._copy(matrix)
+        clone.codes = np.vstack([self.codes, self._codes(clone.matrix[len(self.codes):])])
+        clone.tables = self._build_tables(clone.codes)
+        return clone
+
+    def _codes(self, vectors):
+        codes = [np.zeros((0, self.n_tables), dtype=np.int64)]
+        for start in range(0, vectors.shape[0], PROJECT_CHUNK_ROWS):
+            sketch = count_sketch(vectors[start:start + PROJECT_CHUNK_ROWS], self.sketch_dim, self.seed)
+            signs = np.asarray(sketch @ self.projection) > 0
+            codes.append(signs.reshape(-1, self.n_tables, self.n_bits).astype(np.int64) @ self.weights)
+        return np.vstack(codes)
+
+    def _probe_codes(self, code):
+        codes = [code]
+        if self.probes:
+            codes += [code ^ (1 << bit) for bit in range(min(self.probes, self.n_bits))]
+        return codes
+
+    def candidates(self, query):
+        found = []
+        for table, code in enumerate(self._codes(query)[0]):
+            keys, starts, ends, order = self.tables[table]
+            for probe in self._probe_codes(int(code)):
+                position = np.searchsorted(keys, probe)
+                if position < len(keys) and keys[position] == probe:
+                    found.append(order[starts[position]:ends[position]])
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+class IVFRetriever(_CandidateRetriever):
+    """
+    Dense reduced-dimension index with an inverted-file partition
+
+    Jobs are count-sketched to at most 2**sketch_bits columns, so the SVD
+    components do not grow with the vocabulary, then embedded with
+    TruncatedSVD and clustered with k-means into
+    `n_lists` partitions. A query scans the `n_probe` partitions whose
+    centroids are closest, keeps the `rerank` best by dense score, and
+    re-scores those exactly. Raising `n_probe` raises recall.
+
+    `extended` projects and assigns new rows with the existing SVD and
+    centroids; the partitions drift from optimal until the catalog is
+    compacted and the index rebuilt.
+    """
+
+    def __init__(self, matrix, n_components=128, n_lists=None, n_probe=8, rerank=200,
+                 sketch_bits=SKETCH_BITS, seed=0):
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.cluster import MiniBatchKMeans
+
+        super().__init__(matrix)
+        self.n_probe = n_probe
+        self.rerank = rerank
+        self.sketch_dim = 2 ** sketch_bits
+        self.seed = seed
+
+        sketch = count_sketch(self.matrix, self.sketch_dim, seed)
+        n_jobs, n_features = sketch.shape
+        n_components = max(1, min(n_components, n_features - 1, n_jobs - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=seed).fit(sketch)
+        # Kept contiguous so projecting a query is a single sparse x dense product
+        self.components = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+        self.embeddings = self._project(sketch)
+
+        n_lists = n_lists or max(1, int(np.sqrt(n_jobs)))
+        self.kmeans = MiniBatchKMeans(n_clusters=min(n_lists, n_jobs), random_state=seed, n_init=3,
+                                      batch_size=4096)
+        self.labels = self.kmeans.fit_predict(self.embeddings)
+        self.centroids = np.ascontiguousarray(self.kmeans.cluster_centers_, dtype=np.float32)
+        self.lists = self._build_lists(self.labels)
+
+    def _build_lists(self, labels):
+        order = np.argsort(labels, kind='stable')
+        bounds = np.searchsorted(labels[order], np.arange(self.kmeans.n_clusters + 1))
+        return [order[bounds[label]:bounds[label + 1]] for label in range(self.kmeans.n_clusters)]
+
+    def extended(self, matrix):
+        clone = self._copy(matrix)
+        new_embeddings = self._embed(clone.matrix[len(self.labels):])
+        clone.embeddings = np.vstack([self.embeddings, new_embeddings])
+        clone.labels = np.concatenate([self.labels, self.kmeans.predict(new_embeddings)])
+        clone.lists = clone._build_lists(clone.labels)
+        return clone
+
+    def _embed(self, vectors):
+        """L2-normalized reduced-dimension embeddings of sparse rows"""
+        return self._project(count_sketch(vectors, self.sketch_dim, self.seed))
+
+    def _project(self, sketch):
+        embeddings = np.asarray(sketch @ self.components)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    def candidates(self, query):
+        embedded = self._embed(query)[0]
+        centroid_scores = self.centroids @ embedded
+        n_probe = min(self.n_probe, len(self.lists))
+        probed = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        rows = np.concatenate([self.lists[label] for label in probed])
+        if len(rows) > self.rerank:
+            dense_scores = self.embeddings[rows] @ embedded
+            rows = rows[np.argpartition(-dense_scores, self.rerank - 1)[:self.rerank]]
+        return np.sort(rows)
+
+RETRIEVERS = {
+    'exact': ExactRetriever,
+    'lsh': LSHRetriever,
+    'ivf': IVFRetriever,
+}
+
+def build_retriever(matrix, backend=None, **params):
+    """
+    Build a retrieval backend over a job matrix
+
+    Args:
+        matrix (csr_matrix): L2-normalized job vectors
+        backend (str): 'exact', 'lsh' or 'ivf'. Defaults to JOB_RETRIEVAL_BACKEND,
+            or 'exact' for catalogs smaller than JOB_RETRIEVAL_MIN_ROWS
+        **params: Backend tuning parameters (default JOB_RETRIEVAL_PARAMS)
+
+    Returns:
+        A retriever with search(query, k, min_score, live) and extended(matrix) methods
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend is None:
+        backend = RETRIEVAL_BACKEND if matrix.shape[0] >= RETRIEVAL_MIN_ROWS else 'exact'
+        params = params or (RETRIEVAL_PARAMS if backend != 'exact' else {})
+    if backend not in RETRIEVERS:
+        raise ValueError(f"Unknown retrieval backend: {backend}")
+    return RETRIEVERS[backend](matrix, **params)
@@ -0,0 +1,203 @@
+import os
+import re
+import json
+from model_registry import get_resource
+
+# Canonical section name -> header lines that start it (matched case-insensitively)
+DEFAULT_SECTION_SYNONYMS = {
+    'summary': ['summary', 'professional summary', 'profile', 'about me'],
+    'objective': ['objective', 'career objective'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history'],
+    'education': ['education', 'academic background'],
+    'skills': ['skills', 'technical skills', 'professional skills', 'core competencies'],
+    'certifications': ['certifications', 'certificates'],
+    'projects': ['projects'],
+    'achievements': ['achievements', 'accomplishments'],
+    'awards': ['awards', 'honors'],
+    'publications': ['publications'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies'],
+    'personal information': ['personal information'],
+    'contact information': ['contact information'],
+    'references': ['references'],
+    'volunteer': ['volunteer', 'volunteering', 'volunteer experience'],
+    'activities': ['activities', 'extracurricular activities'],
+}
+
+class Section:
+    """
+    One section of a document, as offsets into the source text
+
+    The content is only sliced out when `text` is read.
+    """
+
+    __slots__ = ('name', 'header', 'start', 'end', '_source', '_offset')
+
+    def __init__(self, name, header, start, end, source, offset=0):
+        self.name = name
+        self.header = header
+        self.start = start
+        self.end = end
+        self._source = source
+        self._offset = offset
+
+    @property
+    def text(self):
+        """The section content, without the header line"""
+        return self._source[self.start - self._offset:self.end - self._offset].strip()
+
+    def __repr__(self):
+        return f"Section({self.name!r}, start={self.start}, end={self.end})"
+
+class SectionSegmenter:
+    """
+    Splits resume text into sections at header lines
+
+    A header line holds only a known header (optionally decorated with
+    asterisks, and optionally followed by a colon and inline content). All
+    headers are compiled into one pattern, longest first, so 'work
+    experience' is never cut short to 'experience'; every synonym maps to
+    its canonical section name. Segmenting is one pass over the text.
+    """
+
+    def __init__(self, synonyms=None):
+        self.synonyms = synonyms or DEFAULT_SECTION_SYNONYMS
+        self.canonical = {header.lower(): name for name, headers in self.synonyms.items()
+                          for header in [name, *headers]}
+        alternation = '|'.join(re.escape(header) for header in sorted(self.canonical, key=len, reverse=True))
+        self.pattern = re.compile(fr'^[ \t*]*({alternation})\b[ \t*\r]*(?::|$)', re.IGNORECASE | re.MULTILINE)
+
+    def segment(self, text):
+        """
+        Args:
+            text (str): Document text
+
+        Returns:
+            list: Section objects in document order
+        """
+        sections = []
+        current = None
+        for match in self.pattern.finditer(text):
+            if current is not None:
+                current.end = match.start()
+            header = match.group(1)
+            current = Section(self.canonical[header.lower()], header, match.end(), len(text), text)
+            sections.append(current)
+        return sections
+
+    def stream(self):
+        """A SectionStream that segments text fed to it incrementally"""
+        return SectionStream(self)
+
+class SectionStream:
+    """
+    Incremental segmentation of text that arrives in chunks (e.g. PDF pages)
+
+    `feed` returns the sections completed by the new text: a section is
+    complete once the next header line is seen. `close` returns the last
+    one. Offsets are relative to the concatenation of everything fed, and
+    only the text of the section in progress is kept.
+    """
+
+    def __init__(self, segmenter):
+        self.segmenter = segmenter
+        self._buffer = ''
+        self._offset = 0  # position of _buffer in the whole text
+        self._scanned = 0  # buffer position up to which complete lines have been scanned
+        self._current = None
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        # Only complete lines can be classified; a header may still be arriving
+        complete = self._buffer.rfind('\n', self._scanned) + 1
+        if complete == 0:
+            return []
+        return self._scan(complete)
+
+    def close(self):
+        """Scan the final line and return the remaining sections"""
+        sections = self._scan(len(self._buffer))
+        if self._current is not None:
+            sections.append(self._finish(len(self._buffer)))
+        return sections
+
+    def _scan(self, end):
+        completed = []
+        pattern = self.segmenter.pattern
+        while True:
+            match = pattern.search(self._buffer, self._scanned, end)
+            if match is None:
+                self._scanned = end
+                return completed
+            if self._current is not None:
+                completed.append(self._finish(match.start()))
+            # Text before the header is no longer needed
+            cut = match.start()
+            self._offset += cut
+            self._buffer = self._buffer[cut:]
+            end -= cut
+            header = match.group(1)
+            self._current = (self.segmenter.canonical[header.lower()], header, self._offset + match.end() - cut)
+            self._scanned = match.end() - cut
+
+    def _finish(self, end):
+        name, header, start = self._current
+        section = Section(name, header, start, self._offset + end, self._buffer, self._offset)
+        self._current = None
+        return section
+
+def load_section_synonyms():
+    """Default synonyms, extended by the JSON file at RESUME_SECTION_SYNONYMS if set"""
+    synonyms = {name: list(headers) for name, headers in DEFAULT_SECTION_SYNONYMS.items()}
+    path = os.getenv("RESUME_SECTION_SYNONYMS")
+    if path:
+        with open(path, encoding='utf-8') as file:
+            for name, headers in json.load(file).items():
+                synonyms.setdefault(name, []).extend(headers)
+    return synonyms
+
+def get_section_segmenter():
+    """The shared segmenter, compiled once per process"""
+    return get_resource('section_segmenter', lambda: SectionSegmenter(load_section_synonyms()))
+
+def stream_sections(chunks, segmenter=None):
+    """
+    Segment text as it is produced
+
+    Args:
+        chunks (iterable): Successive pieces of the text, e.g. iter_pdf_pages(...)
+        segmenter (SectionSegmenter): Defaults to the shared segmenter
+
+    Yields:
+        Section: Each section as soon as it is complete
+    """
+    stream = (segmenter or get_section_segmenter()).stream()
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+def stream_pdf_sections(source, **budget):
+    """
+    Sections of a PDF, each yielded as soon as the pages containing it are extracted
+
+    Args:
+        source: PDF path, bytes or file object
+        **budget: max_pages, max_chars, workers, parallel_min_pages as for extract_pdf
+
+    Yields:
+        Section: Sections in document order
+    """
+    from pdf_extractor import iter_pdf_pages
+
+    return stream_sections(iter_pdf_pages(source, **budget))
+
+def sections_dict(sections):
+    """Section name -> content; repeated sections are joined"""
+    contents = {}
+    for section in sections:
+        if section.name in contents:
+            contents[section.name] += '\n\n' + section.text
+        else:
+            contents[section.name] = section.text
+    return contents
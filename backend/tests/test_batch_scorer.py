@@ -0,0 +1,72 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+import batch_scorer
+from batch_scorer import open_resume_source
+from resume_parser import UploadTooLargeError
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+def make_tar(path, members):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return str(path)
+
+@pytest.fixture(params=[make_zip, make_tar], ids=['zip', 'tar'])
+def make_archive(request, tmp_path):
+    suffix = '.zip' if request.param is make_zip else '.tar.gz'
+    return lambda members: request.param(tmp_path / f"resumes{suffix}", members)
+
+def test_extracts_supported_members(make_archive):
+    archive = make_archive({"a.txt": b"first resume", "../b.pdf": b"%PDF", "notes.md": b"skipped"})
+    with open_resume_source(archive) as files:
+        assert [name for name, _ in files] == ["../b.pdf", "a.txt"]
+        assert all(os.path.dirname(path) == os.path.dirname(files[0][1]) for _, path in files)
+        with open(dict(files)["a.txt"], 'rb') as file:
+            assert file.read() == b"first resume"
+
+def test_rejects_a_member_over_the_upload_limit(make_archive, monkeypatch):
+    monkeypatch.setattr(batch_scorer, 'MAX_UPLOAD_BYTES', 1024)
+    # Highly compressible, like a decompression bomb
+    archive = make_archive({"bomb.txt": b"\0" * (64 * 1024)})
+    with pytest.raises(UploadTooLargeError, match="bomb.txt"):
+        with open_resume_source(archive):
+            pass
+
+def test_rejects_archives_expanding_beyond_the_total_limit(make_archive, monkeypatch):
+    monkeypatch.setattr(batch_scorer, 'MAX_EXTRACTED_BYTES', 2500)
+    archive = make_archive({f"{i}.txt": b"x" * 1000 for i in range(3)})
+    with pytest.raises(UploadTooLargeError, match="expands beyond"):
+        with open_resume_source(archive):
+            pass
+
+def test_rejects_too_many_members(make_archive, monkeypatch):
+    monkeypatch.setattr(batch_scorer, 'MAX_ARCHIVE_MEMBERS', 2)
+    archive = make_archive({f"{i}.txt": b"resume" for i in range(3)})
+    with pytest.raises(UploadTooLargeError, match="more than 2"):
+        with open_resume_source(archive):
+            pass
+
+def test_scores_through_a_shared_spawned_pool(tmp_path):
+    for index in range(3):
+        (tmp_path / f"{index}.txt").write_text(f"Candidate {index}\nSKILLS\nPython, Django and SQL\n")
+    pool = batch_scorer.start_worker_pool(1)
+    try:
+        with open_resume_source(str(tmp_path)) as files:
+            for job_description in ("Python Django developer", "Java Spring developer"):
+                results = list(batch_scorer.score_resumes(files, job_description, workers=1, pool=pool))
+                assert [result["file"] for result in results] == ["0.txt", "1.txt", "2.txt"]
+                assert all(result["score"] is not None for result in results)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,127 @@
+import os
+import json
+
+import pandas as pd
+import pytest
+
+from job_catalog import JobCatalog, CHECKPOINT_DIR, CHECKPOINT_FILE
+
+JOBS = pd.DataFrame({
+    'job_title': ['Software Engineer', 'Data Scientist', 'Product Manager', 'DevOps Engineer'],
+    'company_name': ['Tech Corp', 'Data Analytics Inc', 'Product Solutions', 'Cloud Works'],
+    'location': ['San Francisco, CA', 'New York, NY', 'Seattle, WA', 'Austin, TX'],
+    'experience': ['3-5 years', '2-4 years', '4-6 years', '1-3 years'],
+})
+
+@pytest.fixture
+def paths(tmp_path):
+    csv_path = tmp_path / 'jobs.csv'
+    JOBS.to_csv(csv_path, index=False)
+    return str(csv_path), str(tmp_path / 'index')
+
+def journal_lines(catalog):
+    with open(catalog.journal_path) as file:
+        return file.readlines()
+
+def test_compaction_checkpoints_and_truncates_the_journal(paths):
+    catalog = JobCatalog(*paths, compact_ratio=100)
+    for attempt in range(5):
+        ids = catalog.upsert([{"Job_Title": f"Golang Developer {attempt}", "Company_Name": "Gophers"}])
+        catalog.remove(ids)
+    kept = catalog.upsert([{"Job_Title": "Rust Developer", "Company_Name": "Crabs"}])
+    catalog.remove(['csv-0'])
+    assert len(journal_lines(catalog)) == 12
+
+    catalog.compact()
+    assert len(journal_lines(catalog)) == 2
+    assert os.path.exists(os.path.join(paths[1], CHECKPOINT_DIR, CHECKPOINT_FILE))
+    version = catalog.stats()["version"]
+
+    restarted = JobCatalog(*paths, compact_ratio=100)
+    index = restarted.snapshot()
+    assert restarted.stats()["version"] == version
+    assert set(index.jobs['Job_Id']) == {'csv-1', 'csv-2', 'csv-3', kept[0]}
+
+    # Changes after the checkpoint are replayed on top of it
+    restarted.remove(kept)
+    again = JobCatalog(*paths, compact_ratio=100)
+    assert again.stats()["jobs"] == 3
+    assert again.stats()["version"] == restarted.stats()["version"]
+
+def test_checkpoint_is_ignored_when_the_csv_changes(paths):
+    catalog = JobCatalog(*paths, compact_ratio=100)
+    catalog.upsert([{"Job_Title": "Rust Developer", "Company_Name": "Crabs"}])
+    catalog.compact()
+
+    JOBS.iloc[::-1].to_csv(paths[0], index=False)
+    restarted = JobCatalog(*paths, compact_ratio=100)
+    assert restarted.stats()["jobs"] == 5
+    assert restarted.snapshot().jobs['Job_Title'].iloc[0] == 'DevOps Engineer'
+
+def test_version_depends_on_content_not_update_count(paths):
+    first = JobCatalog(*paths, compact_ratio=100)
+    first.upsert([{"Job_Id": "a", "Job_Title": "Rust Developer", "Company_Name": "Crabs"}])
+    os.remove(first.journal_path)
+
+    second = JobCatalog(*paths, compact_ratio=100)
+    second.upsert([{"Job_Id": "a", "Job_Title": "Golang Developer", "Company_Name": "Gophers"}])
+    assert first.snapshot().generation == second.snapshot().generation
+    assert first.stats()["version"] != second.stats()["version"]
+
+@pytest.mark.parametrize('job', [
+    {"Company_Name": "Crabs"},
+    {"Job_Title": "  ", "Company_Name": "Crabs"},
+    {"Job_Title": "Rust Developer", "Company_Name": "Crabs", "Skills": ["rust"]},
+    "Rust Developer",
+])
+def test_invalid_upserts_are_not_journaled(paths, job):
+    catalog = JobCatalog(*paths)
+    with pytest.raises(ValueError):
+        catalog.upsert([job])
+    assert not os.path.exists(catalog.journal_path)
+    assert catalog.stats()["jobs"] == 4
+
+def test_raw_column_names_are_accepted(paths):
+    catalog = JobCatalog(*paths, compact_ratio=100)
+    catalog.upsert([{"job_title": "Rust Developer", "company_name": "Crabs"}])
+    entry = json.loads(journal_lines(catalog)[0])
+    assert entry["op"] == "upsert" and catalog.stats()["jobs"] == 5
+
+def test_admin_changes_reach_other_processes(paths):
+    # Two catalogs on the same files stand in for two server processes
+    first = JobCatalog(*paths, compact_ratio=100)
+    second = JobCatalog(*paths, compact_ratio=100)
+    first.snapshot(), second.snapshot()
+
+    [job_id] = first.upsert([{"Job_Title": "Rust Developer", "Company_Name": "Crabs"}])
+    assert job_id in set(second.refresh().jobs['Job_Id'])
+
+    second.remove([job_id])
+    assert first.refresh().live_count == 4
+    assert first.stats()["version"] == second.stats()["version"]
+
+def test_compaction_keeps_other_processes_journal_entries(paths):
+    first = JobCatalog(*paths, compact_ratio=100)
+    second = JobCatalog(*paths, compact_ratio=100)
+    first.snapshot(), second.snapshot()
+
+    first.upsert([{"Job_Id": "a", "Job_Title": "Rust Developer", "Company_Name": "Crabs"}])
+    second.upsert([{"Job_Id": "b", "Job_Title": "Golang Developer", "Company_Name": "Gophers"}])
+    first.compact()
+
+    restarted = JobCatalog(*paths, compact_ratio=100)
+    assert {"a", "b"} <= set(restarted.snapshot().jobs['Job_Id'])
+    # The other process reloads from the new checkpoint
+    assert set(second.refresh().jobs['Job_Id']) == set(restarted.snapshot().jobs['Job_Id'])
+
+def test_compaction_runs_in_the_background(paths):
+    catalog = JobCatalog(*paths, compact_ratio=0.2)
+    before = catalog.snapshot()
+    catalog.upsert([{"Job_Title": f"Developer {attempt}", "Company_Name": "Crabs"} for attempt in range(3)])
+    assert catalog._compaction is not None
+    catalog._compaction.join()
+
+    index = catalog.snapshot()
+    assert index.generation == before.generation + 2 and index.dead_count == 0
+    assert catalog.stats()["updates_since_compaction"] == 0
+    assert os.path.exists(os.path.join(paths[1], CHECKPOINT_DIR, CHECKPOINT_FILE))
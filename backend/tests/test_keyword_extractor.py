@@ -0,0 +1,63 @@
+import os
+import pickle
+
+import joblib
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import job_catalog
+import model_registry
+import keyword_extractor
+
+JOBS = ["golang developer", "golang engineer", "golang python"]
+
+@pytest.fixture
+def idf_path(monkeypatch, tmp_path):
+    monkeypatch.delitem(model_registry._resources, 'keyword_idf', raising=False)
+    # Keyword extraction must never load or build the job catalog
+    monkeypatch.setattr(job_catalog, 'get_job_catalog', lambda *args, **kwargs: pytest.fail("catalog loaded"))
+    path = tmp_path / 'vectorizer.joblib'
+    monkeypatch.setattr(keyword_extractor, 'KEYWORD_IDF_PATH', str(path))
+    yield path
+    model_registry._resources.pop('keyword_idf', None)
+
+def save_vectorizer(path, corpus, mtime):
+    joblib.dump(TfidfVectorizer(ngram_range=(1, 2), stop_words='english').fit(corpus), path)
+    os.utime(path, (mtime, mtime))
+
+def ranking(text):
+    [terms] = keyword_extractor.get_keyword_extractor().extract_many([text], top_n=None)
+    return terms
+
+def test_without_idf_file_ranks_by_term_frequency(idf_path):
+    assert keyword_extractor.get_keyword_extractor().idf == {}
+    assert ranking("golang golang golang python")[0] == "golang"
+
+def test_idf_is_read_from_the_persisted_vectorizer(idf_path):
+    save_vectorizer(idf_path, JOBS, 1000)
+    # golang is in every job, python is not
+    terms = ranking("golang python")
+    assert terms.index("python") < terms.index("golang")
+
+def test_idf_file_written_later_is_picked_up(idf_path):
+    assert keyword_extractor.get_keyword_extractor().idf == {}
+    save_vectorizer(idf_path, JOBS, 1000)
+    terms = ranking("golang python")
+    assert terms.index("python") < terms.index("golang")
+
+def test_rewritten_idf_file_replaces_the_table(idf_path):
+    save_vectorizer(idf_path, JOBS, 1000)
+    first = keyword_extractor.get_keyword_extractor()
+    assert keyword_extractor.get_keyword_extractor() is first
+
+    # e.g. the catalog was compacted and its vectorizer refitted
+    save_vectorizer(idf_path, ["python developer", "python engineer", "python golang"], 2000)
+    terms = ranking("golang python")
+    assert terms.index("golang") < terms.index("python")
+
+def test_source_travels_to_workers_loaded(idf_path):
+    save_vectorizer(idf_path, JOBS, 1000)
+    source = keyword_extractor.get_keyword_idf_source()
+    extractor = source.extractor()
+    copy = pickle.loads(pickle.dumps(source))
+    assert copy.extractor().idf == extractor.idf
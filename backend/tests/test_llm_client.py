@@ -0,0 +1,111 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from llm_client import LLMClient, CircuitBreaker, CircuitOpenError
+
+class StubOpenAI(BaseHTTPRequestHandler):
+    """Chat completions endpoint answering with the server's current `status` after `delay` seconds"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.delay)
+        if self.server.status == 200:
+            body = {"id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": json.dumps({"score": 70})}}]}
+        else:
+            body = {"error": {"message": "stub error", "type": "stub", "code": None}}
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(self.server.status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on this request
+            pass
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenAI)
+    server.status, server.delay = 200, 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(stub, breaker):
+    return LLMClient(base_url=f"http://127.0.0.1:{stub.server_port}/v1", api_key="test",
+                     timeout=5.0, max_retries=0, breaker=breaker)
+
+def complete(client):
+    return client.acomplete_json([{"role": "user", "content": "hi"}])
+
+def test_completes_json(stub):
+    client = make_client(stub, CircuitBreaker())
+    assert asyncio.run(complete(client)) == {"score": 70}
+
+def test_server_errors_open_the_circuit(stub):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = make_client(stub, breaker)
+    stub.status = 500
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await complete(client)
+        with pytest.raises(CircuitOpenError):
+            await complete(client)
+
+    asyncio.run(scenario())
+    assert breaker.state == "open"
+
+def test_client_errors_leave_the_circuit_closed(stub):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    client = make_client(stub, breaker)
+
+    async def scenario():
+        import openai
+
+        for status in (400, 401, 404):
+            stub.status = status
+            with pytest.raises(openai.APIStatusError):
+                await complete(client)
+
+    asyncio.run(scenario())
+    assert breaker.state == "closed"
+
+def test_cancelled_probe_does_not_wedge_the_circuit(stub):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    client = make_client(stub, breaker)
+
+    async def scenario():
+        stub.status = 500
+        with pytest.raises(Exception):
+            await complete(client)
+        assert breaker.state == "open"
+
+        # The half-open probe is cancelled mid-request, e.g. by a client disconnect
+        await asyncio.sleep(0.1)
+        stub.status, stub.delay = 200, 0.5
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(complete(client), 0.1)
+        assert breaker.state == "half-open" and not breaker.probing
+
+        # The next call probes again and closes the circuit
+        stub.delay = 0.0
+        assert await complete(client) == {"score": 70}
+
+    asyncio.run(scenario())
+    assert breaker.state == "closed"
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import job_matcher
+
+TEXTS = [
+    "kubernetes terraform golang microservices",
+    "kubernetes terraform golang microservice deployment",
+    "python django rest api",
+    "",
+]
+
+@pytest.fixture(params=['fitted', 'hashed'])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(job_matcher, 'VECTORIZER_MODE', request.param)
+    return request.param
+
+def test_identical_texts_score_one(mode):
+    # None of these terms are in any job catalog; they must still count
+    text = "kubernetes terraform golang microservices"
+    assert job_matcher.pair_similarity(text, text) == pytest.approx(1.0)
+    assert job_matcher.pair_similarity(text, text, ngram_range=(1, 2)) == pytest.approx(1.0)
+
+@pytest.mark.parametrize('ngram_range', [(1, 1), (1, 2)])
+def test_batch_matches_pairwise_fit(mode, ngram_range):
+    first = "senior golang engineer kubernetes terraform"
+    batch = job_matcher.pair_similarities(first, TEXTS, ngram_range)
+
+    expected = []
+    for text in TEXTS:
+        matrix = TfidfVectorizer(ngram_range=ngram_range).fit_transform([first, text])
+        expected.append(cosine_similarity(matrix[0:1], matrix[1:2])[0][0])
+    # Hash collisions are possible in principle, not among a handful of terms
+    np.testing.assert_allclose(batch, expected, atol=1e-12)
@@ -0,0 +1,12 @@
+from result_cache import cache_key
+
+RESUME = "Jane Roe\nSKILLS\nPython, Django\nEXPERIENCE\nBuilt APIs"
+
+def test_inline_whitespace_case_and_line_endings_share_a_key():
+    variant = "  jane   roe\r\nskills \r\nPython,\tDjango\rEXPERIENCE\nBuilt  APIs \n"
+    assert cache_key('match', variant, "Python developer") == cache_key('match', RESUME, "python  developer")
+
+def test_line_breaks_are_part_of_the_key():
+    # Without the line breaks the section headers are no longer headers
+    flattened = RESUME.replace('\n', ' ')
+    assert cache_key('match', flattened, "Python developer") != cache_key('match', RESUME, "Python developer")
@@ -0,0 +1,47 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from resume_index import ResumeIndex
+
+RESUMES = [
+    "Jane Roe\nSKILLS\nPython, Django and PostgreSQL\nEXPERIENCE\nBuilt REST APIs in Python",
+    "John Doe\nSKILLS\nJava, Spring and Kafka\nEXPERIENCE\nBuilt payment services in Java",
+    "Ann Lee\nSKILLS\nGolang, Kubernetes and Terraform\nEXPERIENCE\nRan clusters on AWS",
+]
+
+@pytest.fixture
+def vectorizer():
+    return TfidfVectorizer().fit(["python django postgresql", "java spring kafka", "golang kubernetes terraform aws"])
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'resumes.sqlite3')
+
+def ranked_ids(index, vectorizer):
+    return {candidate["id"] for candidate in index.rank("Python developer", vectorizer, top_k=10, min_score=-1)}
+
+def test_resumes_added_by_another_process_are_ranked(db_path, vectorizer):
+    # Two indexes on one database stand in for two server processes
+    first, second = ResumeIndex(db_path), ResumeIndex(db_path)
+    assert ranked_ids(first, vectorizer) == ranked_ids(second, vectorizer) == set()
+
+    added = first.add(RESUMES[0], vectorizer)
+    assert ranked_ids(second, vectorizer) == {added["id"]}
+
+    more = [second.add(text, vectorizer)["id"] for text in RESUMES[1:]]
+    assert ranked_ids(first, vectorizer) == {added["id"], *more}
+    assert first.snapshot(vectorizer)["matrix"].shape[0] == 3
+
+def test_resumes_removed_by_another_process_are_dropped(db_path, vectorizer):
+    first, second = ResumeIndex(db_path), ResumeIndex(db_path)
+    ids = [first.add(text, vectorizer)["id"] for text in RESUMES]
+    assert ranked_ids(second, vectorizer) == set(ids)
+
+    first.remove([ids[-1]])
+    replacement = first.add(RESUMES[-1] + "\nHelm", vectorizer)["id"]
+    assert ranked_ids(second, vectorizer) == {*ids[:-1], replacement}
+
+def test_snapshot_is_reused_when_nothing_changed(db_path, vectorizer):
+    index = ResumeIndex(db_path)
+    index.add(RESUMES[0], vectorizer)
+    assert index.snapshot(vectorizer) is index.snapshot(vectorizer)
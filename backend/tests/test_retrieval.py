@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from retrieval import build_retriever, count_sketch
+
+N_FEATURES = 2 ** 20
+
+@pytest.fixture
+def matrix():
+    # A vocabulary far wider than the sketch, as a fitted bigram vocabulary would be
+    rng = np.random.default_rng(0)
+    return normalize(sp.random(2000, N_FEATURES, density=20 / N_FEATURES, format='csr', random_state=rng,
+                               dtype=np.float32))
+
+def test_count_sketch_preserves_inner_products(matrix):
+    sketch = count_sketch(matrix, 2 ** 12)
+    assert sketch.shape == (matrix.shape[0], 2 ** 12)
+    exact = (matrix[:50] @ matrix[:50].T).toarray()
+    folded = (sketch[:50] @ sketch[:50].T).toarray()
+    assert np.abs(exact - folded).mean() < 0.05
+    assert np.allclose(np.diag(folded), 1, atol=0.3)
+
+@pytest.mark.parametrize('backend, params', [
+    ('lsh', {"n_tables": 8, "n_bits": 6}),
+    ('ivf', {"n_components": 32}),
+])
+def test_approximate_backends_do_not_grow_with_the_vocabulary(matrix, backend, params):
+    retriever = build_retriever(matrix, backend, sketch_bits=12, **params)
+    projection = retriever.projection if backend == 'lsh' else retriever.components
+    assert projection.shape[0] == 2 ** 12
+
+    # A job is its own nearest neighbour, including jobs added after the build
+    extended = retriever.extended(sp.vstack([matrix, matrix[:5]]).tocsr())
+    for row in (0, 1, matrix.shape[0]):
+        found, scores = extended.search(extended.matrix[row], 1)
+        assert scores[0] == pytest.approx(1, abs=1e-5)